@@ -4,22 +4,27 @@ Routes d'authentification (FastAPI)
 - POST /auth/register : inscription
 - POST /auth/login   : connexion + génération token JWT
 - GET  /auth/me      : infos utilisateur courant (protégée)
+- PATCH /auth/me     : mise à jour du profil (email, username, nom, mot de passe)
+- DELETE /auth/me    : désactivation du compte (tokens refusés dans tous les workers)
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import select, Session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Annotated
+from datetime import timedelta
 
 from .. import schemas
 from .. import models
 from ..dependencies import (
+    CurrentUser,
     get_current_user,
-    verify_password,
-    get_password_hash,
     create_access_token,
-    get_session,
+    get_async_session,
+    invalidate_user,
 )
+from ..password_pool import hash_password, verify_and_update_password
 from ..config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -28,16 +33,16 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 # Inscription d'un nouvel utilisateur
 # ───────────────────────────────────────────────
 @router.post("/register", response_model=schemas.user.UserOut)
-def register(
+async def register(
     user_create: schemas.user.UserCreate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     # Vérifier si l'email ou username existe déjà
     stmt = select(models.user.User).where(
         (models.user.User.email == user_create.email) |
         (models.user.User.username == user_create.username)
     )
-    existing_user = session.exec(stmt).first()
+    existing_user = (await session.exec(stmt)).first()
     
     if existing_user:
         if existing_user.email == user_create.email:
@@ -51,16 +56,16 @@ def register(
                 detail="Nom d'utilisateur déjà pris"
             )
 
-    # Créer l'utilisateur
-    hashed_password = get_password_hash(user_create.password)
+    # Créer l'utilisateur (bcrypt dans le pool dédié, pas sur la boucle)
+    hashed_password = await hash_password(user_create.password)
     db_user = models.user.User(
         **user_create.dict(exclude={"password"}),
         hashed_password=hashed_password
     )
     
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
     
     return db_user
 
@@ -69,16 +74,16 @@ def register(
 # Connexion + génération token JWT
 # ───────────────────────────────────────────────
 @router.post("/login", response_model=schemas.user.Token)
-def login(
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     # Trouver l'utilisateur par email ou username
     stmt = select(models.user.User).where(
         (models.user.User.email == form_data.username) |
         (models.user.User.username == form_data.username)
     )
-    user = session.exec(stmt).first()
+    user = (await session.exec(stmt)).first()
     
     if not user:
         raise HTTPException(
@@ -87,7 +92,8 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not verify_password(form_data.password, user.hashed_password):
+    password_ok, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Identifiants incorrects",
@@ -100,6 +106,12 @@ def login(
             detail="Utilisateur inactif"
         )
     
+    # Coût bcrypt modifié depuis l'inscription → on enregistre le hash recalculé
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+    
     # Générer le token JWT
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -114,7 +126,68 @@ def login(
 # Récupérer les infos de l'utilisateur connecté
 # ───────────────────────────────────────────────
 @router.get("/me", response_model=schemas.user.UserOut)
-def read_users_me(
-    current_user: Annotated[models.user.User, Depends(get_current_user)]
+async def read_users_me(
+    current_user: Annotated[CurrentUser, Depends(get_current_user)]
 ):
     return current_user
+
+
+# ───────────────────────────────────────────────
+# Mettre à jour son profil
+# ───────────────────────────────────────────────
+@router.patch("/me", response_model=schemas.user.UserOut)
+async def update_users_me(
+    user_update: schemas.user.UserUpdate,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    session: AsyncSession = Depends(get_async_session)
+):
+    changes = user_update.dict(exclude_unset=True, exclude={"password"})
+
+    # Email / username toujours uniques
+    if "email" in changes or "username" in changes:
+        stmt = select(models.user.User).where(
+            models.user.User.id != current_user.id,
+            (models.user.User.email == changes.get("email")) |
+            (models.user.User.username == changes.get("username"))
+        )
+        existing_user = (await session.exec(stmt)).first()
+        if existing_user:
+            if existing_user.email == changes.get("email"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email déjà utilisé"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nom d'utilisateur déjà pris"
+            )
+
+    db_user = await session.get(models.user.User, current_user.id)
+    for key, value in changes.items():
+        setattr(db_user, key, value)
+    if user_update.password is not None:
+        db_user.hashed_password = await hash_password(user_update.password)
+
+    session.add(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    # Instantanés en cache (tous workers) périmés
+    invalidate_user(db_user.id)
+
+    return db_user
+
+
+# ───────────────────────────────────────────────
+# Désactiver son compte
+# ───────────────────────────────────────────────
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def deactivate_users_me(
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    session: AsyncSession = Depends(get_async_session)
+):
+    db_user = await session.get(models.user.User, current_user.id)
+    db_user.is_active = False
+    session.add(db_user)
+    await session.commit()
+    # Tokens et utilisateur en cache retirés : la requête suivante est refusée
+    invalidate_user(db_user.id)
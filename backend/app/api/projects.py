@@ -2,19 +2,34 @@
 """
 Routes API pour les Projets
 - Création d'un projet dans une équipe
-- Liste des projets (filtrée par équipe ou par utilisateur)
+- Liste des projets (filtrée par équipe ou par utilisateur), paginée par clé
 - Détails et modification d'un projet
 - Protection : authentification + vérification d'appartenance à l'équipe
+- Lectures conditionnelles : ETag + If-None-Match → 304 sans relire ni sérialiser les projets
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import select, Session
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, status, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Annotated, Optional
 
 from .. import models, schemas
-from ..dependencies import get_current_user, get_session
-from ..models.user import User
-from ..models.team import Team
+from ..config import settings
+from ..dependencies import CurrentUser, get_current_user, get_async_session
+from ..permissions import AccessResolver, get_access, invalidate_project
+from ..outbox import add_event, outbox_dispatcher
+from ..pagination import KeysetOrder, fetch_page, parse_fields, projected_response
+from ..revisions import (
+    make_etag,
+    next_project_revision,
+    not_modified,
+    project_list_version,
+    project_revision,
+    project_key,
+    team_projects_key,
+    user_projects_key,
+)
 from ..models.project import Project
 
 router = APIRouter(prefix="/projects", tags=["projects"])
@@ -24,53 +39,79 @@ router = APIRouter(prefix="/projects", tags=["projects"])
 # Créer un nouveau projet dans une équipe
 # ───────────────────────────────────────────────
 @router.post("/", response_model=schemas.project.ProjectOut, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     project_create: schemas.project.ProjectCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
 ):
     # Vérifier que l'équipe existe et que l'utilisateur en est propriétaire (MVP)
-    team = session.get(Team, project_create.team_id)
-    if not team:
-        raise HTTPException(status_code=404, detail="Équipe non trouvée")
-    
-    if team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Seul le propriétaire de l'équipe peut créer un projet (pour le MVP)")
+    await access.ensure_team_access(
+        project_create.team_id,
+        "Seul le propriétaire de l'équipe peut créer un projet (pour le MVP)"
+    )
     
     db_project = Project(
         **project_create.dict(),
         created_by=current_user.id
     )
+    db_project.updated_at = db_project.created_at  # tri des listes par updated_at
     
     session.add(db_project)
-    session.commit()
-    session.refresh(db_project)
+    await session.commit()
+    await session.refresh(db_project)
+    invalidate_project(db_project.id)
     
     return db_project
 
 
 # ───────────────────────────────────────────────
 # Lister les projets (filtré par team_id)
+# Plus récemment modifiés d'abord ; pagination par clé (limit + cursor,
+# suite dans X-Next-Cursor) et projection (fields=id,name,status)
 # ───────────────────────────────────────────────
+PROJECT_ORDER = KeysetOrder("updated", Project, ["updated_at", "id"], descending=True)
+
+
 @router.get("/", response_model=List[schemas.project.ProjectOut])
-def list_projects(
+async def list_projects(
+    request: Request,
+    response: Response,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    access: Annotated[AccessResolver, Depends(get_access)],
     team_id: Optional[int] = Query(None, description="Filtrer par équipe"),
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_MAX_LIMIT, description="Taille de page (sans : tout)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor de la page précédente"),
+    fields: Optional[str] = Query(None, description="Champs à renvoyer, séparés par des virgules"),
+    session: AsyncSession = Depends(get_async_session)
 ):
-    statement = select(Project)
-    
+    projection = parse_fields(fields, schemas.project.ProjectOut)
+
     if team_id:
         # Vérifier que l'utilisateur a accès à cette équipe
-        team = session.get(Team, team_id)
-        if not team or team.owner_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Accès non autorisé à cette équipe")
-        statement = statement.where(Project.team_id == team_id)
+        await access.ensure_team_access(team_id, "Accès non autorisé à cette équipe")
+        condition = Project.team_id == team_id
+        list_key = team_projects_key(team_id)
     else:
         # Pour MVP : seulement les projets des équipes dont on est propriétaire
-        statement = statement.where(Project.created_by == current_user.id)
+        condition = Project.created_by == current_user.id
+        list_key = user_projects_key(current_user.id)
     
-    projects = session.exec(statement).all()
+    # Version lue en base : les révisions des boards (tâches) en font partie
+    version = await project_list_version(session, condition)
+    etag = make_etag(list_key, version, "list", limit, cursor, projection)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    
+    projects, next_cursor = await fetch_page(
+        session, Project, [condition], PROJECT_ORDER, cursor, limit, projection
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if projection:
+        return projected_response(projects, response)
     return projects
 
 
@@ -78,48 +119,60 @@ def list_projects(
 # Détails d'un projet spécifique
 # ───────────────────────────────────────────────
 @router.get("/{project_id}", response_model=schemas.project.ProjectOut)
-def get_project(
+async def get_project(
     project_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
 ):
-    project = session.get(Project, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Projet non trouvé")
-    
-    # Vérifier accès (MVP : propriétaire de l'équipe)
-    team = session.get(Team, project.team_id)
-    if not team or team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Accès non autorisé")
-    
-    return project
+    # Droits en cache + board inchangé (révision lue par clé primaire) → 304
+    await access.ensure_project_access(project_id)
+    etag = make_etag(project_key(project_id), await project_revision(session, project_id), "project")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    # Projet + vérification d'accès (MVP : propriétaire de l'équipe) en une requête
+    return await access.load_project(project_id)
 
 
 # ───────────────────────────────────────────────
 # Modifier un projet (nom, description, statut)
 # ───────────────────────────────────────────────
 @router.patch("/{project_id}", response_model=schemas.project.ProjectOut)
-def update_project(
+async def update_project(
     project_id: int,
     project_update: schemas.project.ProjectUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
 ):
-    project = session.get(Project, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Projet non trouvé")
-    
-    # Vérifier que l'utilisateur est le créateur ou propriétaire de l'équipe (MVP)
-    team = session.get(Team, project.team_id)
-    if not team or team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Seul le propriétaire de l'équipe peut modifier le projet")
+    # Vérifier que l'utilisateur est le propriétaire de l'équipe (MVP)
+    project = await access.load_project(
+        project_id,
+        "Seul le propriétaire de l'équipe peut modifier le projet"
+    )
     
     update_data = project_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(project, key, value)
+    project.updated_at = datetime.utcnow()
     
     session.add(project)
-    session.commit()
-    session.refresh(project)
+    revision = await next_project_revision(session, project.id)
+
+    # Chaque révision a son événement (rejeu complet à la reconnexion)
+    add_event(session, project.id, revision, {
+        "event_type": "project_updated",
+        "data": update_data,
+        "updated_by": current_user.id
+    })
+
+    await session.commit()
+    await session.refresh(project)
+    invalidate_project(project.id)
+    outbox_dispatcher.wake()
     
     return project
@@ -3,155 +3,432 @@
 Routes API pour les Tâches (Tasks)
 - CRUD basique pour les tâches d'un projet
 - Mise à jour du statut (drag & drop)
-- Broadcast WebSocket après chaque modification importante
+- Synchronisation incrémentale : GET /tasks/changes (seulement ce qui a changé)
+- Lectures conditionnelles : ETag (révision persistée du projet) + If-None-Match → 304
+- Événement WebSocket écrit dans l'outbox, dans la transaction de la modification
+  (diffusé ensuite par le dispatcher de fond, voir outbox.py)
+- Opérations groupées : POST /tasks/batch (création / modification / déplacement)
+- Liste paginée par clé (limit / cursor) et projection de champs (fields)
+- Flux NDJSON pour les gros projets : Accept: application/x-ndjson ou GET /tasks/export
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import select, Session
-from typing import List, Annotated
+import base64
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, List, Literal, Annotated, Optional, Tuple
 
 from .. import models, schemas
-from ..dependencies import get_current_user, get_session
-from ..models.user import User
-from ..models.project import Project
+from ..config import settings
+from ..dependencies import CurrentUser, get_current_user, get_async_session
+from ..pagination import (
+    KeysetOrder,
+    fetch_page,
+    ndjson_response,
+    parse_fields,
+    projected_response,
+    wants_ndjson,
+)
+from ..permissions import AccessResolver, get_access, task_projects
+from ..revisions import make_etag, next_project_revision, not_modified, project_key, project_revision
+from ..outbox import add_event, outbox_dispatcher
 from ..models.task import Task
-from ..websocket.kanban_ws import broadcast_to_project
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+# ───────────────────────────────────────────────
+# Curseur opaque de synchronisation : révision du projet déjà reçue
+# (chaque modification de tâche reçoit une révision unique dans son projet)
+# ───────────────────────────────────────────────
+def encode_cursor(revision: int) -> str:
+    return base64.urlsafe_b64encode(f"r{revision}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if not raw.startswith("r"):
+            raise ValueError(raw)
+        return int(raw[1:])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur de synchronisation invalide")
+
+
 # ───────────────────────────────────────────────
 # Créer une nouvelle tâche dans un projet
 # ───────────────────────────────────────────────
 @router.post("/", response_model=schemas.task.TaskOut, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task_create: schemas.task.TaskCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
 ):
     # Vérifier que le projet existe et que l'utilisateur y a accès (MVP : propriétaire de l'équipe)
-    project = session.get(Project, task_create.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Projet non trouvé")
-
-    team = session.get(models.team.Team, project.team_id)
-    if not team or team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Accès non autorisé à ce projet (MVP)")
+    await access.ensure_project_access(task_create.project_id, "Accès non autorisé à ce projet (MVP)")
 
     db_task = Task(
         **task_create.dict(),
         created_by=current_user.id
     )
+    # updated_at renseigné dès la création : la tâche apparaît dans /tasks/changes
+    db_task.updated_at = db_task.created_at
+    # Révision du projet incrémentée dans la même transaction que l'insertion
+    db_task.revision = await next_project_revision(session, db_task.project_id)
 
     session.add(db_task)
-    session.commit()
-    session.refresh(db_task)
-
-    # Broadcast WebSocket : nouvelle tâche créée
-    broadcast_to_project(
-        project_id=task_create.project_id,
-        event={
-            "event_type": "task_created",
-            "task_id": db_task.id,
-            "project_id": project.id,
-            "data": schemas.task.TaskOut.from_orm(db_task).dict(),
-            "updated_by": current_user.id
-        }
-    )
+    await session.flush()  # id attribué, nécessaire à l'événement
+
+    # Événement WebSocket : nouvelle tâche créée (même transaction)
+    add_event(session, db_task.project_id, db_task.revision, {
+        "event_type": "task_created",
+        "task_id": db_task.id,
+        "data": schemas.task.TaskOut.from_orm(db_task).dict(),
+        "updated_by": current_user.id
+    })
+
+    await session.commit()
+    await session.refresh(db_task)
+    task_projects.set(db_task.id, db_task.project_id)
+    outbox_dispatcher.wake()
 
     return db_task
 
 
+# ───────────────────────────────────────────────
+# Opérations groupées (import de backlog, fin de sprint...) en une transaction
+# - droits vérifiés une fois par projet, pas une fois par tâche
+# - INSERT et UPDATE en executemany ; l'UPDATE n'écrit que les champs fournis
+#   par les opérations (un PATCH concurrent sur les autres champs est conservé)
+# - un bloc de révisions et UN événement WebSocket "batch" par projet
+#   (chaque tâche y garde son propre seq : reprise via ?since= inchangée)
+# ───────────────────────────────────────────────
+
+
+@router.post("/batch", response_model=schemas.task.TaskBatchResult)
+async def batch_tasks(
+    batch: schemas.task.TaskBatchRequest,
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
+):
+    operations = batch.operations
+    if len(operations) > settings.TASK_BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Au plus {settings.TASK_BATCH_MAX_OPERATIONS} opérations par requête"
+        )
+
+    # Tâches existantes visées : une seule lecture
+    task_ids = {op.task_id for op in operations if op.op != "create"}
+    existing: Dict[int, schemas.task.TaskOut] = {}
+    if task_ids:
+        rows = (await session.exec(select(Task).where(Task.id.in_(task_ids)))).all()
+        existing = {task.id: schemas.task.TaskOut.from_orm(task) for task in rows}
+        missing = task_ids - existing.keys()
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Tâches non trouvées : {sorted(missing)}")
+
+    # Droits : une vérification par projet concerné
+    project_ids = {op.task.project_id for op in operations if op.op == "create"}
+    project_ids |= {task.project_id for task in existing.values()}
+    for project_id in sorted(project_ids):
+        await access.ensure_project_access(project_id, "Accès non autorisé à ce projet (MVP)")
+
+    # État final de chaque tâche (plusieurs opérations sur une même tâche → une écriture)
+    now = datetime.utcnow()
+    created: List[dict] = []
+    updated: Dict[int, schemas.task.TaskOut] = {}
+    # Champs réellement modifiés par tâche (seuls ceux-là sont écrits)
+    changed_fields: Dict[int, set] = {}
+    # Clés ("new", index dans created) | ("task", id), dans l'ordre des opérations
+    touched: Dict[Tuple[str, int], int] = {}
+    for op in operations:
+        if op.op == "create":
+            created.append({**op.task.dict(), "created_by": current_user.id, "created_at": now, "updated_at": now})
+            key, project_id = ("new", len(created) - 1), op.task.project_id
+        else:
+            changes = op.changes.dict(exclude_unset=True) if op.op == "update" else {"status": op.status}
+            previous = updated.get(op.task_id, existing[op.task_id])
+            updated[op.task_id] = previous.copy(update={**changes, "updated_at": now})
+            changed_fields.setdefault(op.task_id, set()).update(changes)
+            key, project_id = ("task", op.task_id), previous.project_id
+        touched.setdefault(key, project_id)
+
+    # Un bloc de révisions par projet, attribuées dans l'ordre des opérations
+    keys_by_project: Dict[int, List[Tuple[str, int]]] = {}
+    for key, project_id in touched.items():
+        keys_by_project.setdefault(project_id, []).append(key)
+    revisions: Dict[int, int] = {}
+    revision_of: Dict[Tuple[str, int], int] = {}
+    for project_id, keys in keys_by_project.items():
+        last = await next_project_revision(session, project_id, len(keys))
+        revisions[project_id] = last
+        for offset, key in enumerate(keys):
+            revision_of[key] = last - len(keys) + 1 + offset
+
+    # INSERT groupé ; RETURNING dans l'ordre des paramètres → ids des nouvelles tâches
+    results: Dict[Tuple[str, int], schemas.task.TaskOut] = {}
+    if created:
+        for index, row in enumerate(created):
+            row["revision"] = revision_of[("new", index)]
+        statement = insert(Task).returning(Task.id, sort_by_parameter_order=True)
+        new_ids = (await session.execute(statement, created)).scalars().all()
+        for index, (task_id, row) in enumerate(zip(new_ids, created)):
+            results[("new", index)] = schemas.task.TaskOut(id=task_id, **row)
+
+    # UPDATE groupé par clé primaire : un executemany par ensemble de colonnes
+    if updated:
+        groups: Dict[frozenset, List[dict]] = {}
+        for task_id, fields in changed_fields.items():
+            groups.setdefault(frozenset(fields), []).append({
+                "id": task_id,
+                **{name: getattr(updated[task_id], name) for name in fields},
+                "updated_at": now,
+                "revision": revision_of[("task", task_id)],
+            })
+        for rows in groups.values():
+            await session.execute(update(Task), rows)
+        # État final relu dans la transaction d'écriture (verrou SQLite déjà
+        # pris) : les champs non touchés sont ceux de la base, pas de la lecture initiale
+        statement = select(Task).where(Task.id.in_(updated)).execution_options(populate_existing=True)
+        for task in (await session.exec(statement)).all():
+            results[("task", task.id)] = schemas.task.TaskOut.from_orm(task)
+
+    # Un événement par projet, contenant un événement numéroté par tâche
+    for project_id, keys in keys_by_project.items():
+        events = [
+            {
+                "event_type": "task_created" if key[0] == "new" else "task_updated",
+                "task_id": results[key].id,
+                "project_id": project_id,
+                "seq": revision_of[key],
+                "data": results[key].dict(),
+                "updated_by": current_user.id,
+            }
+            for key in keys
+        ]
+        add_event(session, project_id, revisions[project_id], {
+            "event_type": "batch",
+            "seq_from": events[0]["seq"],
+            "events": events,
+            "updated_by": current_user.id,
+        })
+
+    await session.commit()
+    for key, task in results.items():
+        if key[0] == "new":
+            task_projects.set(task.id, task.project_id)
+    outbox_dispatcher.wake()
+
+    return {"tasks": [results[key] for key in touched], "revisions": revisions}
+
+
 # ───────────────────────────────────────────────
 # Lister les tâches d'un projet (filtré par status optionnel)
+# Pagination par clé (limit + cursor, suite dans X-Next-Cursor) :
+# - order=updated : plus récemment modifiées d'abord (updated_at, id)
+# - order=board : colonne par colonne (status, id)
+# fields=id,title,status : projection (cartes sans description)
+# Accept: application/x-ndjson : tout (après cursor) en flux, sans limit
 # ───────────────────────────────────────────────
+TASK_ORDERS = {
+    "updated": KeysetOrder("updated", Task, ["updated_at", "id"], descending=True),
+    "board": KeysetOrder("board", Task, ["status", "id"]),
+}
+
+
 @router.get("/", response_model=List[schemas.task.TaskOut])
-def list_tasks(
+async def list_tasks(
     project_id: int,
+    request: Request,
+    response: Response,
+    access: Annotated[AccessResolver, Depends(get_access)],
     status: str | None = None,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_MAX_LIMIT, description="Taille de page (sans : tout)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor de la page précédente"),
+    order: Literal["updated", "board"] = Query("updated"),
+    fields: Optional[str] = Query(None, description="Champs à renvoyer, séparés par des virgules"),
+    session: AsyncSession = Depends(get_async_session)
 ):
-    project = session.get(Project, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Projet non trouvé")
+    await access.ensure_project_access(project_id)
+    projection = parse_fields(fields, schemas.task.TaskOut)
+    stream = wants_ndjson(request)
 
-    team = session.get(models.team.Team, project.team_id)
-    if not team or team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Accès non autorisé")
+    # ETag calculé AVANT la lecture : au pire il est plus ancien que le contenu
+    revision = await project_revision(session, project_id)
+    etag = make_etag(project_key(project_id), revision, "list", status, limit, cursor, order, projection, stream)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    response.headers["Vary"] = "Accept"
 
-    statement = select(Task).where(Task.project_id == project_id)
+    conditions = [Task.project_id == project_id]
     if status:
-        statement = statement.where(Task.status == status)
+        conditions.append(Task.status == status)
 
-    tasks = session.exec(statement).all()
+    if stream:
+        return ndjson_response(
+            Task, schemas.task.TaskOut, conditions, TASK_ORDERS[order], cursor, projection,
+            settings.STREAM_BATCH_SIZE, response,
+        )
+
+    tasks, next_cursor = await fetch_page(
+        session, Task, conditions, TASK_ORDERS[order], cursor, limit, projection
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if projection:
+        return projected_response(tasks, response)
     return tasks
 
 
+# ───────────────────────────────────────────────
+# Export complet d'un projet en NDJSON (historique archivé, 100k+ tâches)
+# Même filtres que la liste ; toujours en flux, mémoire constante
+# Déclaré avant /{task_id} pour ne pas être capturé par cette route
+# ───────────────────────────────────────────────
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    project_id: int,
+    request: Request,
+    response: Response,
+    access: Annotated[AccessResolver, Depends(get_access)],
+    status: str | None = None,
+    order: Literal["updated", "board"] = Query("board"),
+    fields: Optional[str] = Query(None, description="Champs à exporter, séparés par des virgules"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    await access.ensure_project_access(project_id)
+    projection = parse_fields(fields, schemas.task.TaskOut)
+
+    revision = await project_revision(session, project_id)
+    etag = make_etag(project_key(project_id), revision, "export", status, order, projection)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+    response.headers["Content-Disposition"] = f'attachment; filename="project-{project_id}-tasks.ndjson"'
+
+    conditions = [Task.project_id == project_id]
+    if status:
+        conditions.append(Task.status == status)
+    return ndjson_response(
+        Task, schemas.task.TaskOut, conditions, TASK_ORDERS[order], None, projection,
+        settings.STREAM_BATCH_SIZE, response,
+    )
+
+
+# ───────────────────────────────────────────────
+# Changements depuis un curseur (polling incrémental du board)
+# Sans "since" : toutes les tâches du projet + curseur initial
+# Déclaré avant /{task_id} pour ne pas être capturé par cette route
+# ───────────────────────────────────────────────
+@router.get("/changes", response_model=schemas.task.TaskChanges)
+async def list_task_changes(
+    project_id: int,
+    request: Request,
+    response: Response,
+    access: Annotated[AccessResolver, Depends(get_access)],
+    since: Optional[str] = Query(None, description="Curseur renvoyé par l'appel précédent"),
+    limit: int = Query(500, ge=1, le=2000),
+    session: AsyncSession = Depends(get_async_session)
+):
+    await access.ensure_project_access(project_id)
+
+    # Board inchangé depuis ce curseur → 304 sans relire les tâches
+    revision = await project_revision(session, project_id)
+    etag = make_etag(project_key(project_id), revision, "changes", since, limit)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    # Parcours de l'index (project_id, revision) à partir du curseur
+    statement = select(Task).where(Task.project_id == project_id)
+    if since:
+        statement = statement.where(Task.revision > decode_cursor(since))
+    statement = statement.order_by(Task.revision, Task.id).limit(limit + 1)
+
+    tasks = (await session.exec(statement)).all()
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    # Rien de nouveau → on renvoie le même curseur
+    cursor = encode_cursor(tasks[-1].revision) if tasks else since
+
+    return {
+        "tasks": tasks,
+        "deleted": [],  # pas encore de suppression de tâche côté API
+        "cursor": cursor,
+        "has_more": has_more,
+    }
+
+
 # ───────────────────────────────────────────────
 # Détails d'une tâche spécifique
 # ───────────────────────────────────────────────
 @router.get("/{task_id}", response_model=schemas.task.TaskOut)
-def get_task(
+async def get_task(
     task_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
 ):
-    task = session.get(Task, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Tâche non trouvée")
+    # Projet de la tâche déjà connu → droits en cache + révision du projet
+    # (clé primaire) : 304 sans charger la tâche
+    project_id = access.cached_task_project(task_id)
+    if project_id is not None:
+        await access.ensure_project_access(project_id)
+        revision = await project_revision(session, project_id)
+        etag = make_etag(project_key(project_id), revision, "task", task_id)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        response.headers["ETag"] = etag
 
-    project = session.get(Project, task.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Projet associé introuvable")
-
-    team = session.get(models.team.Team, project.team_id)
-    if not team or team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Accès non autorisé")
-
-    return task
+    # Tâche + projet + équipe en une seule requête jointe
+    # (projet inconnu : pas d'ETag cette fois, il sera émis au prochain appel)
+    return await access.load_task(task_id)
 
 
 # ───────────────────────────────────────────────
 # Mettre à jour une tâche (statut, titre, priorité, etc.)
 # ───────────────────────────────────────────────
 @router.patch("/{task_id}", response_model=schemas.task.TaskOut)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: schemas.task.TaskUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
 ):
-    task = session.get(Task, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Tâche non trouvée")
-
-    project = session.get(Project, task.project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Projet associé introuvable")
-
-    team = session.get(models.team.Team, project.team_id)
-    if not team or team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Accès non autorisé (MVP)")
+    task = await access.load_task(task_id, "Accès non autorisé (MVP)")
 
     update_data = task_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(task, key, value)
+    task.updated_at = datetime.utcnow()
+    task.revision = await next_project_revision(session, task.project_id)
 
     session.add(task)
-    session.commit()
-    session.refresh(task)
-
-    # Broadcast WebSocket : tâche modifiée (important pour drag & drop)
-    broadcast_to_project(
-        project_id=project.id,
-        event={
-            "event_type": "task_updated",
-            "task_id": task.id,
-            "project_id": project.id,
-            "data": schemas.task.TaskOut.from_orm(task).dict(),
-            "updated_by": current_user.id
-        }
-    )
+
+    # Événement WebSocket : tâche modifiée (important pour drag & drop)
+    add_event(session, task.project_id, task.revision, {
+        "event_type": "task_updated",
+        "task_id": task.id,
+        "data": schemas.task.TaskOut.from_orm(task).dict(),
+        "updated_by": current_user.id
+    })
+
+    await session.commit()
+    await session.refresh(task)
+    outbox_dispatcher.wake()
 
     return task
@@ -6,13 +6,14 @@ Routes API pour les équipes (Teams)
 - Permissions basiques : seul le propriétaire peut modifier pour MVP
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import select, Session
+from fastapi import APIRouter, Depends, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Annotated
 
 from .. import models, schemas
-from ..dependencies import get_current_user, get_session
-from ..models.user import User
+from ..dependencies import CurrentUser, get_current_user, get_async_session
+from ..permissions import AccessResolver, get_access, invalidate_team
 from ..models.team import Team
 
 router = APIRouter(prefix="/teams", tags=["teams"])
@@ -22,14 +23,14 @@ router = APIRouter(prefix="/teams", tags=["teams"])
 # Liste des équipes de l'utilisateur connecté
 # ───────────────────────────────────────────────
 @router.get("/my-teams", response_model=List[schemas.team.TeamOut])
-def get_my_teams(
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+async def get_my_teams(
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    session: AsyncSession = Depends(get_async_session)
 ):
     # Pour MVP : on retourne seulement les équipes où l'utilisateur est propriétaire
     # (plus tard : ajouter table TeamMember pour les équipes où il est invité/membre)
     statement = select(Team).where(Team.owner_id == current_user.id)
-    teams = session.exec(statement).all()
+    teams = (await session.exec(statement)).all()
     return teams
 
 
@@ -37,10 +38,10 @@ def get_my_teams(
 # Créer une nouvelle équipe
 # ───────────────────────────────────────────────
 @router.post("/", response_model=schemas.team.TeamOut, status_code=status.HTTP_201_CREATED)
-def create_team(
+async def create_team(
     team_create: schemas.team.TeamCreate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    session: AsyncSession = Depends(get_async_session)
 ):
     # Créer l'équipe avec l'utilisateur courant comme propriétaire
     db_team = Team(
@@ -49,8 +50,8 @@ def create_team(
     )
     
     session.add(db_team)
-    session.commit()
-    session.refresh(db_team)
+    await session.commit()
+    await session.refresh(db_team)
     
     return db_team
 
@@ -59,40 +60,27 @@ def create_team(
 # Détails d'une équipe spécifique
 # ───────────────────────────────────────────────
 @router.get("/{team_id}", response_model=schemas.team.TeamOut)
-def get_team(
+async def get_team(
     team_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    access: Annotated[AccessResolver, Depends(get_access)],
 ):
-    team = session.get(Team, team_id)
-    if not team:
-        raise HTTPException(status_code=404, detail="Équipe non trouvée")
-    
     # Pour MVP : autoriser la vue si propriétaire
     # (plus tard : autoriser si membre via TeamMember)
-    if team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Accès non autorisé")
-    
-    return team
+    return await access.load_team(team_id)
 
 
 # ───────────────────────────────────────────────
 # Modifier une équipe (nom, description, etc.)
 # ───────────────────────────────────────────────
 @router.patch("/{team_id}", response_model=schemas.team.TeamOut)
-def update_team(
+async def update_team(
     team_id: int,
     team_update: schemas.team.TeamUpdate,
-    current_user: Annotated[User, Depends(get_current_user)],
-    session: Session = Depends(get_session)
+    access: Annotated[AccessResolver, Depends(get_access)],
+    session: AsyncSession = Depends(get_async_session)
 ):
-    team = session.get(Team, team_id)
-    if not team:
-        raise HTTPException(status_code=404, detail="Équipe non trouvée")
-    
     # Seul le propriétaire peut modifier pour le MVP
-    if team.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Seul le propriétaire peut modifier l'équipe")
+    team = await access.load_team(team_id, "Seul le propriétaire peut modifier l'équipe")
     
     # Mise à jour des champs fournis
     update_data = team_update.dict(exclude_unset=True)
@@ -100,7 +88,8 @@ def update_team(
         setattr(team, key, value)
     
     session.add(team)
-    session.commit()
-    session.refresh(team)
+    await session.commit()
+    await session.refresh(team)
+    invalidate_team(team.id)
     
     return team
@@ -8,6 +8,7 @@ Configuration globale de l'application
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import List
 
 # ───────────────────────────────────────────────
 # Classe de configuration (pydantic-settings)
@@ -28,6 +29,118 @@ class Settings(BaseSettings):
     # Mode développement (active les logs détaillés, reload, etc.)
     DEBUG: bool = True
 
+    # Serveur (backend/run.py) : adresse, port, nombre de workers (0 = un par cœur)
+    # et délai max pour terminer les requêtes en cours à l'arrêt
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 1
+    SERVER_SHUTDOWN_GRACE_SECONDS: float = 10.0
+
+    # GET /metrics (compteurs internes, sans authentification) : à n'activer
+    # que derrière un réseau de confiance ; désactivé → 404
+    METRICS_ENABLED: bool = False
+
+    # Profil SQLite appliqué à chaque connexion (engines sync et async)
+    # WAL : lectures concurrentes pendant les écritures (PATCH /tasks en parallèle)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    # NORMAL est sûr en WAL (pas de corruption, seul le dernier commit peut être perdu en cas de coupure)
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    # Attente max (ms) sur un verrou avant "database is locked"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    # Cache de pages par connexion, en Kio (converti en valeur négative pour PRAGMA cache_size)
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    # Taille max du mapping mémoire du fichier (0 = désactivé)
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    # Tables/index temporaires : DEFAULT, FILE ou MEMORY
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    # Affiche le profil complet au démarrage de chaque worker (sinon seulement les écarts)
+    SQLITE_LOG_PROFILE: bool = False
+
+    # Cache des décisions d'accès (user, projet) / (user, équipe)
+    ACL_CACHE_MAX_ENTRIES: int = 10_000
+    ACL_CACHE_TTL_SECONDS: int = 300
+
+    # Cache des tokens JWT déjà vérifiés (clé = empreinte SHA-256, borné par "exp")
+    TOKEN_CACHE_MAX_ENTRIES: int = 50_000
+    TOKEN_CACHE_TTL_SECONDS: int = 3600
+    # Cache court des utilisateurs (par user_id) : borne le délai de prise en compte de is_active
+    USER_CACHE_MAX_ENTRIES: int = 10_000
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # Hashage bcrypt : coût (2^rounds itérations) ; un changement déclenche un rehash au login
+    BCRYPT_ROUNDS: int = 12
+    # Pool dédié au hashage (bcrypt libère le GIL → de vrais threads parallèles)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Nombre max de hashages en cours + en attente ; au-delà → 503 immédiat
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Broadcast WebSocket : événements en attente max par projet (au-delà : les plus anciens sont perdus)
+    WS_BROADCAST_MAX_PENDING: int = 10_000
+    # Événements envoyés par projet et par tour de boucle (évite d'affamer la boucle Tornado)
+    WS_BROADCAST_BATCH_SIZE: int = 100
+    # Fenêtre de fusion des événements par projet, en ms (0 = envoi immédiat, ex: 50)
+    # Les événements de la fenêtre partent en une trame {"event_type": "batch", "events": [...]}
+    WS_COALESCE_WINDOW_MS: int = 0
+    # File d'envoi par connexion WebSocket : bornes (messages et octets) + politique de débordement
+    WS_OUTBOX_MAX_MESSAGES: int = 256
+    WS_OUTBOX_MAX_BYTES: int = 1024 * 1024
+    # drop_oldest | coalesce | disconnect (fermeture + indice "resync_required")
+    WS_OUTBOX_OVERFLOW_POLICY: str = "coalesce"
+    # Reprise après reconnexion (?since=<seq>) : événements gardés par projet, nb de projets suivis
+    WS_REPLAY_BUFFER_SIZE: int = 500
+    WS_REPLAY_MAX_PROJECTS: int = 1000
+    # Au-delà du tampon mémoire : rejeu depuis la table outbox, jusqu'à N événements
+    WS_REPLAY_MAX_STORED: int = 2000
+    # Origines autorisées pour /ws/kanban en plus du même hôte (liste JSON dans .env)
+    WS_ALLOWED_ORIGINS: List[str] = ["http://localhost:8050", "http://127.0.0.1:8050"]
+    # permessage-deflate : niveau zlib (1 = rapide … 9 = compact) et mémoire par connexion (1 … 9)
+    WS_COMPRESSION_ENABLED: bool = True
+    WS_COMPRESSION_LEVEL: int = 6
+    WS_COMPRESSION_MEM_LEVEL: int = 5
+
+    # POST /tasks/batch : nombre max d'opérations par requête
+    TASK_BATCH_MAX_OPERATIONS: int = 1000
+    # GET /tasks et GET /projects : taille max d'une page (?limit=)
+    PAGE_MAX_LIMIT: int = 500
+    # Listes NDJSON (Accept: application/x-ndjson, /tasks/export) : lignes lues par lot
+    STREAM_BATCH_SIZE: int = 1000
+
+    # Vivacité des sockets : ping Tornado (0 = désactivé) et délai max pour le pong,
+    # fermeture après N s sans aucun trafic entrant (0 = jamais ; ignorée si le ping
+    # est désactivé), période du nettoyeur
+    WS_PING_INTERVAL_SECONDS: float = 20.0
+    WS_PING_TIMEOUT_SECONDS: float = 10.0
+    WS_IDLE_TIMEOUT_SECONDS: float = 120.0
+    WS_REAP_INTERVAL_SECONDS: float = 15.0
+    # Arrêt coordonné : délai de reconnexion suggéré aux clients, tiré au hasard
+    # dans [min, max] ms (pas de reconnexion en masse), et attente max du vidage
+    # des files avant fermeture des sockets
+    WS_RECONNECT_JITTER_MIN_MS: int = 1000
+    WS_RECONNECT_JITTER_MAX_MS: int = 15000
+    WS_DRAIN_TIMEOUT_SECONDS: float = 5.0
+    # Présence par board : au plus un delta par projet et par intervalle (ms),
+    # heartbeat entre workers et expiration des spectateurs d'un worker muet
+    PRESENCE_THROTTLE_MS: int = 1000
+    PRESENCE_HEARTBEAT_SECONDS: float = 10.0
+    PRESENCE_TTL_SECONDS: float = 30.0
+
+    # Outbox des événements temps réel : taille des lots, attente max sans réveil
+    # (et relève du leader), rétention des lignes livrées
+    OUTBOX_BATCH_SIZE: int = 200
+    OUTBOX_POLL_INTERVAL_MS: int = 500
+    OUTBOX_RETENTION_HOURS: int = 24
+    OUTBOX_PRUNE_INTERVAL_SECONDS: int = 600
+
+    # Bus d'événements entre workers : "local" (un seul process) ou "unix" (sockets Unix en flux)
+    EVENT_BUS_BACKEND: str = "local"
+    EVENT_BUS_SOCKET_DIR: str = "/tmp/task-manager-bus"
+    # Fréquence de redécouverte des autres workers (fichiers *.sock du répertoire)
+    EVENT_BUS_PEER_REFRESH_SECONDS: float = 1.0
+    # Octets en attente max vers un pair qui ne lit plus (au-delà : messages perdus)
+    EVENT_BUS_MAX_PENDING_BYTES: int = 16 * 1024 * 1024
+    # À l'arrêt du leader outbox : attente max de l'envoi de ses derniers messages
+    EVENT_BUS_FLUSH_TIMEOUT_SECONDS: float = 5.0
+
     # Modèle de configuration : cherche un fichier .env à la racine du projet
     model_config = SettingsConfigDict(
         env_file=Path(__file__).resolve().parent.parent.parent / ".env",
@@ -2,7 +2,11 @@
 import os
 from pathlib import Path
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import settings
 
 # ───────────────────────────────────────────────
 # Configuration de la base de données
@@ -13,8 +17,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATABASE_DIR = BASE_DIR / "database"
 DATABASE_DIR.mkdir(exist_ok=True)  # Crée le dossier s'il n'existe pas
 
-DATABASE_URL = f"sqlite:///{DATABASE_DIR / 'app.db'}"
-ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_DIR / 'app.db'}"
+# DATABASE_URL (config / .env) : autre fichier SQLite, ex. base jetable des tests
+DATABASE_URL = settings.DATABASE_URL or f"sqlite:///{DATABASE_DIR / 'app.db'}"
+ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 
 # Engine synchrone (pour migrations ou scripts init)
 engine = create_engine(
@@ -23,31 +28,130 @@ engine = create_engine(
     echo=False  # Passe à True pour voir les requêtes SQL en dev
 )
 
-# Engine asynchrone (optionnel pour l'instant, mais prêt pour plus tard)
+# Engine asynchrone (utilisé par toutes les routes API)
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
     echo=False
 )
 
-# Session maker synchrone
+# ───────────────────────────────────────────────
+# Profil SQLite (PRAGMA) appliqué à chaque nouvelle connexion
+# ───────────────────────────────────────────────
+
+def sqlite_pragmas() -> dict:
+    """PRAGMA à appliquer, construits depuis les settings"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -abs(settings.SQLITE_CACHE_SIZE_KB),  # négatif = taille en Kio
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Listener 'connect' : fonctionne pour sqlite3 et pour l'adaptateur aiosqlite"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+event.listen(engine, "connect", _apply_sqlite_pragmas)
+event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
+
+# Valeurs symboliques → valeur numérique renvoyée par SQLite à la lecture
+_PRAGMA_CODES = {
+    "synchronous": {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3},
+    "temp_store": {"DEFAULT": 0, "FILE": 1, "MEMORY": 2},
+}
+
+
+def _read_pragmas(conn) -> dict:
+    return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in sqlite_pragmas()}
+
+
+def sqlite_pragma_report() -> dict:
+    """Lit les PRAGMA réellement en vigueur sur une connexion du pool"""
+    with engine.connect() as conn:
+        return _read_pragmas(conn)
+
+
+async def async_sqlite_pragma_report() -> dict:
+    """Même rapport sur une connexion du pool asynchrone (aiosqlite, routes API)"""
+    async with async_engine.connect() as conn:
+        return await conn.run_sync(_read_pragmas)
+
+
+def sqlite_pragma_mismatches(effective: dict) -> dict:
+    """PRAGMA dont la valeur effective diffère de la demande → (effective, demandée)"""
+    mismatches = {}
+    for name, expected in sqlite_pragmas().items():
+        wanted = _PRAGMA_CODES.get(name, {}).get(str(expected).upper(), expected)
+        value = effective.get(name)
+        if str(value).lower() != str(wanted).lower():
+            mismatches[name] = (value, expected)
+    return mismatches
+
+
+def log_sqlite_profile():
+    """
+    Démarrage de chaque worker : silencieux si le profil demandé est appliqué,
+    une ligne par PRAGMA refusé sinon (ex: WAL impossible sur ce système de
+    fichiers) ; SQLITE_LOG_PROFILE=true affiche tout le profil
+    """
+    effective = sqlite_pragma_report()
+    if settings.SQLITE_LOG_PROFILE:
+        print(f"Profil SQLite en vigueur : {effective}")
+    for name, (value, expected) in sqlite_pragma_mismatches(effective).items():
+        print(f"Attention : PRAGMA {name} = {value} (demandé : {expected})")
+    return effective
+
+
+def checkpoint_wal() -> dict:
+    """
+    Arrêt du serveur : recopie le WAL dans la base et le tronque ; un
+    redémarrage ou une copie du fichier .db repart d'un état compact.
+    busy = 1 si un autre process lisait encore (checkpoint partiel).
+    """
+    with engine.connect() as conn:
+        busy, log_frames, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one()
+    print(f"Checkpoint WAL : {checkpointed}/{log_frames} pages recopiées (busy={busy})")
+    return {"busy": busy, "log_frames": log_frames, "checkpointed": checkpointed}
+
+
+# Session maker synchrone (scripts, init, outils hors requêtes HTTP)
 def get_session() -> Session:
     with Session(engine) as session:
         yield session
 
-# Session maker asynchrone (si on passe à async routes plus tard)
+# Session maker asynchrone (routes FastAPI async)
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
     expire_on_commit=False,
-    class_=Session
+    class_=AsyncSession
 )
 
+# Dépendance FastAPI : une session async par requête
+async def get_async_session() -> AsyncSession:
+    async with AsyncSessionLocal() as session:
+        yield session
+
 # ───────────────────────────────────────────────
 # Création des tables (exécuter une fois au démarrage ou via migration)
 # ───────────────────────────────────────────────
 
 def create_db_and_tables():
-    """Crée toutes les tables si elles n'existent pas"""
+    """Crée toutes les tables si elles n'existent pas, puis applique les migrations"""
+    from . import models  # noqa: F401  (enregistre toutes les tables dans la metadata)
+    from .migrations import run_migrations
+
     SQLModel.metadata.create_all(engine)
+    run_migrations(engine)
 
 # ───────────────────────────────────────────────
 # Exécuter la création des tables au démarrage (pour MVP)
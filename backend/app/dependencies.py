@@ -3,9 +3,14 @@
 Dépendances FastAPI pour l'authentification JWT
 - Gestion des tokens JWT (création, validation)
 - Récupération de l'utilisateur courant à partir du token
+- Caches : tokens déjà vérifiés (jusqu'à leur "exp") + utilisateurs (TTL court),
+  ces derniers sous forme d'instantanés immuables (CurrentUser), jamais
+  d'objets ORM partagés entre sessions
 - Exceptions personnalisées pour les erreurs d'auth
 """
 
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
 from fastapi import Depends, HTTPException, status
@@ -13,11 +18,13 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
-from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .database import get_session
+from .cache import MISSING, TTLCache
+from .database import get_async_session
 from .models.user import User
 from .config import settings  # On va créer ce fichier après
+from .event_bus import event_bus
 
 # ───────────────────────────────────────────────
 # Configuration de sécurité
@@ -26,8 +33,15 @@ from .config import settings  # On va créer ce fichier après
 # Schéma OAuth2 (Bearer token dans l'en-tête Authorization)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-# Hashage des mots de passe (bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashage des mots de passe (bcrypt), toujours via password_pool (hors boucle)
+# min/max = rounds : tout hash d'un autre coût est signalé "à mettre à jour" (rehash au login)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 # Algorithme JWT (HS256 est standard et suffisant pour MVP)
 ALGORITHM = "HS256"
@@ -43,17 +57,54 @@ class TokenData(BaseModel):
 
 
 # ───────────────────────────────────────────────
-# Fonctions utilitaires pour le hashage et la vérification
+# Utilisateur authentifié : instantané immuable (cache partagé entre requêtes)
 # ───────────────────────────────────────────────
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str] = None
+    is_active: bool
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Vérifie si le mot de passe en clair correspond au hash stocké"""
-    return pwd_context.verify(plain_password, hashed_password)
+    class Config:
+        frozen = True
+        from_attributes = True
 
 
-def get_password_hash(password: str) -> str:
-    """Génère un hash bcrypt à partir d'un mot de passe en clair"""
-    return pwd_context.hash(password)
+# ───────────────────────────────────────────────
+# Caches d'authentification (évitent jwt.decode + SELECT à chaque polling)
+# ───────────────────────────────────────────────
+# empreinte du token → TokenData (jamais le token en clair comme clé)
+token_cache = TTLCache(
+    "jwt",
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+# user_id → CurrentUser
+user_cache = TTLCache(
+    "users",
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user(user_id: int):
+    """
+    À appeler après commit d'une désactivation / modification d'utilisateur
+    (PATCH / DELETE /auth/me) : la prochaine requête relira l'utilisateur en
+    base (dans tous les workers).
+    """
+    event_bus.publish("acl", {"user_id": user_id})
+
+
+def _apply_user_message(message: dict):
+    if "user_id" in message:
+        user_id = message["user_id"]
+        user_cache.invalidate(user_id)
+        token_cache.invalidate_where(lambda key, data: data.user_id == user_id)
+
+
+event_bus.subscribe("acl", _apply_user_message)
 
 
 # ───────────────────────────────────────────────
@@ -71,13 +122,45 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+# ───────────────────────────────────────────────
+# Vérification d'un token JWT (avec cache jusqu'à son expiration)
+# ───────────────────────────────────────────────
+def verify_token(token: str) -> TokenData:
+    """Décode et valide le token ; lève JWTError si invalide ou expiré"""
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    cached = token_cache.get(digest)
+    if cached is not MISSING:
+        return cached
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    username: str = payload.get("sub")
+    user_id: int = payload.get("user_id")
+    if username is None or user_id is None:
+        raise JWTError("Payload incomplet")
+    token_data = TokenData(username=username, user_id=user_id)
+
+    # Le token ne doit pas survivre dans le cache au-delà de son "exp"
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    token_cache.set(digest, token_data, ttl=ttl)
+    return token_data
+
+
 # ───────────────────────────────────────────────
 # Dépendance principale : récupérer l'utilisateur courant à partir du token
 # ───────────────────────────────────────────────
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    session = Depends(get_session)
-) -> User:
+    session: AsyncSession = Depends(get_async_session)
+) -> CurrentUser:
+    return await authenticate_token(token, session)
+
+
+async def authenticate_token(token: str, session: AsyncSession) -> CurrentUser:
+    """
+    Token → utilisateur actif. Chemin chaud (token et utilisateur en cache) :
+    aucune requête SQL. Partagé par les routes HTTP et le handshake WebSocket.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -85,18 +168,17 @@ async def get_current_user(
     )
     
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        user_id: int = payload.get("user_id")
-        if username is None or user_id is None:
-            raise credentials_exception
-        token_data = TokenData(username=username, user_id=user_id)
+        token_data = verify_token(token)
     except JWTError:
         raise credentials_exception
     
-    # Récupérer l'utilisateur en base
-    statement = select(User).where(User.username == token_data.username)
-    user = session.exec(statement).first()
+    # Récupérer l'utilisateur (cache court, sinon en base par clé primaire)
+    user = user_cache.get(token_data.user_id)
+    if user is MISSING:
+        db_user = await session.get(User, token_data.user_id)
+        user = CurrentUser.from_orm(db_user) if db_user is not None else None
+        if user is not None:
+            user_cache.set(user.id, user)
     
     if user is None:
         raise credentials_exception
@@ -115,8 +197,8 @@ async def get_current_user(
 # ───────────────────────────────────────────────
 async def get_current_user_optional(
     token: Annotated[Optional[str], Depends(oauth2_scheme)] = None,
-    session = Depends(get_session)
-) -> Optional[User]:
+    session: AsyncSession = Depends(get_async_session)
+) -> Optional[CurrentUser]:
     if token is None:
         return None
     try:
@@ -0,0 +1,339 @@
+# backend/app/event_bus.py
+"""
+Bus de messages entre les process workers (pub/sub par canal)
+- publish(canal, message) : les abonnés du process courant sont appelés tout
+  de suite, puis le message est relayé aux autres workers
+- Canaux utilisés :
+    * "kanban"    → événements WebSocket (chaque worker sert ses propres sockets)
+    * "acl"       → invalidation des caches de droits et d'utilisateurs
+    * "presence"  → spectateurs de chaque board (instantanés par worker)
+    * "outbox"    → réveil du dispatcher outbox du worker leader
+- Backends (EVENT_BUS_BACKEND) :
+    * local : un seul process, aucun transport (défaut)
+    * unix  : un socket Unix en flux par worker dans EVENT_BUS_SOCKET_DIR ;
+              une connexion persistante vers chaque pair, messages préfixés
+              par leur longueur (pas de limite de taille, ordre conservé).
+              Pairs = tous les *.sock du répertoire, relus périodiquement,
+              quand la liste est vide ou après un échec de connexion ; un
+              worker qui démarre s'annonce aux pairs existants
+- publish() ne bloque jamais : l'envoi se fait sur la boucle du worker ;
+  flush() attend que la file d'envoi soit vidée (arrêt du worker)
+- Les messages distants sont traités sur la boucle d'événements du worker
+- Un pair qui ne lit plus voit sa file d'envoi bornée
+  (EVENT_BUS_MAX_PENDING_BYTES) : au-delà, les messages sont perdus (comptés
+  dans "dropped") ; un pair mort est oublié
+"""
+
+import asyncio
+import os
+import socket
+import struct
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from . import serialization
+from .config import settings
+
+Handler = Callable[[Any], None]
+
+
+# ───────────────────────────────────────────────
+# Backend "local" : un seul process, abonnés appelés directement
+# ───────────────────────────────────────────────
+class LocalEventBus:
+    backend = "local"
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers[channel].append(handler)
+
+    def publish(self, channel: str, message: Any):
+        """Appelable depuis n'importe quel thread ; ne bloque jamais"""
+        with self._lock:
+            self.published += 1
+        self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: Any):
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                handler(message)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"Erreur abonné bus ({channel}) : {e}")
+
+    def start(self):
+        """Au démarrage du worker (dans sa boucle d'événements)"""
+
+    def stop(self):
+        """À l'arrêt du worker"""
+
+    async def flush(self, timeout: float):
+        """Attend que les messages déjà publiés soient partis vers les pairs"""
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "published": self.published,
+                "received": self.received,
+                "errors": self.errors,
+            }
+
+
+# ───────────────────────────────────────────────
+# Backend "unix" : relais par sockets Unix en flux entre workers d'une même machine
+# ───────────────────────────────────────────────
+class _PeerLink:
+    """Connexion sortante vers un pair : file d'envoi bornée, vidée sur la boucle"""
+
+    def __init__(self, bus: "UnixSocketEventBus", path: str):
+        self.bus = bus
+        self.path = path
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: Deque[bytes] = deque()
+        self.pending_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def send(self, frame: bytes):
+        if self.pending_bytes + len(frame) > self.bus.max_pending_bytes:
+            # Pair bloqué (ne lit plus) : on ne grossit pas sans limite
+            self.bus.dropped += 1
+            return
+        self.pending.append(frame)
+        self.pending_bytes += len(frame)
+        if self._task is None:
+            self._task = self.bus._loop.create_task(self._flush())
+
+    async def _flush(self):
+        try:
+            if self.writer is None:
+                _, self.writer = await asyncio.open_unix_connection(self.path)
+            while self.pending:
+                # Tout ce qui est en file part d'un coup, dans l'ordre de publication
+                count = len(self.pending)
+                self.writer.write(b"".join(self.pending))
+                self.pending.clear()
+                self.pending_bytes = 0
+                await self.writer.drain()
+                self.bus.sent += count
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Worker mort sans avoir nettoyé son socket
+            self.bus._forget_peer(self.path)
+        except OSError as e:
+            self.bus.errors += 1
+            print(f"Erreur envoi bus vers {self.path} : {e}")
+            self.close()
+        finally:
+            self._task = None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.bus.dropped += len(self.pending)
+        self.pending.clear()
+        self.pending_bytes = 0
+
+
+class UnixSocketEventBus(LocalEventBus):
+    backend = "unix"
+
+    # Trame : longueur sur 4 octets (big-endian) puis le message JSON
+    HEADER = struct.Struct("!I")
+    # Garde-fou à la réception (un message plus gros = flux corrompu)
+    MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+    # Canal interne : un worker qui démarre annonce le chemin de son socket
+    HELLO = "_hello"
+
+    def __init__(self, directory: str, peer_refresh_seconds: float, max_pending_bytes: int,
+                 name: Optional[str] = None):
+        super().__init__()
+        self.directory = Path(directory)
+        self.peer_refresh_seconds = peer_refresh_seconds
+        self.max_pending_bytes = max_pending_bytes
+        self.name = name
+        self.path: Optional[Path] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listen_sock: Optional[socket.socket] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._inbound: Set[asyncio.StreamWriter] = set()
+        self._links: Dict[str, _PeerLink] = {}
+        self._peers: List[str] = []
+        self._peers_checked_at = 0.0
+        self.sent = 0
+        self.dropped = 0
+
+    def start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Un fichier par process (le pid change à chaque fork de worker)
+        self.path = self.directory / f"{self.name or f'worker-{os.getpid()}'}.sock"
+        if self.path.exists():
+            self.path.unlink()  # Reste d'un ancien process avec le même pid
+
+        # Socket lié tout de suite : les pairs peuvent se connecter avant
+        # que le serveur asyncio ne commence à accepter
+        self._listen_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listen_sock.bind(str(self.path))
+        self._listen_sock.listen(64)
+        self._listen_sock.setblocking(False)
+
+        self._loop = asyncio.get_running_loop()
+        self._loop.create_task(self._serve())
+        self._peers_checked_at = 0.0
+        # Annonce aux pairs déjà présents : ils nous ajoutent sans attendre
+        # leur prochaine redécouverte du répertoire
+        self._send(self._frame(self.HELLO, str(self.path)))
+        print(f"Bus d'événements unix démarré : {self.path}")
+
+    async def flush(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while any(link.pending or link._task is not None for link in list(self._links.values())):
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.01)
+
+    async def _serve(self):
+        self._server = await asyncio.start_unix_server(self._on_peer, sock=self._listen_sock)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        elif self._listen_sock is not None:
+            self._listen_sock.close()
+        self._listen_sock = None
+        for writer in list(self._inbound):
+            writer.close()
+        self._inbound.clear()
+        for link in self._links.values():
+            link.close()
+        self._links.clear()
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+        self._loop = None
+
+    # ─── Émission (tout thread) ─────────────────────────────────────────────
+
+    def publish(self, channel: str, message: Any):
+        super().publish(channel, message)
+        loop = self._loop
+        if loop is None:
+            return  # Bus pas démarré (scripts, tests) : local uniquement
+
+        frame = self._frame(channel, message)
+        try:
+            if asyncio.get_running_loop() is loop:
+                self._send(frame)
+                return
+        except RuntimeError:
+            pass
+        try:
+            loop.call_soon_threadsafe(self._send, frame)
+        except RuntimeError:
+            # Boucle fermée entre-temps (arrêt du worker)
+            with self._lock:
+                self.errors += 1
+
+    def _frame(self, channel: str, message: Any) -> bytes:
+        # Clés entières autorisées (ex: instantanés de présence par project_id)
+        data = serialization.dumps({"c": channel, "m": message}, non_str_keys=True)
+        return self.HEADER.pack(len(data)) + data
+
+    def _send(self, frame: bytes):
+        if self._loop is None:
+            return
+        for peer in self._current_peers():
+            link = self._links.get(peer)
+            if link is None:
+                link = self._links[peer] = _PeerLink(self, peer)
+            link.send(frame)
+
+    def _current_peers(self) -> List[str]:
+        now = time.monotonic()
+        # Liste vide : un pair a pu apparaître depuis le dernier passage
+        if not self._peers or now - self._peers_checked_at >= self.peer_refresh_seconds:
+            own = str(self.path)
+            self._peers = [str(path) for path in self.directory.glob("*.sock") if str(path) != own]
+            self._peers_checked_at = now
+            # Pairs disparus (arrêt propre) : connexion fermée
+            for peer in set(self._links) - set(self._peers):
+                self._links.pop(peer).close()
+        return self._peers
+
+    def _forget_peer(self, peer: str):
+        self._peers = [path for path in self._peers if path != peer]
+        self._peers_checked_at = 0.0  # Redécouverte au prochain envoi
+        link = self._links.pop(peer, None)
+        if link is not None:
+            link.close()
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+
+    def _add_peer(self, peer: str):
+        if peer != str(self.path) and peer not in self._peers:
+            self._peers.append(peer)
+
+    # ─── Réception (boucle du worker) ───────────────────────────────────────
+
+    async def _on_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._inbound.add(writer)
+        try:
+            while True:
+                (size,) = self.HEADER.unpack(await reader.readexactly(self.HEADER.size))
+                if size > self.MAX_MESSAGE_BYTES:
+                    raise ValueError(f"message de {size} octets")
+                envelope = serialization.loads(await reader.readexactly(size))
+                if envelope["c"] == self.HELLO:
+                    self._add_peer(envelope["m"])
+                    continue
+                with self._lock:
+                    self.received += 1
+                self._dispatch(envelope["c"], envelope["m"])
+        except asyncio.IncompleteReadError:
+            pass  # Pair arrêté
+        except (ValueError, OSError) as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Flux du bus invalide, connexion fermée : {e}")
+        finally:
+            self._inbound.discard(writer)
+            writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "socket": str(self.path) if self.path else None,
+            "peers": len(self._peers),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "pending_bytes": sum(link.pending_bytes for link in list(self._links.values())),
+        })
+        return stats
+
+
+def create_event_bus() -> LocalEventBus:
+    if settings.EVENT_BUS_BACKEND == "unix":
+        return UnixSocketEventBus(
+            settings.EVENT_BUS_SOCKET_DIR,
+            peer_refresh_seconds=settings.EVENT_BUS_PEER_REFRESH_SECONDS,
+            max_pending_bytes=settings.EVENT_BUS_MAX_PENDING_BYTES,
+        )
+    if settings.EVENT_BUS_BACKEND != "local":
+        raise ValueError(f"EVENT_BUS_BACKEND inconnu : {settings.EVENT_BUS_BACKEND} (attendu : local, unix)")
+    return LocalEventBus()
+
+
+# Instance globale (une par process worker)
+event_bus = create_event_bus()
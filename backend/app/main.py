@@ -7,14 +7,42 @@ Point d'entrée principal de l'API FastAPI
 - Ajoute un endpoint racine pour tester le serveur
 """
 
-from fastapi import FastAPI, status
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .api import auth  # On importe le router auth
-# À importer plus tard :
-# from .api import teams, projects, tasks
+from .database import checkpoint_wal, create_db_and_tables, log_sqlite_profile
+from .dependencies import token_cache, user_cache
+from .event_bus import event_bus
+from .outbox import outbox_dispatcher
+from . import password_pool
+from .permissions import acl_cache
+from .api import auth, teams, projects, tasks
+from ..websocket.kanban_ws import connection_stats, dispatcher, liveness_stats, presence, replay_buffer
+
+# ───────────────────────────────────────────────
+# Cycle de vie : actions au démarrage / à l'arrêt
+# ───────────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables + migrations versionnées (index composites, etc.)
+    create_db_and_tables()
+    # PRAGMA SQLite (WAL, synchronous, cache...) : signale ceux non appliqués
+    log_sqlite_profile()
+    # Relais des événements / invalidations vers les autres workers
+    event_bus.start()
+    # Diffusion en tâche de fond des événements écrits dans l'outbox
+    outbox_dispatcher.start()
+    yield
+    # Dernier vidage de l'outbox (déjà fait par run.py lors d'un arrêt coordonné)
+    await outbox_dispatcher.stop()
+    event_bus.stop()
+    # WAL recopié et tronqué : rien à rejouer au prochain démarrage
+    checkpoint_wal()
+
 
 # ───────────────────────────────────────────────
 # Création de l'application FastAPI
@@ -25,7 +53,8 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",          # Swagger UI : /docs
     redoc_url="/redoc",        # Documentation alternative
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # ───────────────────────────────────────────────
@@ -37,17 +66,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # lisibles par le JS du navigateur : If-None-Match, page suivante
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # ───────────────────────────────────────────────
 # Inclusion des routers (endpoints groupés)
 # ───────────────────────────────────────────────
 app.include_router(auth.router)
-
-# À décommenter quand on créera ces fichiers :
-# app.include_router(teams.router)
-# app.include_router(projects.router)
-# app.include_router(tasks.router)
+app.include_router(teams.router)
+app.include_router(projects.router)
+app.include_router(tasks.router)
 
 # ───────────────────────────────────────────────
 # Endpoint racine pour tester que l'API tourne
@@ -61,6 +90,28 @@ async def root():
         "version": app.version
     }
 
+# ───────────────────────────────────────────────
+# Compteurs internes (caches, etc.) pour le monitoring
+# Non authentifié : désactivé par défaut (METRICS_ENABLED)
+# ───────────────────────────────────────────────
+@app.get("/metrics", tags=["root"], include_in_schema=settings.METRICS_ENABLED)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return {
+        "acl_cache": acl_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hashing": password_pool.stats(),
+        "websocket_broadcast": dispatcher.stats(),
+        "websocket_connections": connection_stats(),
+        "websocket_replay": replay_buffer.stats(),
+        "websocket_presence": presence.stats(),
+        "websocket_liveness": liveness_stats(),
+        "event_bus": event_bus.stats(),
+        "outbox": outbox_dispatcher.stats(),
+    }
+
 # ───────────────────────────────────────────────
 # Gestionnaire d'exception global simple (optionnel pour MVP)
 # ───────────────────────────────────────────────
@@ -0,0 +1,166 @@
+# backend/app/migrations.py
+"""
+Migrations versionnées du fichier SQLite
+- create_all() ne touche jamais aux tables existantes : les nouveaux index
+  (ou colonnes) doivent être ajoutés aux bases déjà en production ici
+- Chaque migration a un numéro de version croissant, appliquée une seule fois
+- Les versions appliquées sont enregistrées dans la table schema_migrations
+- Une étape est soit une requête SQL (str), soit une fonction(connection)
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+
+Step = Union[str, Callable[[Connection], None]]
+
+
+def add_column(table: str, column: str, ddl: str) -> Callable[[Connection], None]:
+    """
+    Étape ALTER TABLE ... ADD COLUMN idempotente : une base neuve créée par
+    create_all() possède déjà la colonne, et un autre process qui migre en
+    même temps a pu l'ajouter entre la lecture du schéma et l'ALTER
+    """
+    def step(conn: Connection):
+        existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+        if column in existing:
+            return
+        try:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        except OperationalError as e:
+            if "duplicate column name" not in str(e.orig).lower():
+                raise
+    return step
+
+# ───────────────────────────────────────────────
+# Liste ordonnée des migrations : (version, description, étapes)
+# Ne jamais modifier une migration déjà livrée → en ajouter une nouvelle
+# ───────────────────────────────────────────────
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (
+        1,
+        "Index composites task / project",
+        [
+            # list_tasks : WHERE project_id = ? [AND status = ?]
+            "CREATE INDEX IF NOT EXISTS ix_task_project_status ON task (project_id, status)",
+            # Tâches assignées à un utilisateur, par colonne
+            "CREATE INDEX IF NOT EXISTS ix_task_assigned_status ON task (assigned_to, status)",
+            # Board trié par date de modification / synchronisation incrémentale
+            "CREATE INDEX IF NOT EXISTS ix_task_project_updated ON task (project_id, updated_at)",
+            # list_projects sans team_id : WHERE created_by = ?
+            "CREATE INDEX IF NOT EXISTS ix_project_created_by ON project (created_by)",
+        ],
+    ),
+    (
+        2,
+        "Renseigne task.updated_at pour la synchronisation incrémentale",
+        [
+            "UPDATE task SET updated_at = created_at WHERE updated_at IS NULL",
+        ],
+    ),
+    (
+        3,
+        "Compteur de révision par projet (project.revision, task.revision)",
+        [
+            add_column("project", "revision", "INTEGER NOT NULL DEFAULT 0"),
+            add_column("task", "revision", "INTEGER NOT NULL DEFAULT 0"),
+            # Historique existant : une révision par tâche, dans l'ordre des modifications
+            "UPDATE task SET revision = ranked.rn FROM ("
+            " SELECT id, ROW_NUMBER() OVER (PARTITION BY project_id ORDER BY updated_at, id) AS rn"
+            " FROM task) AS ranked"
+            " WHERE task.id = ranked.id AND task.revision = 0",
+            "UPDATE project SET revision = ("
+            " SELECT COALESCE(MAX(task.revision), 0) FROM task WHERE task.project_id = project.id)"
+            " WHERE revision = 0",
+            # /tasks/changes : WHERE project_id = ? AND (revision, id) > (?, ?)
+            "CREATE INDEX IF NOT EXISTS ix_task_project_revision ON task (project_id, revision)",
+        ],
+    ),
+    (
+        4,
+        "Table outbox des événements temps réel (créée par create_all)",
+        [
+            # Lignes à diffuser, dans l'ordre d'écriture
+            "CREATE INDEX IF NOT EXISTS ix_outbox_pending ON outbox (delivered_at, id)",
+            # Rejeu à la reconnexion : WHERE project_id = ? AND seq > ?
+            "CREATE INDEX IF NOT EXISTS ix_outbox_project_seq ON outbox (project_id, seq)",
+        ],
+    ),
+    (
+        5,
+        "Pagination par clé des projets (updated_at, id)",
+        [
+            # Projets jamais modifiés : updated_at = created_at (la clé de tri ne doit pas être NULL)
+            "UPDATE project SET updated_at = created_at WHERE updated_at IS NULL",
+            # GET /projects : WHERE team_id = ? (ou created_by = ?) ORDER BY updated_at DESC, id DESC
+            "CREATE INDEX IF NOT EXISTS ix_project_team_updated ON project (team_id, updated_at)",
+            "CREATE INDEX IF NOT EXISTS ix_project_owner_updated ON project (created_by, updated_at)",
+        ],
+    ),
+]
+
+
+def _ensure_version_table(conn: Connection):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version INTEGER PRIMARY KEY,"
+        " description TEXT NOT NULL,"
+        " applied_at TEXT NOT NULL)"
+    ))
+
+
+def applied_versions(engine: Engine) -> List[int]:
+    """Versions déjà appliquées sur cette base"""
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        rows = conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))
+        return [row[0] for row in rows]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """
+    Applique les migrations manquantes, chacune dans sa propre transaction.
+    Retourne la liste des versions appliquées lors de cet appel.
+    """
+    done = set(applied_versions(engine))
+    newly_applied = []
+
+    for version, description, steps in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(text(step))
+            # OR IGNORE : un autre worker a pu appliquer la même version en parallèle
+            conn.execute(
+                text(
+                    "INSERT OR IGNORE INTO schema_migrations (version, description, applied_at) "
+                    "VALUES (:version, :description, :applied_at)"
+                ),
+                {"version": version, "description": description, "applied_at": datetime.utcnow().isoformat()},
+            )
+        newly_applied.append(version)
+        print(f"Migration {version} appliquée : {description}")
+
+    if newly_applied:
+        # Met à jour les statistiques du planificateur pour les nouveaux index
+        with engine.begin() as conn:
+            conn.execute(text("PRAGMA optimize"))
+
+    return newly_applied
+
+
+# ───────────────────────────────────────────────
+# Exécution manuelle : python -m backend.app.migrations
+# ───────────────────────────────────────────────
+if __name__ == "__main__":
+    from .database import create_db_and_tables, engine
+
+    create_db_and_tables()
+    print(f"Versions appliquées : {applied_versions(engine)}")
@@ -0,0 +1,4 @@
+# backend/app/models/__init__.py
+# Sous-modules accessibles via `models.user`, `models.task`, etc.
+# (les importer tous ici enregistre aussi toutes les tables dans SQLModel.metadata)
+from . import user, team, project, task, outbox
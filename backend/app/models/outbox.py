@@ -0,0 +1,35 @@
+# backend/app/models/outbox.py
+"""
+Modèle de la table outbox (événements temps réel à diffuser)
+- Écrite dans la même transaction que la modification de tâche / projet :
+  un événement ne peut pas être perdu si le process tombe après le commit
+- Vidée par le dispatcher leader (backend/app/outbox.py) qui réserve les
+  lignes (attempts + 1), les diffuse puis les marque livrées
+- seq = révision du projet : sert aussi de source de rejeu à la reconnexion
+"""
+
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class OutboxEvent(SQLModel, table=True):
+    __tablename__ = "outbox"
+    # Mêmes noms que dans migrations.py
+    __table_args__ = (
+        Index("ix_outbox_pending", "delivered_at", "id"),
+        Index("ix_outbox_project_seq", "project_id", "seq"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="project.id", nullable=False)
+    seq: int = Field(nullable=False, description="Révision du projet portée par l'événement")
+    event_type: str = Field(nullable=False)
+    payload: str = Field(nullable=False, description="Événement complet, sérialisé en JSON")
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Réservations : attempts > 1 → ligne rediffusée après la mort d'un
+    # leader (livraison "au moins une fois")
+    attempts: int = Field(default=0, nullable=False)
+    delivered_at: Optional[datetime] = Field(default=None)
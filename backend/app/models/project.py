@@ -7,8 +7,9 @@ Modèle pour les Projets
 - Pour le MVP : on reste simple, sans sous-équipes imbriquées
 """
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from pydantic import constr
 
@@ -54,6 +55,12 @@ class ProjectUpdate(SQLModel):
 # Modèle de base de données : Table projects
 # ───────────────────────────────────────────────
 class Project(ProjectBase, table=True):
+    # Listes paginées par clé : WHERE team_id / created_by = ? ORDER BY updated_at, id
+    __table_args__ = (
+        Index("ix_project_team_updated", "team_id", "updated_at"),
+        Index("ix_project_owner_updated", "created_by", "updated_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Clés étrangères
@@ -66,19 +73,24 @@ class Project(ProjectBase, table=True):
     created_by: int = Field(
         foreign_key="user.id",
         nullable=False,
+        index=True,  # list_projects filtre sur created_by
         description="Utilisateur qui a créé le projet (souvent l'admin de l'équipe)"
     )
     
     # Dates automatiques
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
+
+    # Compteur incrémenté à chaque modification du board (tâches ou projet),
+    # dans la même transaction que la modification
+    revision: int = Field(default=0, nullable=False)
     
     # Relations
     team: "Team" = Relationship(back_populates="projects")
     creator: "User" = Relationship()  # back_populates pas obligatoire ici
     
-    # Relation future : liste des tâches
-    # tasks: List["Task"] = Relationship(back_populates="project")
+    # Tâches du projet
+    tasks: List["Task"] = Relationship(back_populates="project")
 
 
 # ───────────────────────────────────────────────
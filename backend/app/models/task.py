@@ -9,6 +9,7 @@ Modèle pour les Tâches (Tasks) dans le système Kanban
 
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 from pydantic import constr
 
@@ -73,6 +74,14 @@ class TaskUpdate(SQLModel):
 # Modèle de base de données : Table tasks
 # ───────────────────────────────────────────────
 class Task(TaskBase, table=True):
+    # Index composites (mêmes noms que dans migrations.py pour les bases existantes)
+    __table_args__ = (
+        Index("ix_task_project_status", "project_id", "status"),
+        Index("ix_task_assigned_status", "assigned_to", "status"),
+        Index("ix_task_project_updated", "project_id", "updated_at"),
+        Index("ix_task_project_revision", "project_id", "revision"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Clés étrangères
@@ -96,6 +105,9 @@ class Task(TaskBase, table=True):
     # Dates automatiques
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
+
+    # Révision du projet au moment de la dernière modification de cette tâche
+    revision: int = Field(default=0, nullable=False)
     
     # Relations
     project: "Project" = Relationship(back_populates="tasks")
@@ -6,7 +6,7 @@ Modèle pour les Équipes (Teams)
 - Pour le MVP : on commence simple avec owner_id seulement
 """
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
 from pydantic import constr
@@ -65,12 +65,14 @@ class Team(TeamBase, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
     
-    # Relation : propriétaire (back_populates pour bidirectionnel)
-    owner: "User" = Relationship(back_populates="owned_teams")
+    # Relation : propriétaire (unidirectionnelle : User n'a pas encore owned_teams)
+    owner: "User" = Relationship()
     
+    # Projets de l'équipe
+    projects: List["Project"] = Relationship(back_populates="team")
+
     # Relations futures (à ajouter quand on implémente les membres)
     # members: List["TeamMember"] = Relationship(back_populates="team")
-    # projects: List["Project"] = Relationship(back_populates="team")
 
 
 # ───────────────────────────────────────────────
@@ -84,8 +86,3 @@ class TeamPublic(TeamBase):
     class Config:
         from_attributes = True
 
-
-# ───────────────────────────────────────────────
-# À ajouter plus tard dans models/user.py (pour la relation inverse) :
-# owned_teams: List["Team"] = Relationship(back_populates="owner")
-# ───────────────────────────────────────────────
@@ -0,0 +1,320 @@
+# backend/app/outbox.py
+"""
+Outbox transactionnelle des événements temps réel
+- add_event() ajoute l'événement dans la transaction de la route : il est
+  commité (ou annulé) avec la modification elle-même
+- La route ne diffuse plus rien : elle réveille le dispatcher (wake) et répond
+- OutboxDispatcher (tâche de fond dans chaque worker) : un seul worker à la
+  fois diffuse, le leader (verrou fcntl.flock sur un fichier à côté de la
+  base, relâché par l'OS si le process meurt). Un lot diffusé par un seul
+  émetteur garde l'ordre des seq de chaque projet sur tous les sockets
+    1. réserve le lot des plus anciennes lignes non livrées (UPDATE ... RETURNING)
+    2. le diffuse via broadcast_to_project (bus → tous les workers)
+    3. marque les lignes livrées
+  Un crash entre 2 et 3 → le nouveau leader rediffuse le lot : livraison
+  "au moins une fois" (chaque connexion ignore les seq déjà reçus)
+- Les autres workers réveillent le leader par le bus (canal "outbox")
+- events_since() : source de rejeu persistante pour les reconnexions dont le
+  retard dépasse le tampon mémoire (survit aux redémarrages)
+- Les lignes livrées sont purgées après OUTBOX_RETENTION_HOURS
+"""
+
+import asyncio
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import IO, Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+try:
+    import fcntl  # POSIX uniquement (ailleurs, pas de workers forkés : toujours leader)
+except ImportError:
+    fcntl = None
+
+from .config import settings
+from .database import AsyncSessionLocal, engine
+from .event_bus import event_bus
+from .models.outbox import OutboxEvent
+from .models.project import Project
+
+
+# ───────────────────────────────────────────────
+# Écriture (dans la transaction de la route)
+# ───────────────────────────────────────────────
+def add_event(session: AsyncSession, project_id: int, seq: int, event: Dict[str, Any]) -> OutboxEvent:
+    """
+    Ajoute l'événement à la transaction en cours ; seq = révision du projet
+    obtenue par next_project_revision() dans la même transaction.
+    Événement "batch" : seq = dernière révision du bloc, chaque événement
+    de "events" portant déjà son propre seq
+    """
+    event = {**event, "seq": seq, "project_id": project_id}
+    row = OutboxEvent(
+        project_id=project_id,
+        seq=seq,
+        event_type=event["event_type"],
+        payload=json.dumps(jsonable_encoder(event), separators=(",", ":")),
+    )
+    session.add(row)
+    return row
+
+
+# ───────────────────────────────────────────────
+# Rejeu depuis la base (reconnexion WebSocket)
+# ───────────────────────────────────────────────
+async def events_since(project_id: int, since: int, limit: int) -> Optional[List[dict]]:
+    """
+    Événements de seq > since, ou None si le rejeu est impossible / trop long
+    (purgés, projet inconnu, plus de `limit` événements → resynchronisation)
+    """
+    async with AsyncSessionLocal() as session:
+        current = (await session.exec(select(Project.revision).where(Project.id == project_id))).first()
+        if current is None:
+            return None
+        if since >= current:
+            return []
+        if current - since > limit:
+            return None
+
+        statement = (
+            select(OutboxEvent.seq, OutboxEvent.payload)
+            .where(OutboxEvent.project_id == project_id, OutboxEvent.seq > since)
+            .order_by(OutboxEvent.seq)
+        )
+        rows = (await session.exec(statement)).all()
+
+    # Une ligne "batch" (POST /tasks/batch) porte un événement par révision
+    events = []
+    for _, payload in rows:
+        event = json.loads(payload)
+        for item in event["events"] if event["event_type"] == "batch" else [event]:
+            if item["seq"] > since:
+                events.append(item)
+
+    # Chaque révision a son événement : la suite doit être complète
+    if [event["seq"] for event in events] != list(range(since + 1, current + 1)):
+        return None
+    return events
+
+
+# ───────────────────────────────────────────────
+# Dispatcher de fond
+# ───────────────────────────────────────────────
+class OutboxDispatcher:
+    def __init__(self, batch_size: int, poll_interval: float, lock_path: Optional[str]):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lock_path = lock_path
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock_file: Optional[IO] = None
+        self._subscribed = False
+        self._last_prune = datetime.min
+        self.is_leader = False
+
+        self.batches = 0
+        self.delivered = 0
+        self.redelivered = 0
+        self.errors = 0
+        self.last_lag_ms: Optional[float] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        # pid recalculé : start() est appelé dans chaque worker après le fork
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        if not self._subscribed:
+            event_bus.subscribe("outbox", self._on_wake_message)
+            self._subscribed = True
+        if fcntl is not None and self.lock_path:
+            # Ouvert après le fork : chaque worker a sa propre description de fichier
+            self._lock_file = open(self.lock_path, "a")
+        self._try_lead()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        """
+        Arrêt : dernier vidage de ce qui est déjà commité (si ce worker est
+        leader, ou le devient parce que le leader est déjà arrêté), attente de
+        l'envoi sur le bus, puis le verrou passe à un autre worker
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._try_lead():
+            while await self.drain_once() == self.batch_size:
+                pass
+            # Le successeur ne doit pas publier avant que ces messages soient partis
+            await event_bus.flush(settings.EVENT_BUS_FLUSH_TIMEOUT_SECONDS)
+        self._step_down()
+
+    # ─── Leader (un seul diffuseur pour tous les workers) ───────────────────
+
+    def _try_lead(self) -> bool:
+        if self.is_leader:
+            return True
+        if self._lock_file is None:
+            self.is_leader = fcntl is None or not self.lock_path
+            return self.is_leader
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False  # Un autre worker est leader
+        self.is_leader = True
+        print(f"Dispatcher outbox : {self.worker_id} devient leader")
+        return True
+
+    def _step_down(self):
+        if self._lock_file is not None:
+            if self.is_leader:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+    # ─── Réveil ─────────────────────────────────────────────────────────────
+
+    def wake(self):
+        """
+        À appeler après le commit d'une route : diffusion sans attendre le
+        prochain tour (par le bus si le leader est un autre worker)
+        """
+        if self.is_leader:
+            self._set_wakeup()
+        else:
+            event_bus.publish("outbox", {"from": self.worker_id})
+
+    def _on_wake_message(self, message: Dict[str, Any]):
+        if self.is_leader:
+            self._set_wakeup()
+
+    def _set_wakeup(self):
+        if self._wakeup is None or self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._try_lead():
+                continue  # Relève tentée à chaque tour (leader arrêté ou mort)
+            try:
+                # Lot plein → il en reste probablement : on enchaîne
+                while await self.drain_once() == self.batch_size:
+                    pass
+                await self._prune_if_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"Erreur dispatcher outbox : {e}")
+
+    async def drain_once(self) -> int:
+        """Réserve, diffuse et marque livré un lot ; renvoie sa taille"""
+        from ..websocket.kanban_ws import broadcast_to_project
+
+        now = datetime.utcnow()
+        # Seul le leader diffuse : les lignes réservées par un ancien leader
+        # (mort avant de les marquer) sont reprises tout de suite, dans l'ordre
+        pending = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.delivered_at.is_(None))
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .scalar_subquery()
+        )
+        claim = (
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(pending))
+            .values(attempts=OutboxEvent.attempts + 1)
+            .returning(
+                OutboxEvent.id,
+                OutboxEvent.project_id,
+                OutboxEvent.payload,
+                OutboxEvent.attempts,
+                OutboxEvent.created_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with AsyncSessionLocal() as session:
+            # Réservation commitée avant la diffusion : attempts > 1 = rediffusion
+            claimed = (await session.execute(claim)).all()
+            await session.commit()
+            if not claimed:
+                return 0
+
+            # RETURNING ne garantit pas l'ordre : on diffuse dans l'ordre d'écriture
+            claimed.sort(key=lambda row: row.id)
+            for row in claimed:
+                broadcast_to_project(row.project_id, json.loads(row.payload))
+
+            await session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_([row.id for row in claimed]))
+                .values(delivered_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        self.batches += 1
+        self.delivered += len(claimed)
+        self.redelivered += sum(1 for row in claimed if row.attempts > 1)
+        self.last_lag_ms = round((now - claimed[0].created_at).total_seconds() * 1000, 1)
+        return len(claimed)
+
+    async def _prune_if_due(self):
+        now = datetime.utcnow()
+        if now - self._last_prune < timedelta(seconds=settings.OUTBOX_PRUNE_INTERVAL_SECONDS):
+            return
+        self._last_prune = now
+        cutoff = now - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(OutboxEvent)
+                .where(OutboxEvent.delivered_at.is_not(None), OutboxEvent.created_at < cutoff)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "worker": self.worker_id,
+            "leader": self.is_leader,
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "redelivered": self.redelivered,
+            "errors": self.errors,
+            "last_lag_ms": self.last_lag_ms,
+        }
+
+
+outbox_dispatcher = OutboxDispatcher(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL_MS / 1000,
+    # Un verrou par base : les workers qui partagent la base se le disputent
+    lock_path=f"{engine.url.database}.outbox.lock" if engine.url.database else None,
+)
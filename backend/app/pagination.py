@@ -0,0 +1,170 @@
+# backend/app/pagination.py
+"""
+Pagination par clé (keyset) et projection de champs pour les listes
+- Curseur opaque : clé de tri de la dernière ligne reçue ; la page suivante
+  reprend juste après via l'index (WHERE (a, b) < (?, ?)), sans OFFSET qui
+  relirait toutes les lignes précédentes
+- X-Next-Cursor : en-tête de réponse, absent sur la dernière page
+- fields=id,title,status : seules ces colonnes sont lues et renvoyées
+  (les vues en cartes se passent des descriptions)
+- NDJSON (application/x-ndjson) : une ligne JSON par résultat, envoyée au fil
+  d'un curseur SQLite (yield_per) ; mémoire constante quelle que soit la taille
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import DateTime, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import serialization
+from .database import AsyncSessionLocal
+
+NDJSON = "application/x-ndjson"
+
+
+# ───────────────────────────────────────────────
+# Ordre de parcours : colonnes de tri, toutes dans le même sens
+# (la dernière doit être unique, en pratique l'id)
+# ───────────────────────────────────────────────
+class KeysetOrder:
+    def __init__(self, name: str, model, columns: Sequence[str], descending: bool = False):
+        self.name = name
+        self.model = model
+        self.columns = list(columns)
+        self.descending = descending
+
+    def _attrs(self):
+        return [getattr(self.model, column) for column in self.columns]
+
+    def encode(self, row) -> str:
+        """Curseur pointant juste après cette ligne (objet ou dict)"""
+        values = [row[c] if isinstance(row, dict) else getattr(row, c) for c in self.columns]
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+        raw = json.dumps([self.name, *values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            name, *values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if name != self.name or len(values) != len(self.columns):
+                raise ValueError(cursor)
+            # Les dates reviennent en chaîne ISO
+            return [
+                datetime.fromisoformat(value)
+                if isinstance(value, str) and isinstance(attr.type, DateTime) else value
+                for attr, value in zip(self._attrs(), values)
+            ]
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
+    def apply(self, statement, cursor: Optional[str]):
+        attrs = self._attrs()
+        if cursor:
+            key, after = tuple_(*attrs), tuple_(*self.decode(cursor))
+            statement = statement.where(key < after if self.descending else key > after)
+        return statement.order_by(*(attr.desc() if self.descending else attr for attr in attrs))
+
+
+# ───────────────────────────────────────────────
+# Projection : ?fields=... validé contre le schéma de sortie
+# ───────────────────────────────────────────────
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(schema.model_fields))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus : {', '.join(unknown)}")
+    # id toujours présent : le client doit pouvoir rapprocher les lignes
+    return list(dict.fromkeys(["id", *requested]))
+
+
+async def fetch_page(
+    session: AsyncSession,
+    model,
+    conditions: Sequence,
+    order: KeysetOrder,
+    cursor: Optional[str],
+    limit: Optional[int],
+    fields: Optional[List[str]],
+) -> Tuple[list, Optional[str]]:
+    """
+    Une page de résultats + curseur de la suivante (None sur la dernière).
+    Sans fields : objets du modèle ; avec fields : dicts limités à ces champs.
+    """
+    if fields:
+        # Colonnes de tri lues aussi pour construire le curseur
+        columns = dict.fromkeys([*fields, *order.columns])
+        statement = select(*(getattr(model, name) for name in columns))
+    else:
+        statement = select(model)
+    statement = order.apply(statement.where(*conditions), cursor)
+    if limit:
+        statement = statement.limit(limit + 1)  # une ligne de plus : y a-t-il une suite ?
+
+    if fields:
+        rows: list = [dict(row._mapping) for row in (await session.execute(statement)).all()]
+    else:
+        rows = list((await session.exec(statement)).all())
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = order.encode(rows[-1])
+    if fields:
+        rows = [{name: row[name] for name in fields} for row in rows]
+    return rows, next_cursor
+
+
+def projected_response(rows: List[Dict[str, Any]], response: Response) -> JSONResponse:
+    """
+    Réponse directe pour une projection (le response_model exigerait tous les
+    champs) ; les en-têtes déjà posés (ETag, X-Next-Cursor) sont recopiés
+    """
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return JSONResponse(jsonable_encoder(rows), headers=headers)
+
+
+# ───────────────────────────────────────────────
+# Streaming NDJSON : une ligne JSON par résultat
+# ───────────────────────────────────────────────
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+async def _stream_rows(statement, batch_size: int) -> AsyncIterator[bytes]:
+    # Session propre au flux : celle de la requête est fermée avant l'envoi du corps
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(statement.execution_options(yield_per=batch_size))
+        # Un morceau HTTP par lot de lignes lues
+        async for rows in result.mappings().partitions():
+            yield b"".join(serialization.dumps(dict(row), newline=True) for row in rows)
+
+
+def ndjson_response(
+    model,
+    schema: Type[BaseModel],
+    conditions: Sequence,
+    order: KeysetOrder,
+    cursor: Optional[str],
+    fields: Optional[List[str]],
+    batch_size: int,
+    response: Response,
+) -> StreamingResponse:
+    """
+    Tous les résultats (à partir du curseur), sans passer par des objets ORM
+    ni par une liste en mémoire ; en-têtes déjà posés recopiés
+    """
+    columns = fields or list(schema.model_fields)
+    statement = select(*(getattr(model, name) for name in columns))
+    statement = order.apply(statement.where(*conditions), cursor)
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return StreamingResponse(_stream_rows(statement, batch_size), media_type=NDJSON, headers=headers)
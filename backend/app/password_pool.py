@@ -0,0 +1,69 @@
+# backend/app/password_pool.py
+"""
+Hashage / vérification bcrypt hors de la boucle d'événements
+- bcrypt coûte ~100-300 ms de CPU par appel : on ne le lance jamais inline
+- Pool de threads dédié et borné (bcrypt libère le GIL pendant le calcul),
+  séparé du threadpool par défaut qui sert les autres routes
+- File d'attente limitée : au-delà de PASSWORD_HASH_MAX_PENDING → 503 immédiat
+- verify_and_update : renvoie un nouveau hash si le coût configuré a changé
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from .config import settings
+from .dependencies import pwd_context
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_lock = threading.Lock()
+_pending = 0
+_rejected = 0
+
+
+async def _run_in_pool(fn: Callable, *args) -> Any:
+    """Soumet fn au pool, ou refuse tout de suite si la file est pleine"""
+    global _pending, _rejected
+    with _lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            _rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service d'authentification saturé, réessayez dans un instant",
+                headers={"Retry-After": "1"},
+            )
+        _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash bcrypt au coût configuré, calculé dans le pool"""
+    return await _run_in_pool(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie le mot de passe ; si le hash utilise un ancien coût, renvoie aussi
+    le nouveau hash à enregistrer (None sinon).
+    """
+    return await _run_in_pool(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "pending": _pending,
+            "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+            "rejected": _rejected,
+        }
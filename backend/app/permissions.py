@@ -0,0 +1,197 @@
+# backend/app/permissions.py
+"""
+Résolution des droits d'accès (qui peut agir sur quelle tâche / quel projet)
+- Une seule requête jointe Task → Project → Team au lieu de 3 session.get()
+- Décisions (user, projet) et (user, équipe) gardées dans un cache LRU/TTL
+  partagé : chemin chaud = zéro requête SQL pour la vérification des droits
+- Invalidation explicite quand une équipe ou un projet est créé / modifié,
+  relayée à tous les workers par le bus d'événements (canal "acl")
+- Exposé comme dépendance FastAPI : access: Annotated[AccessResolver, Depends(get_access)]
+- Règle MVP : seul le propriétaire de l'équipe a accès à ses projets et tâches
+"""
+
+from typing import Annotated, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .cache import MISSING, TTLCache
+from .config import settings
+from .database import get_async_session
+from .dependencies import CurrentUser, get_current_user
+from .event_bus import event_bus
+from .models.project import Project
+from .models.task import Task
+from .models.team import Team
+
+# ───────────────────────────────────────────────
+# Cache global des décisions d'accès
+# Clés : ("project", user_id, project_id) / ("team", user_id, team_id)
+# Valeurs : (team_id, autorisé) → team_id sert à invalider par équipe
+# Les projets / équipes inexistants (404) ne sont jamais mis en cache
+# ───────────────────────────────────────────────
+acl_cache = TTLCache(
+    "acl",
+    max_entries=settings.ACL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ACL_CACHE_TTL_SECONDS,
+)
+
+
+# task_id → project_id (une tâche ne change jamais de projet) : permet de
+# vérifier les droits / l'ETag d'une tâche sans la charger
+task_projects = TTLCache(
+    "task_project",
+    max_entries=settings.ACL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ACL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_team(team_id: int):
+    """À appeler après commit d'une modification d'équipe (propriétaire, archivage...)"""
+    event_bus.publish("acl", {"team_id": team_id})
+
+
+def invalidate_project(project_id: int):
+    """À appeler après commit d'une création / modification de projet"""
+    event_bus.publish("acl", {"project_id": project_id})
+
+
+def _apply_acl_message(message: dict):
+    if "team_id" in message:
+        team_id = message["team_id"]
+        acl_cache.invalidate_where(lambda key, value: value[0] == team_id)
+    if "project_id" in message:
+        project_id = message["project_id"]
+        acl_cache.invalidate_where(lambda key, value: key[0] == "project" and key[2] == project_id)
+
+
+event_bus.subscribe("acl", _apply_acl_message)
+
+
+class AccessResolver:
+    """
+    Vérifie les droits de l'utilisateur courant, une requête SQL par ressource au plus
+    (aucune si la décision est déjà dans acl_cache).
+    Une instance par requête HTTP (FastAPI met la dépendance en cache par requête) :
+    ses décisions sont aussi gardées sur l'instance, une ressource vérifiée deux
+    fois dans la même requête ne dépend ni du TTL ni de l'éviction du cache partagé.
+    """
+
+    def __init__(self, session: AsyncSession, user: CurrentUser):
+        self.session = session
+        self.user = user
+        # (type, resource_id) → (team_id, autorisé), pour cette requête
+        self._decisions: Dict[Tuple[str, int], Tuple[Optional[int], bool]] = {}
+
+    # ─── Helpers internes ───────────────────────────────────────────────────
+
+    def _remember(self, kind: str, resource_id: int, team_id: Optional[int], owner_id: Optional[int]):
+        allowed = owner_id is not None and owner_id == self.user.id
+        self._decisions[(kind, resource_id)] = (team_id, allowed)
+        acl_cache.set((kind, self.user.id, resource_id), (team_id, allowed))
+        return allowed
+
+    def _known(self, kind: str, resource_id: int):
+        """Décision déjà prise dans cette requête, sinon dans acl_cache (MISSING si aucune)"""
+        decision = self._decisions.get((kind, resource_id))
+        if decision is None:
+            decision = acl_cache.get((kind, self.user.id, resource_id))
+            if decision is not MISSING:
+                self._decisions[(kind, resource_id)] = decision
+        return decision
+
+    @staticmethod
+    def _check(allowed: bool, detail: str):
+        if not allowed:
+            raise HTTPException(status_code=403, detail=detail)
+
+    # ─── Projets ────────────────────────────────────────────────────────────
+
+    async def ensure_project_access(self, project_id: int, detail: str = "Accès non autorisé") -> None:
+        """Vérifie l'accès au projet sans charger la ligne complète (create_task, list_tasks)"""
+        cached = self._known("project", project_id)
+        if cached is not MISSING:
+            self._check(cached[1], detail)
+            return
+
+        statement = (
+            select(Project.team_id, Team.owner_id)
+            .outerjoin(Team, Team.id == Project.team_id)
+            .where(Project.id == project_id)
+        )
+        row = (await self.session.exec(statement)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Projet non trouvé")
+        self._check(self._remember("project", project_id, *row), detail)
+
+    async def load_project(self, project_id: int, detail: str = "Accès non autorisé") -> Project:
+        """Charge le projet et vérifie l'accès dans la même requête"""
+        statement = (
+            select(Project, Team.owner_id)
+            .outerjoin(Team, Team.id == Project.team_id)
+            .where(Project.id == project_id)
+        )
+        row = (await self.session.exec(statement)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Projet non trouvé")
+
+        project, owner_id = row
+        self._check(self._remember("project", project_id, project.team_id, owner_id), detail)
+        return project
+
+    # ─── Tâches ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def cached_task_project(task_id: int) -> Optional[int]:
+        """project_id d'une tâche déjà vue, sans requête (None si inconnue)"""
+        project_id = task_projects.get(task_id)
+        return None if project_id is MISSING else project_id
+
+    async def load_task(self, task_id: int, detail: str = "Accès non autorisé") -> Task:
+        """Charge la tâche + vérifie l'accès via son projet, en une seule requête"""
+        statement = (
+            select(Task, Project.team_id, Team.owner_id)
+            .outerjoin(Project, Project.id == Task.project_id)
+            .outerjoin(Team, Team.id == Project.team_id)
+            .where(Task.id == task_id)
+        )
+        row = (await self.session.exec(statement)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Tâche non trouvée")
+
+        task, team_id, owner_id = row
+        if team_id is None:
+            raise HTTPException(status_code=404, detail="Projet associé introuvable")
+
+        task_projects.set(task.id, task.project_id)
+        self._check(self._remember("project", task.project_id, team_id, owner_id), detail)
+        return task
+
+    # ─── Équipes ────────────────────────────────────────────────────────────
+
+    async def ensure_team_access(self, team_id: int, detail: str = "Accès non autorisé") -> None:
+        """Vérifie la propriété de l'équipe sans la charger si la décision est en cache"""
+        cached = self._known("team", team_id)
+        if cached is not MISSING:
+            self._check(cached[1], detail)
+            return
+        await self.load_team(team_id, detail)
+
+    async def load_team(self, team_id: int, detail: str = "Accès non autorisé") -> Team:
+        """Charge l'équipe et vérifie que l'utilisateur en est propriétaire"""
+        team = await self.session.get(Team, team_id)
+        if not team:
+            raise HTTPException(status_code=404, detail="Équipe non trouvée")
+        self._check(self._remember("team", team_id, team_id, team.owner_id), detail)
+        return team
+
+
+# ───────────────────────────────────────────────
+# Dépendance FastAPI : un résolveur par requête (partage la session de la route)
+# ───────────────────────────────────────────────
+async def get_access(
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    session: AsyncSession = Depends(get_async_session)
+) -> AccessResolver:
+    return AccessResolver(session, current_user)
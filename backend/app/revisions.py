@@ -0,0 +1,112 @@
+# backend/app/revisions.py
+"""
+Numéros de révision + ETags / réponses 304
+- Chaque projet a une colonne project.revision incrémentée dans la même
+  transaction que toute modification de son board (tâche créée / modifiée,
+  projet modifié) : next_project_revision()
+- Les ETags sont calculés à partir de l'état persisté, jamais d'un compteur
+  mémoire : une lecture par clé primaire (project_revision) pour un board,
+  un agrégat sur les projets listés pour une liste (project_list_version).
+  Aucun worker ne peut répondre 304 pour un board modifié par un autre,
+  même si un message du bus s'est perdu
+- Même ETag dans tous les workers et après un redémarrage : un client
+  reste en 304 tant que le board n'a pas changé
+- Si If-None-Match correspond, on renvoie 304 sans charger ni sérialiser
+  les tâches
+- ETAG_FORMAT : à incrémenter quand le contenu des réponses change (nouveau
+  champ...) pour invalider les ETags déjà émis
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Hashable, Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import func
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models.project import Project
+
+ETAG_FORMAT = 1
+
+
+# ───────────────────────────────────────────────
+# Clés d'ETag (une par "vue" cacheable)
+# ───────────────────────────────────────────────
+def project_key(project_id: int):
+    return ("project", project_id)
+
+
+def team_projects_key(team_id: int):
+    return ("team-projects", team_id)
+
+
+def user_projects_key(user_id: int):
+    return ("user-projects", user_id)
+
+
+async def next_project_revision(session: AsyncSession, project_id: int, count: int = 1) -> int:
+    """
+    Incrémente project.revision dans la transaction en cours et renvoie la
+    nouvelle valeur. UPDATE ... RETURNING : atomique, pas de lecture préalable,
+    et le verrou d'écriture SQLite sérialise les modifications concurrentes.
+    count > 1 réserve un bloc (opérations groupées) : révisions
+    renvoyée - count + 1 … renvoyée.
+    """
+    statement = (
+        update(Project)
+        .where(Project.id == project_id)
+        .values(revision=Project.revision + count, updated_at=datetime.utcnow())
+        .returning(Project.revision)
+    )
+    revision = (await session.execute(statement)).scalar_one_or_none()
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Projet non trouvé")
+    return revision
+
+
+async def project_revision(session: AsyncSession, project_id: int) -> int:
+    """Révision persistée du board (lecture par clé primaire) ; 404 si inconnu"""
+    revision = (await session.exec(select(Project.revision).where(Project.id == project_id))).first()
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Projet non trouvé")
+    return revision
+
+
+async def project_list_version(session: AsyncSession, condition) -> str:
+    """
+    Version d'une liste de projets (WHERE condition), lue en base : change dès
+    qu'un projet est créé, modifié ou que son board reçoit une révision
+    """
+    statement = select(
+        func.count(Project.id),
+        func.coalesce(func.sum(Project.revision), 0),
+        func.max(Project.id),
+        func.max(Project.updated_at),
+    ).where(condition)
+    count, revision_sum, last_id, last_update = (await session.execute(statement)).one()
+    return f"{count}:{revision_sum}:{last_id}:{last_update}"
+
+
+# ───────────────────────────────────────────────
+# ETags
+# ───────────────────────────────────────────────
+def make_etag(key: Hashable, version, *variant) -> str:
+    """
+    ETag fort : clé + version persistée (révision du projet, version de liste).
+    variant = paramètres qui changent le contenu (filtre, curseur...)
+    """
+    tag = f"{ETAG_FORMAT}-{key}-v{version}-{variant}"
+    return '"' + hashlib.sha1(tag.encode()).hexdigest() + '"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Renvoie une réponse 304 si le client possède déjà cette version"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
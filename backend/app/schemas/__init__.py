@@ -0,0 +1,3 @@
+# backend/app/schemas/__init__.py
+# Sous-modules accessibles via `schemas.user`, `schemas.task`, etc.
+from . import user, team, project, task
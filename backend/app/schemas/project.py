@@ -52,6 +52,7 @@ class ProjectOut(ProjectBase):
     created_by: int = Field(..., description="ID de l'utilisateur qui a créé le projet")
     created_at: datetime = Field(..., description="Date de création")
     updated_at: Optional[datetime] = Field(None, description="Dernière mise à jour")
+    revision: int = Field(0, description="Révision du board, incrémentée à chaque modification")
 
     class Config:
         from_attributes = True  # Conversion depuis SQLModel ou ORM
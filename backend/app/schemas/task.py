@@ -6,7 +6,7 @@ Schémas Pydantic pour les Tâches (Tasks) dans l'API et WebSocket
 - Champs adaptés pour les opérations CRUD et drag & drop (changement de status)
 """
 
-from typing import Optional
+from typing import Annotated, List, Literal, Optional, Union
 from datetime import datetime
 from pydantic import BaseModel, constr, Field
 
@@ -78,6 +78,51 @@ class TaskOut(TaskBase):
         from_attributes = True  # Permet conversion depuis objet SQLModel
 
 
+# ───────────────────────────────────────────────
+# Réponse de GET /tasks/changes (synchronisation incrémentale)
+# ───────────────────────────────────────────────
+class TaskChanges(BaseModel):
+    tasks: List[TaskOut] = Field(default_factory=list, description="Tâches créées ou modifiées depuis le curseur")
+    deleted: List[int] = Field(default_factory=list, description="IDs des tâches supprimées depuis le curseur")
+    cursor: Optional[str] = Field(None, description="À renvoyer dans 'since' au prochain appel")
+    has_more: bool = Field(False, description="Encore des changements : rappeler immédiatement avec le nouveau curseur")
+
+
+# ───────────────────────────────────────────────
+# Opérations groupées (POST /tasks/batch) : création, modification, déplacement
+# ───────────────────────────────────────────────
+class TaskBatchCreate(BaseModel):
+    op: Literal["create"]
+    task: TaskCreate
+
+
+class TaskBatchUpdate(BaseModel):
+    op: Literal["update"]
+    task_id: int
+    changes: TaskUpdate
+
+
+class TaskBatchMove(BaseModel):
+    op: Literal["move"]
+    task_id: int
+    status: str = Field(..., description=f"Nouveau statut : {', '.join(KANBAN_STATUSES)}")
+
+
+TaskBatchOperation = Annotated[
+    Union[TaskBatchCreate, TaskBatchUpdate, TaskBatchMove],
+    Field(discriminator="op"),
+]
+
+
+class TaskBatchRequest(BaseModel):
+    operations: List[TaskBatchOperation] = Field(..., min_length=1, description="Appliquées dans l'ordre, tout ou rien")
+
+
+class TaskBatchResult(BaseModel):
+    tasks: List[TaskOut] = Field(default_factory=list, description="État final de chaque tâche touchée (ordre des opérations)")
+    revisions: dict[int, int] = Field(default_factory=dict, description="Nouvelle révision de chaque projet modifié")
+
+
 # ───────────────────────────────────────────────
 # Schéma pour les événements WebSocket (ex: tâche déplacée)
 # Plus léger, optimisé pour le temps réel
@@ -32,7 +32,7 @@ class UserCreate(UserBase):
 
 
 # ───────────────────────────────────────────────
-# Schéma pour mise à jour du profil (PATCH /users/me)
+# Schéma pour mise à jour du profil (PATCH /auth/me)
 # ───────────────────────────────────────────────
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
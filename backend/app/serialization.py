@@ -0,0 +1,38 @@
+# backend/app/serialization.py
+"""
+Sérialisation JSON partagée (trames WebSocket, flux NDJSON, bus d'événements)
+- orjson si installé (optionnel, voir requirements.txt), sinon json standard
+  avec la même sortie : compacte, UTF-8 non échappé
+- Dates et datetimes en ISO 8601 ; tout autre type non JSON est une erreur
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Union
+
+try:
+    import orjson  # pip install orjson (optionnel, ~5x plus rapide que json)
+except ImportError:
+    orjson = None
+
+
+def json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+def dumps(obj: Any, newline: bool = False, non_str_keys: bool = False) -> bytes:
+    """
+    JSON compact en octets ; newline : ligne NDJSON terminée par "\\n" ;
+    non_str_keys : clés non textuelles acceptées (converties en texte)
+    """
+    if orjson is not None:
+        option = (orjson.OPT_APPEND_NEWLINE if newline else 0) | (orjson.OPT_NON_STR_KEYS if non_str_keys else 0)
+        return orjson.dumps(obj, default=json_default, option=option)
+    text = json.dumps(obj, default=json_default, separators=(",", ":"), ensure_ascii=False)
+    return (text + "\n" if newline else text).encode()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
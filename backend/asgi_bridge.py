@@ -0,0 +1,168 @@
+# backend/asgi_bridge.py
+"""
+Pont Tornado → ASGI : sert l'application FastAPI depuis le serveur Tornado
+- Un seul listener pour l'API REST et /ws/kanban (plus de second serveur
+  uvicorn qui se dispute le port)
+- ASGIHandler : traduit chaque requête HTTP en appel ASGI (scope http 2.3) ;
+  les réponses en plusieurs morceaux (more_body) sont envoyées au fil de l'eau
+- ASGIHandler.in_flight : requêtes en cours, attendues à l'arrêt (une
+  écriture SQLite commencée va jusqu'à son commit)
+- Lifespan : démarrage / arrêt de l'application (tables, bus, outbox) dans
+  chaque worker, comme le ferait uvicorn
+"""
+
+import asyncio
+import traceback
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import unquote
+
+from tornado.iostream import StreamClosedError
+from tornado.web import RequestHandler
+
+ASGIApp = Callable[..., Any]
+
+
+# ───────────────────────────────────────────────
+# Requêtes HTTP
+# ───────────────────────────────────────────────
+class ASGIHandler(RequestHandler):
+    """Route attrape-tout : toute requête non WebSocket part vers l'app ASGI"""
+
+    # Requêtes dont l'application n'a pas encore rendu la main (tout le worker)
+    in_flight = 0
+
+    @classmethod
+    async def wait_idle(cls, timeout: float) -> bool:
+        """Attend la fin des requêtes en cours ; False si le délai est dépassé"""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while cls.in_flight and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.05)
+        return not cls.in_flight
+
+    def initialize(self, app: ASGIApp):
+        self.app = app
+        self._disconnected = asyncio.Event()
+        self._response_started = False
+
+    def _scope(self) -> Dict[str, Any]:
+        request = self.request
+        port = request.host.rpartition(":")[2]
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": request.version.split("/")[-1],
+            "method": request.method,
+            "scheme": request.protocol,
+            "path": unquote(request.path),
+            "raw_path": request.path.encode("latin-1"),
+            "query_string": request.query.encode("latin-1"),
+            "root_path": "",
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in request.headers.get_all()
+            ],
+            "client": (request.remote_ip, 0),
+            "server": (request.host_name, int(port) if port.isdigit() else None),
+        }
+
+    async def _handle(self, *args, **kwargs):
+        body_sent = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": self.request.body, "more_body": False}
+            await self._disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]):
+            if self._disconnected.is_set():
+                return
+            if message["type"] == "http.response.start":
+                self._response_started = True
+                # En-têtes de l'application seulement (pas le Content-Type par défaut de Tornado)
+                self.clear()
+                self.clear_header("Content-Type")
+                self.set_status(message["status"])
+                for name, value in message.get("headers", []):
+                    self.add_header(name.decode("latin-1"), value.decode("latin-1"))
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    self.write(message["body"])
+                try:
+                    if message.get("more_body", False):
+                        await self.flush()  # Streaming : morceau envoyé tout de suite
+                    else:
+                        self.finish()
+                except StreamClosedError:
+                    self._disconnected.set()
+
+        ASGIHandler.in_flight += 1
+        try:
+            await self.app(self._scope(), receive, send)
+        except Exception:
+            print(f"Erreur application ASGI sur {self.request.method} {self.request.path} :")
+            traceback.print_exc()
+            if not self._response_started:
+                self.send_error(500)
+                return
+        finally:
+            ASGIHandler.in_flight -= 1
+        if not self._finished and not self._disconnected.is_set():
+            self.finish()
+
+    def on_connection_close(self):
+        self._disconnected.set()
+
+    get = post = put = patch = delete = options = head = _handle
+
+
+# ───────────────────────────────────────────────
+# Protocole lifespan (startup / shutdown)
+# ───────────────────────────────────────────────
+class Lifespan:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._inbox: Optional[asyncio.Queue] = None
+        self._events: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def _receive(self) -> Dict[str, Any]:
+        return await self._inbox.get()
+
+    async def _send(self, message: Dict[str, Any]):
+        # lifespan.startup.complete / .failed, lifespan.shutdown.complete / .failed
+        phase = message["type"].split(".")[1]
+        future = self._events.get(phase)
+        if future is not None and not future.done():
+            if message["type"].endswith(".failed"):
+                future.set_exception(RuntimeError(message.get("message", f"lifespan {phase} failed")))
+            else:
+                future.set_result(None)
+
+    async def _run(self):
+        try:
+            await self.app({"type": "lifespan", "asgi": {"version": "3.0"}}, self._receive, self._send)
+        except Exception as e:
+            for future in self._events.values():
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _step(self, phase: str):
+        loop = asyncio.get_running_loop()
+        self._events[phase] = loop.create_future()
+        await self._inbox.put({"type": f"lifespan.{phase}"})
+        await self._events[phase]
+
+    async def startup(self):
+        self._inbox = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        await self._step("startup")
+
+    async def shutdown(self):
+        if self._task is None:
+            return
+        await self._step("shutdown")
+        await self._task
+        self._task = None
@@ -1,67 +1,158 @@
 # backend/run.py
 """
-Lanceur principal du backend : combine FastAPI + Tornado WebSocket
-- Utilise uvicorn pour servir FastAPI
-- Intègre Tornado pour gérer les WebSockets (plus mature que les WebSockets natifs FastAPI pour MVP)
-- Permet de servir les deux sur le même port (ex: 8000)
+Lanceur principal du backend : FastAPI + Tornado WebSocket sur un seul port
+- Un seul listener Tornado : /ws/kanban/{project_id} est servi par le handler
+  Tornado, tout le reste par l'application FastAPI via le pont ASGI
+  (voir asgi_bridge.py)
+- Plusieurs workers (--workers, 0 = un par cœur) : chaque process ouvre son
+  propre socket en SO_REUSEPORT et le noyau répartit les connexions
+- Avec plus d'un worker, EVENT_BUS_BACKEND=unix est nécessaire pour que les
+  événements, caches et présences soient partagés entre process
+- uvloop utilisé s'il est installé
+- Arrêt coordonné (SIGTERM / Ctrl+C), pensé pour les déploiements progressifs :
+  plus de nouvelles connexions, "reconnect_later" avec délai aléatoire à
+  chaque socket Kanban, requêtes en cours terminées
+  (SERVER_SHUTDOWN_GRACE_SECONDS max), dernier vidage de l'outbox et des
+  files d'envoi, fermeture 1012, checkpoint du WAL
+- Développement de l'API seule : uvicorn backend.app.main:app --reload
 """
 
+import argparse
 import asyncio
-import uvicorn
-from tornado.ioloop import IOLoop
-from tornado.web import Application
+import os
+import signal
+
 from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.process import cpu_count, fork_processes, task_id
+from tornado.web import Application
 
+from backend.app.config import settings
+from backend.app.database import create_db_and_tables, engine
 from backend.app.main import app as fastapi_app  # L'app FastAPI créée dans main.py
-from backend.websocket.kanban_ws import KanbanWebSocketHandler  # On va créer ce handler après
+from backend.app.outbox import outbox_dispatcher
+from backend.asgi_bridge import ASGIHandler, Lifespan
+from backend.websocket.kanban_ws import (
+    KanbanWebSocketHandler, announce_restart, dispatcher, drain_connections, log_request, presence,
+    stop_reaper,
+)
+
+try:
+    import uvloop  # optionnel (voir requirements.txt)
+except ImportError:
+    uvloop = None
+
 
 # ───────────────────────────────────────────────
-# Configuration du serveur Tornado + intégration FastAPI
+# Application Tornado : WebSockets + tout le reste vers FastAPI
 # ───────────────────────────────────────────────
-def run_server():
-    # Port et host
-    HOST = "0.0.0.0"
-    PORT = 8000
-
-    # Application Tornado qui va gérer les WebSockets
-    tornado_app = Application(
+def make_app() -> Application:
+    return Application(
         [
             # Route WebSocket pour le Kanban (ex: ws://localhost:8000/ws/kanban/{project_id})
             (r"/ws/kanban/(?P<project_id>\d+)", KanbanWebSocketHandler),
             # On peut ajouter d'autres routes WS ici plus tard (ex: invitations, notifications)
+            # API REST (FastAPI) : toutes les autres URL
+            (r".*", ASGIHandler, {"app": fastapi_app}),
         ],
-        debug=True,
+        # Journal sans query string : ?token=... ne doit pas finir dans les logs
+        log_function=log_request,
+        # Ping serveur : un client muet au-delà du timeout est déconnecté
+        websocket_ping_interval=settings.WS_PING_INTERVAL_SECONDS,
+        websocket_ping_timeout=settings.WS_PING_TIMEOUT_SECONDS,
     )
 
-    # Serveur Tornado
-    http_server = HTTPServer(tornado_app)
-
-    # Boucle événementielle asyncio (compatible avec FastAPI async)
-    loop = asyncio.get_event_loop()
-    IOLoop.configure(loop)
-
-    # On lance le serveur HTTP/Tornado
-    http_server.listen(PORT, address=HOST)
-    print(f"Tornado WebSocket server démarré sur http://{HOST}:{PORT}")
-
-    # On monte FastAPI via ASGI dans Tornado (via uvicorn)
-    # Alternative : lancer uvicorn séparément, mais on veut tout sur le même port
-    # Pour MVP : on lance uvicorn en thread ou on utilise un proxy reverse (mais ici on simplifie)
-
-    # Lancement uvicorn dans la boucle asyncio
-    config = uvicorn.Config(
-        "backend.app.main:app",
-        host=HOST,
-        port=PORT,
-        log_level="info",
-        reload=True,  # Auto-reload en dev
-        factory=False,
-    )
-    server = uvicorn.Server(config)
 
-    # On lance tout dans la boucle
-    loop.run_until_complete(server.serve())
+# ───────────────────────────────────────────────
+# Un worker : écoute, attend le signal d'arrêt, puis vide proprement
+# ───────────────────────────────────────────────
+async def serve(host: str, port: int, reuse_port: bool):
+    loop = asyncio.get_running_loop()
+    # Les broadcasts publiés par les routes sont vidés sur cette boucle
+    dispatcher.bind(loop)
+
+    # Démarrage FastAPI (tables, bus, dispatcher outbox) dans ce process
+    lifespan = Lifespan(fastapi_app)
+    await lifespan.startup()
+
+    server = HTTPServer(make_app())
+    server.add_sockets(bind_sockets(port, address=host, reuse_port=reuse_port))
+    worker = task_id()
+    print(f"Worker {worker if worker is not None else 0} (pid {os.getpid()}) à l'écoute sur http://{host}:{port}")
+
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    print(f"Arrêt du worker (pid {os.getpid()}) : vidage des connexions...")
+    # 1. Plus de nouvelles connexions (les autres workers prennent le relais),
+    #    clients Kanban invités à se reconnecter plus tard, chacun à son heure
+    server.stop()
+    notified = announce_restart()
+    stop_reaper()
+    presence.stop()
+    print(f"  - {notified} client(s) WebSocket prévenu(s)")
+    # 2. Requêtes HTTP en cours (écritures SQLite) menées jusqu'au commit
+    if not await ASGIHandler.wait_idle(settings.SERVER_SHUTDOWN_GRACE_SECONDS):
+        print(f"  - délai de grâce dépassé : {ASGIHandler.in_flight} requête(s) interrompue(s)")
+    await server.close_all_connections()
+    # 3. Dernier vidage de l'outbox : tout ce qui est commité part vers les sockets
+    await outbox_dispatcher.stop()
+    # 4. Files de broadcast et d'envoi vidées, puis fermeture 1012
+    await drain_connections(settings.WS_DRAIN_TIMEOUT_SECONDS)
+    # 5. Arrêt FastAPI : bus, checkpoint du WAL SQLite
+    await lifespan.shutdown()
+    print(f"Worker (pid {os.getpid()}) arrêté")
+
+
+# ───────────────────────────────────────────────
+# Lancement (process parent → workers)
+# ───────────────────────────────────────────────
+def run_server(host: str, port: int, workers: int):
+    # Tables + migrations une seule fois, avant le fork (les workers ne
+    # trouvent ensuite plus rien à appliquer) ; pas de connexion héritée
+    create_db_and_tables()
+    engine.dispose()
+
+    workers = workers or cpu_count()
+    if workers > 1:
+        if settings.EVENT_BUS_BACKEND == "local":
+            print("Attention : plusieurs workers avec EVENT_BUS_BACKEND=local, "
+                  "les WebSockets d'un worker ne verront pas les événements des autres")
+
+        # Groupe de process propre au serveur : le relais des signaux ne doit
+        # pas atteindre le shell ou le script qui l'a lancé
+        if os.getpgrp() != os.getpid():
+            os.setpgrp()
+
+        # Parent : SIGINT / SIGTERM relayés à tous les workers (SIGTERM).
+        # Chaque worker remplace ces handlers au démarrage.
+        def forward_signal(signum, frame):
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            os.killpg(os.getpgrp(), signal.SIGTERM)
+
+        signal.signal(signal.SIGINT, forward_signal)
+        signal.signal(signal.SIGTERM, forward_signal)
+        # Ne revient que dans les workers ; le parent surveille et relance
+        # ceux qui meurent anormalement, et se termine avec le dernier
+        fork_processes(workers)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(serve(host, port, reuse_port=workers > 1))
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backend Task Manager (API + WebSocket)")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="Nombre de process (0 = un par cœur)")
+    args = parser.parse_args()
+
     print("Démarrage du serveur backend (FastAPI + Tornado WebSocket)...")
-    run_server()
+    run_server(args.host, args.port, args.workers)
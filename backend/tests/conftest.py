@@ -0,0 +1,59 @@
+# backend/tests/conftest.py
+"""
+Fixtures communes des tests backend
+- Base SQLite jetable (DATABASE_URL) et bcrypt au coût minimal, positionnés
+  AVANT le premier import de backend.app (settings lus à l'import)
+- client : TestClient FastAPI partagé (lifespan : tables, migrations, outbox)
+- make_user / auth : utilisateurs inscrits + en-têtes Authorization
+Lancement depuis la racine du dépôt : python -m pytest -q
+"""
+
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="task-manager-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP / 'test.db'}"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["EVENT_BUS_BACKEND"] = "local"
+os.environ["EVENT_BUS_SOCKET_DIR"] = str(_TMP / "bus")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    """Inscrit + connecte un nouvel utilisateur → (user_id, en-têtes)"""
+    def _make_user():
+        name = f"u{uuid.uuid4().hex[:10]}"
+        user = client.post("/auth/register", json={
+            "email": f"{name}@example.com", "username": name, "password": "password123",
+        }).json()
+        token = client.post("/auth/login", data={"username": name, "password": "password123"}).json()["access_token"]
+        return user["id"], {"Authorization": f"Bearer {token}"}
+    return _make_user
+
+
+@pytest.fixture
+def auth(make_user):
+    return make_user()[1]
+
+
+@pytest.fixture
+def team_id(client, auth):
+    return client.post("/teams/", json={"name": "Équipe test"}, headers=auth).json()["id"]
+
+
+@pytest.fixture
+def project_id(client, auth, team_id):
+    return client.post("/projects/", json={"name": "Projet test", "team_id": team_id}, headers=auth).json()["id"]
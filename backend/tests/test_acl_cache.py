@@ -0,0 +1,105 @@
+# backend/tests/test_acl_cache.py
+"""
+Cache des décisions d'accès : décisions (autorisé ou refusé) mises en cache,
+404 jamais mis en cache, invalidation par projet / équipe via le bus,
+décisions gardées par requête (nombre de requêtes SQL compté)
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from backend.app.cache import MISSING, TTLCache
+from backend.app.database import AsyncSessionLocal, async_engine
+from backend.app.dependencies import CurrentUser
+from backend.app.permissions import AccessResolver, acl_cache, invalidate_project, invalidate_team
+
+
+def test_decisions_are_cached_for_owner_and_stranger(client, make_user, auth, team_id, project_id):
+    owner_id = client.get("/auth/me", headers=auth).json()["id"]
+    stranger_id, stranger = make_user()
+
+    assert client.get(f"/projects/{project_id}", headers=auth).status_code == 200
+    assert client.get(f"/projects/{project_id}", headers=stranger).status_code == 403
+
+    assert acl_cache.get(("project", owner_id, project_id)) == (team_id, True)
+    assert acl_cache.get(("project", stranger_id, project_id)) == (team_id, False)
+    # Décision en cache : toujours refusé
+    assert client.get("/tasks/", params={"project_id": project_id}, headers=stranger).status_code == 403
+
+
+def test_missing_resources_are_not_cached(client, auth):
+    owner_id = client.get("/auth/me", headers=auth).json()["id"]
+    assert client.get("/projects/987654321", headers=auth).status_code == 404
+    assert acl_cache.get(("project", owner_id, 987654321)) is MISSING
+
+
+def test_invalidation_by_project_and_by_team(client, auth, team_id, project_id):
+    owner_id = client.get("/auth/me", headers=auth).json()["id"]
+    client.get(f"/projects/{project_id}", headers=auth)
+    client.get("/projects/", params={"team_id": team_id}, headers=auth)
+    assert acl_cache.get(("team", owner_id, team_id)) is not MISSING
+
+    invalidate_project(project_id)
+    assert acl_cache.get(("project", owner_id, project_id)) is MISSING
+    assert acl_cache.get(("team", owner_id, team_id)) is not MISSING
+
+    client.get(f"/projects/{project_id}", headers=auth)
+    invalidate_team(team_id)
+    assert acl_cache.get(("project", owner_id, project_id)) is MISSING
+    assert acl_cache.get(("team", owner_id, team_id)) is MISSING
+
+
+def test_ttl_cache_expiry_and_lru_eviction():
+    cache = TTLCache("test", max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" devient le moins récemment utilisé
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING and cache.get("a") == 1 and cache.evictions == 1
+
+    cache.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is MISSING
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+def test_warm_cache_checks_access_without_sql(client, auth, project_id):
+    client.get("/tasks/", params={"project_id": project_id}, headers=auth)
+    with _count_queries() as statements:
+        assert client.get("/tasks/", params={"project_id": project_id}, headers=auth).status_code == 200
+    # Utilisateur et décision en cache : révision (ETag) puis liste, rien d'autre
+    assert len(statements) == 2
+    assert not any("team" in statement.lower() for statement in statements)
+
+
+def test_decisions_are_kept_per_request(client, auth, project_id, monkeypatch):
+    me = client.get("/auth/me", headers=auth).json()
+    user = CurrentUser(**{key: me[key] for key in ("id", "username", "email", "full_name", "is_active")})
+    # Cache partagé sans effet (TTL écoulé, entrée évincée...)
+    monkeypatch.setattr(acl_cache, "get", lambda key, default=MISSING: MISSING)
+
+    async def check_twice():
+        async with AsyncSessionLocal() as session:
+            access = AccessResolver(session, user)
+            await access.ensure_project_access(project_id)
+            await access.ensure_project_access(project_id)
+
+    with _count_queries() as statements:
+        asyncio.run(check_twice())
+    assert len(statements) == 1
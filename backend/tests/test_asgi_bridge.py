@@ -0,0 +1,98 @@
+# backend/tests/test_asgi_bridge.py
+"""
+Pont Tornado → ASGI : corps de requête transmis, réponse envoyée au fil de
+l'eau (more_body), exception de l'application → 500, protocole lifespan
+"""
+
+import asyncio
+
+import pytest
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+from tornado.web import Application
+
+from backend.asgi_bridge import ASGIHandler, Lifespan
+
+
+async def _fetch(app, path: str, **kwargs):
+    """Sert l'app ASGI sur un port libre le temps d'une requête"""
+    sock, port = bind_unused_port()
+    server = HTTPServer(Application([(r".*", ASGIHandler, {"app": app})]))
+    server.add_sockets([sock])
+    try:
+        return await AsyncHTTPClient().fetch(f"http://127.0.0.1:{port}{path}", raise_error=False, **kwargs)
+    finally:
+        server.stop()
+
+
+def test_request_body_in_and_streamed_response_out():
+    async def scenario():
+        first_chunk_received = asyncio.Event()
+        chunks = []
+
+        async def app(scope, receive, send):
+            message = await receive()
+            await send({"type": "http.response.start", "status": 201,
+                        "headers": [(b"content-type", b"text/plain"), (b"x-path", scope["path"].encode())]})
+            await send({"type": "http.response.body", "body": message["body"].upper(), "more_body": True})
+            # Le client doit recevoir le 1er morceau avant la fin de la réponse
+            await asyncio.wait_for(first_chunk_received.wait(), timeout=5)
+            await send({"type": "http.response.body", "body": b"-fin"})
+
+        def on_chunk(chunk: bytes):
+            chunks.append(chunk)
+            first_chunk_received.set()
+
+        response = await _fetch(app, "/t%C3%A2ches", method="POST", body=b"corps", streaming_callback=on_chunk)
+        return response, chunks
+
+    response, chunks = asyncio.run(scenario())
+    assert response.code == 201
+    assert response.headers["Content-Type"] == "text/plain"
+    assert response.headers["X-Path"] == "/tâches".encode().decode("latin-1")
+    assert b"".join(chunks) == b"CORPS-fin"
+    assert ASGIHandler.in_flight == 0
+
+
+def test_application_error_becomes_500(capsys):
+    async def app(scope, receive, send):
+        raise ValueError("boum")
+
+    response = asyncio.run(_fetch(app, "/erreur"))
+    assert response.code == 500
+    assert ASGIHandler.in_flight == 0
+    # Trace complète dans les logs, pas seulement le message
+    assert "Traceback" in capsys.readouterr().err
+
+
+def test_lifespan_startup_and_shutdown():
+    calls = []
+
+    async def app(scope, receive, send):
+        assert scope["type"] == "lifespan"
+        while True:
+            message = await receive()
+            phase = message["type"].split(".")[1]
+            calls.append(phase)
+            await send({"type": f"lifespan.{phase}.complete"})
+            if phase == "shutdown":
+                return
+
+    async def scenario():
+        lifespan = Lifespan(app)
+        await lifespan.startup()
+        await lifespan.shutdown()
+        await lifespan.shutdown()  # Deuxième appel sans effet
+
+    asyncio.run(scenario())
+    assert calls == ["startup", "shutdown"]
+
+
+def test_lifespan_startup_failure_is_raised():
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "lifespan.startup.failed", "message": "base indisponible"})
+
+    with pytest.raises(RuntimeError, match="base indisponible"):
+        asyncio.run(Lifespan(app).startup())
@@ -0,0 +1,83 @@
+# backend/tests/test_auth_cache.py
+"""
+Caches d'authentification : tokens vérifiés une fois (jusqu'à leur "exp"),
+utilisateurs en instantanés immuables, invalidés par la mise à jour du
+profil et la désactivation du compte
+"""
+
+import hashlib
+import time
+from datetime import timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from backend.app import dependencies
+from backend.app.cache import MISSING
+from backend.app.dependencies import CurrentUser, create_access_token, token_cache, user_cache, verify_token
+
+
+def test_verified_tokens_skip_jwt_decode(monkeypatch):
+    token = create_access_token({"sub": "alice", "user_id": 1})
+    first = verify_token(token)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("jwt.decode appelé malgré le cache")
+
+    monkeypatch.setattr(dependencies.jwt, "decode", fail)
+    assert verify_token(token) is first
+
+
+def test_token_cache_never_outlives_exp():
+    token = create_access_token({"sub": "bob", "user_id": 2}, expires_delta=timedelta(seconds=1))
+    verify_token(token)
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    assert token_cache.get(digest) is not MISSING
+    time.sleep(1.1)
+    assert token_cache.get(digest) is MISSING
+
+
+def test_token_signed_with_another_key_is_rejected(client, make_user):
+    user_id, _ = make_user()
+    forged = dependencies.jwt.encode({"sub": "x", "user_id": user_id}, "autre-clé", algorithm=dependencies.ALGORITHM)
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+
+
+def test_cached_user_is_an_immutable_snapshot(client, make_user):
+    user_id, headers = make_user()
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    cached = user_cache.get(user_id)
+    assert isinstance(cached, CurrentUser)
+    with pytest.raises(ValidationError):
+        cached.is_active = False
+
+
+def test_profile_update_invalidates_cached_user(client, make_user):
+    user_id, headers = make_user()
+    client.get("/auth/me", headers=headers)
+
+    response = client.patch("/auth/me", json={"full_name": "Nouveau Nom"}, headers=headers)
+    assert response.status_code == 200
+    assert user_cache.get(user_id) is MISSING
+    assert client.get("/auth/me", headers=headers).json()["full_name"] == "Nouveau Nom"
+
+
+def test_profile_update_rejects_taken_username(client, make_user):
+    _, headers = make_user()
+    other_id, other_headers = make_user()
+    taken = client.get("/auth/me", headers=other_headers).json()["username"]
+
+    response = client.patch("/auth/me", json={"username": taken}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_deactivation_rejects_cached_token(client, make_user):
+    _, headers = make_user()
+    # Token et utilisateur en cache
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    assert client.delete("/auth/me", headers=headers).status_code == 204
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
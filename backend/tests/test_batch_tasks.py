@@ -0,0 +1,70 @@
+# backend/tests/test_batch_tasks.py
+"""
+POST /tasks/batch : une révision par tâche, un événement "batch" par projet,
+seuls les champs fournis sont écrits
+"""
+
+import asyncio
+import json
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from backend.app.api import tasks as tasks_api
+from backend.app.database import engine
+from backend.app.models.outbox import OutboxEvent
+
+
+def test_batch_assigns_one_revision_per_task(client, auth, project_id):
+    existing = client.post("/tasks/", json={"title": "Existante", "project_id": project_id}, headers=auth).json()
+    response = client.post("/tasks/batch", json={"operations": [
+        {"op": "create", "task": {"title": "Nouvelle", "project_id": project_id}},
+        {"op": "move", "task_id": existing["id"], "status": "done"},
+        {"op": "update", "task_id": existing["id"], "changes": {"priority": "high"}},
+    ]}, headers=auth)
+    assert response.status_code == 200
+    body = response.json()
+
+    # Deux opérations sur la même tâche → une seule écriture, une seule révision
+    created, moved = body["tasks"]
+    assert created["title"] == "Nouvelle"
+    assert (moved["status"], moved["priority"]) == ("done", "high")
+    last = body["revisions"][str(project_id)]
+
+    with Session(engine) as session:
+        row = session.exec(
+            select(OutboxEvent).where(OutboxEvent.project_id == project_id).order_by(OutboxEvent.id.desc())
+        ).first()
+    event = json.loads(row.payload)
+    assert event["event_type"] == "batch"
+    assert [item["seq"] for item in event["events"]] == [last - 1, last]
+    assert [item["task_id"] for item in event["events"]] == [created["id"], moved["id"]]
+
+
+def test_batch_keeps_concurrent_changes_to_other_fields(client, auth, project_id, monkeypatch):
+    task = client.post("/tasks/", json={
+        "title": "Concurrente", "description": "avant", "project_id": project_id,
+    }, headers=auth).json()
+
+    original = tasks_api.next_project_revision
+
+    def concurrent_patch():
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE task SET description = 'pendant' WHERE id = :id"), {"id": task["id"]})
+
+    async def patch_in_between(session, project_id, count=1):
+        # PATCH d'un autre client commité entre la lecture des tâches et l'écriture
+        # du lot (dans un thread : la boucle doit rester libre pour les autres écrivains)
+        await asyncio.to_thread(concurrent_patch)
+        return await original(session, project_id, count)
+
+    monkeypatch.setattr(tasks_api, "next_project_revision", patch_in_between)
+    response = client.post("/tasks/batch", json={"operations": [
+        {"op": "move", "task_id": task["id"], "status": "in_progress"},
+    ]}, headers=auth)
+    assert response.status_code == 200
+
+    moved = response.json()["tasks"][0]
+    assert (moved["status"], moved["description"]) == ("in_progress", "pendant")
+    stored = client.get(f"/tasks/{task['id']}", headers=auth).json()
+    assert (stored["status"], stored["description"]) == ("in_progress", "pendant")
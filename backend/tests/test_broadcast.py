@@ -0,0 +1,68 @@
+# backend/tests/test_broadcast.py
+"""
+Dispatcher de broadcast en mode FIFO : publication depuis plusieurs threads,
+vidage sur la boucle par lots bornés, ordre conservé par projet
+"""
+
+import asyncio
+import threading
+
+from backend.websocket.broadcast import BroadcastDispatcher
+
+
+def test_publish_from_threads_is_drained_on_the_loop_in_order():
+    delivered = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop_thread = threading.get_ident()
+
+        def deliver(project_id, events):
+            assert threading.get_ident() == loop_thread
+            delivered.append((project_id, events))
+
+        dispatcher = BroadcastDispatcher(deliver, max_pending_per_project=1000, batch_size=10)
+        dispatcher.bind(loop)
+
+        def producer(project_id: int):
+            for seq in range(1, 101):
+                dispatcher.publish(project_id, {"seq": seq})
+
+        threads = [threading.Thread(target=producer, args=(project_id,)) for project_id in (1, 2, 3)]
+        for thread in threads:
+            thread.start()
+        await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+        while dispatcher.pending():
+            await asyncio.sleep(0.01)
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+    for project_id in (1, 2, 3):
+        seqs = [event["seq"] for pid, events in delivered if pid == project_id for event in events]
+        assert seqs == list(range(1, 101))
+    # Budget par tour de boucle respecté
+    assert max(len(events) for _, events in delivered) <= 10
+    stats = dispatcher.stats()
+    assert stats["published"] == stats["delivered"] == 300
+    assert stats["queue_depth"] == 0 and stats["dropped"] == 0
+
+
+def test_saturated_queue_drops_oldest_and_unbound_publish_is_counted():
+    delivered = []
+
+    async def scenario():
+        dispatcher = BroadcastDispatcher(lambda pid, events: delivered.extend(events),
+                                         max_pending_per_project=3, batch_size=10)
+        dispatcher.bind(asyncio.get_running_loop())
+        for seq in range(1, 6):
+            dispatcher.publish(1, {"seq": seq})  # Même tour de boucle : rien n'est encore vidé
+        await asyncio.sleep(0.01)
+        return dispatcher
+
+    dispatcher = asyncio.run(scenario())
+    assert [event["seq"] for event in delivered] == [3, 4, 5]
+    assert dispatcher.dropped == 2
+
+    # Boucle fermée : publication perdue mais comptée, sans exception
+    dispatcher.publish(1, {"seq": 6})
+    assert not dispatcher.bound and dispatcher.dropped == 3
@@ -0,0 +1,66 @@
+# backend/tests/test_broadcast_window.py
+"""
+Fenêtre de fusion du dispatcher : une trame "batch" par fenêtre, événements
+d'une même tâche fusionnés, seq croissants dans la trame, fenêtre pleine
+envoyée sans perte
+"""
+
+import asyncio
+
+from backend.websocket.broadcast import BroadcastDispatcher
+
+
+def _run_window(events, window_ms=20, max_pending=100):
+    delivered = []
+
+    async def scenario():
+        dispatcher = BroadcastDispatcher(
+            lambda project_id, frames: delivered.append((project_id, frames)),
+            max_pending_per_project=max_pending, batch_size=100, coalesce_window_ms=window_ms,
+        )
+        dispatcher.bind(asyncio.get_running_loop())
+        for event in events:
+            dispatcher.publish(1, event)
+        await asyncio.sleep(window_ms / 1000 * 3)
+        return dispatcher
+
+    return asyncio.run(scenario()), delivered
+
+
+def test_window_merges_same_task_and_keeps_seq_order():
+    dispatcher, delivered = _run_window([
+        {"event_type": "task_created", "task_id": 10, "seq": 1, "data": {"title": "a"}},
+        {"event_type": "task_updated", "task_id": 20, "seq": 2, "data": {"title": "b"}},
+        {"event_type": "task_updated", "task_id": 10, "seq": 3, "data": {"title": "a2"}},
+    ])
+
+    assert len(delivered) == 1
+    project_id, [frame] = delivered[0]
+    assert project_id == 1 and frame["event_type"] == "batch"
+    events = frame["events"]
+    assert [event["seq"] for event in events] == [2, 3]
+    # Créée puis modifiée dans la fenêtre : reste une création, dernier état
+    assert (events[1]["event_type"], events[1]["data"]["title"]) == ("task_created", "a2")
+    assert dispatcher.merged == 1
+
+
+def test_prebuilt_batch_joins_the_window_event_by_event():
+    _, delivered = _run_window([
+        {"event_type": "batch", "events": [
+            {"event_type": "task_updated", "task_id": 1, "seq": 1},
+            {"event_type": "task_updated", "task_id": 2, "seq": 2},
+        ]},
+        {"event_type": "presence", "viewers": 3},
+    ])
+    [frame] = delivered[0][1]
+    assert [event.get("seq") for event in frame["events"]] == [1, 2, None]
+
+
+def test_full_window_is_flushed_early_without_losing_events():
+    dispatcher, delivered = _run_window(
+        [{"event_type": "task_updated", "task_id": seq, "seq": seq} for seq in range(1, 6)],
+        max_pending=2,
+    )
+    frames = [frame for _, [frame] in delivered]
+    assert [[event["seq"] for event in frame["events"]] for frame in frames] == [[1, 2], [3, 4], [5]]
+    assert dispatcher.early_flushes == 2 and dispatcher.dropped == 0
@@ -0,0 +1,50 @@
+# backend/tests/test_changes_feed.py
+"""
+GET /tasks/changes : état initial + curseur, puis seulement les tâches
+modifiées depuis ce curseur (par lots, has_more)
+"""
+
+
+def _changes(client, auth, project_id, **params):
+    response = client.get("/tasks/changes", params={"project_id": project_id, **params}, headers=auth)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_since_cursor(client, auth, project_id):
+    first, second = [
+        client.post("/tasks/", json={"title": title, "project_id": project_id}, headers=auth).json()
+        for title in ("Première", "Seconde")
+    ]
+    initial = _changes(client, auth, project_id)
+    assert [task["id"] for task in initial["tasks"]] == [first["id"], second["id"]]
+    assert not initial["has_more"]
+
+    # Rien de nouveau : liste vide, même curseur
+    idle = _changes(client, auth, project_id, since=initial["cursor"])
+    assert idle["tasks"] == [] and idle["cursor"] == initial["cursor"]
+
+    client.patch(f"/tasks/{first['id']}", json={"status": "done"}, headers=auth)
+    delta = _changes(client, auth, project_id, since=initial["cursor"])
+    assert [(task["id"], task["status"]) for task in delta["tasks"]] == [(first["id"], "done")]
+    assert delta["cursor"] != initial["cursor"]
+
+
+def test_changes_are_paged_with_has_more(client, auth, project_id):
+    ids = [
+        client.post("/tasks/", json={"title": f"Tâche {index}", "project_id": project_id}, headers=auth).json()["id"]
+        for index in range(5)
+    ]
+    seen, cursor, calls = [], None, 0
+    while True:
+        page = _changes(client, auth, project_id, limit=2, **({"since": cursor} if cursor else {}))
+        seen += [task["id"] for task in page["tasks"]]
+        cursor, calls = page["cursor"], calls + 1
+        if not page["has_more"]:
+            break
+    assert seen == ids and calls == 3
+
+
+def test_invalid_cursor_is_rejected(client, auth, project_id):
+    response = client.get("/tasks/changes", params={"project_id": project_id, "since": "zzz"}, headers=auth)
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+# backend/tests/test_encoding.py
+"""
+Encodage des trames : négociation du format, encodage unique par format
+partagé entre connexions, JSON identique avec et sans orjson
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from backend.app import serialization
+from backend.websocket import encoding
+from backend.websocket.encoding import FrameEncoder, negotiate
+
+
+def test_negotiate_falls_back_to_json():
+    assert negotiate("cjson") == "cjson"
+    assert negotiate("xml") == "json"
+    assert negotiate("msgpack") == ("msgpack" if encoding.msgpack is not None else "json")
+
+
+def test_frames_are_encoded_once_per_format(monkeypatch):
+    calls = []
+    real_encode = encoding.encode
+    monkeypatch.setattr(encoding, "encode", lambda obj, fmt: calls.append(fmt) or real_encode(obj, fmt))
+
+    encoder = FrameEncoder([
+        {"event_type": "task_updated", "task_id": 1, "seq": 4, "data": {"title": "é"}},
+        {"event_type": "batch", "events": [{"seq": 5}, {"seq": 7}, {}]},
+        {"event_type": "presence", "viewers": 2},
+    ])
+    # Plusieurs connexions, même format : même liste de trames
+    assert encoder.frames("json") is encoder.frames("json")
+    compact = encoder.frames("cjson")
+    assert calls == ["json"] * 3 + ["cjson"] * 3
+
+    assert json.loads(compact[0]) == {"e": "task_updated", "t": 1, "s": 4, "d": {"ti": "é"}}
+    assert encoder.sizes("json")[0] == len(encoder.frames("json")[0].encode("utf-8"))
+    # Trame "batch" : son plus grand seq
+    assert encoder.seqs == [4, 7, None]
+    assert encoder.coalesce_keys == [("task", 1), None, None]
+
+
+def test_same_json_with_and_without_orjson(monkeypatch):
+    event = {"title": "Tâche", "due": datetime(2024, 5, 1, 12, 30), 3: "clé entière"}
+    with_orjson = serialization.dumps(event, non_str_keys=True)
+    ndjson = serialization.dumps({"a": 1}, newline=True)
+
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps(event, non_str_keys=True) == with_orjson
+    assert serialization.dumps({"a": 1}, newline=True) == ndjson == b'{"a":1}\n'
+    assert serialization.loads(with_orjson)["due"] == "2024-05-01T12:30:00"
+
+    with pytest.raises(TypeError):
+        serialization.dumps({"value": object()})
@@ -0,0 +1,92 @@
+# backend/tests/test_etags.py
+"""ETags / 304 des lectures de projets et de tâches"""
+
+
+def _etag(client, url, headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def _revalidate(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def test_project_list_not_modified_until_a_project_changes(client, auth, team_id, project_id):
+    etag = _etag(client, "/projects/", auth)
+    assert _revalidate(client, "/projects/", auth, etag).status_code == 304
+
+    client.patch(f"/projects/{project_id}", json={"description": "nouvelle"}, headers=auth)
+    assert _revalidate(client, "/projects/", auth, etag).status_code == 200
+
+
+def test_project_list_etag_follows_task_revisions(client, auth, team_id, project_id):
+    # Une tâche incrémente project.revision et updated_at, visibles dans la liste
+    for url in ("/projects/", f"/projects/?team_id={team_id}"):
+        etag = _etag(client, url, auth)
+        client.post("/tasks/", json={"title": "t", "project_id": project_id}, headers=auth)
+
+        response = _revalidate(client, url, auth, etag)
+        assert response.status_code == 200
+        listed = {project["id"]: project for project in response.json()}
+        assert listed[project_id]["revision"] == client.get(f"/projects/{project_id}", headers=auth).json()["revision"]
+
+
+def test_project_list_etag_changes_on_creation(client, auth, team_id, project_id):
+    etag = _etag(client, f"/projects/?team_id={team_id}", auth)
+    client.post("/projects/", json={"name": "Autre projet", "team_id": team_id}, headers=auth)
+    assert _revalidate(client, f"/projects/?team_id={team_id}", auth, etag).status_code == 200
+
+
+def test_task_list_not_modified_until_board_changes(client, auth, project_id):
+    url = f"/tasks/?project_id={project_id}"
+    etag = _etag(client, url, auth)
+    assert _revalidate(client, url, auth, etag).status_code == 304
+
+    task = client.post("/tasks/", json={"title": "t", "project_id": project_id}, headers=auth).json()
+    response = _revalidate(client, url, auth, etag)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    client.patch(f"/tasks/{task['id']}", json={"status": "done"}, headers=auth)
+    assert _revalidate(client, url, auth, etag).status_code == 200
+
+
+def test_list_variants_have_distinct_etags(client, auth, project_id):
+    base = f"/tasks/?project_id={project_id}"
+    etags = {_etag(client, base + suffix, auth) for suffix in ("", "&status=done", "&limit=5", "&fields=title")}
+    assert len(etags) == 4
+
+
+def _write_from_other_worker(project_id):
+    # Écriture d'un autre process : aucun message du bus n'arrive ici
+    from sqlalchemy import text
+    from backend.app.database import engine
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE project SET revision = revision + 1 WHERE id = :id"), {"id": project_id})
+
+
+def test_etags_follow_persisted_revision_without_bus(client, auth, project_id):
+    task = client.post("/tasks/", json={"title": "t", "project_id": project_id}, headers=auth).json()
+    urls = [
+        f"/projects/{project_id}",
+        f"/tasks/?project_id={project_id}",
+        f"/tasks/changes?project_id={project_id}",
+        f"/tasks/{task['id']}",
+    ]
+    etags = {url: _etag(client, url, auth) for url in urls}
+    for url in urls:
+        assert _revalidate(client, url, auth, etags[url]).status_code == 304
+
+    _write_from_other_worker(project_id)
+    for url in urls:
+        assert _revalidate(client, url, auth, etags[url]).status_code == 200, url
+
+
+def test_etag_is_stable_across_processes():
+    from backend.app.revisions import make_etag, project_key
+
+    # Aucune part aléatoire par process : un autre worker calcule le même ETag
+    assert make_etag(project_key(1), 7, "list") == make_etag(project_key(1), 7, "list")
+    assert make_etag(project_key(1), 7, "list") != make_etag(project_key(1), 8, "list")
@@ -0,0 +1,102 @@
+# backend/tests/test_event_bus.py
+"""Bus d'événements unix : messages volumineux, ordre, publication depuis un thread"""
+
+import asyncio
+import threading
+
+from backend.app.event_bus import UnixSocketEventBus
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "message non reçu à temps"
+        await asyncio.sleep(0.01)
+
+
+def _pair(tmp_path):
+    make = lambda name: UnixSocketEventBus(
+        str(tmp_path), peer_refresh_seconds=0, max_pending_bytes=64 * 1024 * 1024, name=name
+    )
+    return make("worker-a"), make("worker-b")
+
+
+def test_large_message_reaches_other_worker(tmp_path):
+    # Un lot de 1000 tâches dépasse largement la taille max d'un datagramme
+    received = []
+    payload = {"project_id": 1, "event": {"event_type": "batch", "events": [
+        {"seq": seq, "task_id": seq, "data": {"description": "x" * 400}} for seq in range(1000)
+    ]}}
+
+    async def scenario():
+        sender, receiver = _pair(tmp_path)
+        receiver.subscribe("kanban", received.append)
+        sender.start()
+        receiver.start()
+        try:
+            sender.publish("kanban", payload)
+            await _wait_for(lambda: received)
+        finally:
+            sender.stop()
+            receiver.stop()
+        return sender.stats()
+
+    stats = asyncio.run(scenario())
+    assert received == [payload]
+    assert stats["errors"] == 0 and stats["dropped"] == 0 and stats["sent"] == 1
+
+
+def test_messages_keep_publication_order_across_threads(tmp_path):
+    received = []
+
+    async def scenario():
+        sender, receiver = _pair(tmp_path)
+        receiver.subscribe("test", received.append)
+        sender.start()
+        receiver.start()
+        try:
+            for seq in range(100):
+                sender.publish("test", {"seq": seq})
+            # Publication depuis un autre thread (threadpool, pool bcrypt...)
+            thread = threading.Thread(target=lambda: [sender.publish("test", {"seq": seq}) for seq in range(100, 200)])
+            thread.start()
+            await asyncio.to_thread(thread.join)
+            await _wait_for(lambda: len(received) == 200)
+        finally:
+            sender.stop()
+            receiver.stop()
+
+    asyncio.run(scenario())
+    assert [message["seq"] for message in received] == list(range(200))
+
+
+def test_local_subscribers_called_synchronously(tmp_path):
+    received = []
+    bus, _ = _pair(tmp_path)
+    bus.subscribe("acl", received.append)
+    bus.publish("acl", {"user_id": 3})  # bus pas démarré : local uniquement
+    assert received == [{"user_id": 3}]
+
+
+def test_named_late_peer_is_reached_without_waiting_for_refresh(tmp_path):
+    received = []
+
+    async def scenario():
+        make = lambda name: UnixSocketEventBus(
+            str(tmp_path), peer_refresh_seconds=60, max_pending_bytes=1024 * 1024, name=name
+        )
+        first, late = make("alpha"), make("beta")
+        first.start()
+        first.publish("test", {"n": 0})  # aucun pair encore : local uniquement
+        late.subscribe("test", received.append)
+        late.start()  # s'annonce à "alpha" (redécouverte dans 60 s seulement)
+        try:
+            await _wait_for(lambda: str(late.path) in first._peers)
+            first.publish("test", {"n": 1})
+            await _wait_for(lambda: received)
+        finally:
+            first.stop()
+            late.stop()
+
+    asyncio.run(scenario())
+    assert received == [{"n": 1}]
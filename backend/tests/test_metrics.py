@@ -0,0 +1,18 @@
+# backend/tests/test_metrics.py
+"""
+GET /metrics : 404 tant que METRICS_ENABLED n'est pas activé
+"""
+
+from backend.app.config import settings
+
+
+def test_metrics_hidden_by_default(client):
+    assert not settings.METRICS_ENABLED
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_when_enabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert {"acl_cache", "outbox", "websocket_broadcast"} <= set(response.json())
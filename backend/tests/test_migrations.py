@@ -0,0 +1,89 @@
+# backend/tests/test_migrations.py
+"""
+Migrations versionnées : application sur une base d'avant les révisions,
+tenue de schema_migrations, rattrapage des révisions (ROW_NUMBER), colonne
+ajoutée en parallèle par un autre process
+"""
+
+from sqlalchemy import create_engine, text
+
+from backend.app.migrations import MIGRATIONS, add_column, applied_versions, run_migrations
+
+# Schéma minimal d'une base créée avant les migrations (sans colonnes revision)
+LEGACY_SCHEMA = [
+    "CREATE TABLE project (id INTEGER PRIMARY KEY, team_id INTEGER, created_by INTEGER,"
+    " created_at TEXT, updated_at TEXT)",
+    "CREATE TABLE task (id INTEGER PRIMARY KEY, project_id INTEGER, status TEXT, assigned_to INTEGER,"
+    " created_at TEXT, updated_at TEXT)",
+    "CREATE TABLE outbox (id INTEGER PRIMARY KEY, project_id INTEGER, seq INTEGER, delivered_at TEXT)",
+]
+
+
+def _legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text(
+            "INSERT INTO project (id, created_at, updated_at) VALUES"
+            " (1, '2024-01-01', '2024-01-01'), (2, '2024-01-01', NULL), (3, '2024-01-01', NULL)"
+        ))
+        # Ordre des modifications ≠ ordre des id ; updated_at NULL rattrapé par la migration 2
+        conn.execute(text(
+            "INSERT INTO task (id, project_id, status, created_at, updated_at) VALUES"
+            " (10, 1, 'todo', '2024-01-01', '2024-03-01'),"
+            " (11, 1, 'todo', '2024-01-01', '2024-02-01'),"
+            " (12, 1, 'done', '2024-01-01', '2024-02-01'),"
+            " (13, 2, 'todo', '2024-01-05', NULL)"
+        ))
+    return engine
+
+
+def test_migrations_apply_once_and_are_recorded(tmp_path):
+    engine = _legacy_engine(tmp_path)
+    versions = [version for version, _, _ in MIGRATIONS]
+
+    assert run_migrations(engine) == versions
+    assert applied_versions(engine) == versions
+    with engine.connect() as conn:
+        descriptions = conn.execute(text("SELECT description FROM schema_migrations ORDER BY version")).all()
+    assert [row[0] for row in descriptions] == [description for _, description, _ in MIGRATIONS]
+
+    # Deuxième démarrage : rien à faire
+    assert run_migrations(engine) == []
+
+
+def test_revision_backfill_follows_modification_order(tmp_path):
+    engine = _legacy_engine(tmp_path)
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        tasks = dict(conn.execute(text("SELECT id, revision FROM task")).all())
+        projects = dict(conn.execute(text("SELECT id, revision FROM project")).all())
+        indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(task)"))}
+    # Projet 1 : 11 et 12 (même date, départagées par id) puis 10
+    assert tasks == {11: 1, 12: 2, 10: 3, 13: 1}
+    assert projects == {1: 3, 2: 1, 3: 0}
+    assert "ix_task_project_revision" in indexes
+
+
+class _StaleSchemaConnection:
+    """Connexion qui lit le schéma d'avant l'ALTER d'un process concurrent"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, statement, *args):
+        if str(statement).startswith("PRAGMA table_info"):
+            return []
+        return self.conn.execute(statement, *args)
+
+
+def test_column_added_concurrently_is_not_an_error(tmp_path):
+    engine = _legacy_engine(tmp_path)
+    step = add_column("task", "revision", "INTEGER NOT NULL DEFAULT 0")
+    with engine.begin() as conn:
+        step(conn)
+        step(_StaleSchemaConnection(conn))  # "duplicate column name" ignoré
+        columns = [row[1] for row in conn.execute(text("PRAGMA table_info(task)"))]
+    assert columns.count("revision") == 1
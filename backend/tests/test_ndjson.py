@@ -0,0 +1,45 @@
+# backend/tests/test_ndjson.py
+"""
+Listes en flux NDJSON : Accept: application/x-ndjson sur GET /tasks/ et
+export complet GET /tasks/export
+"""
+
+import json
+
+NDJSON = "application/x-ndjson"
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_task_list_streams_every_task_as_ndjson(client, auth, project_id):
+    ids = [
+        client.post("/tasks/", json={"title": f"Tâche {index}", "project_id": project_id}, headers=auth).json()["id"]
+        for index in range(5)
+    ]
+    response = client.get("/tasks/", params={"project_id": project_id, "order": "board"},
+                          headers={**auth, "Accept": NDJSON})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(NDJSON)
+    assert "ETag" in response.headers
+
+    rows = _lines(response)
+    assert [row["id"] for row in rows] == sorted(ids)
+    # Même représentation que la liste JSON
+    assert rows == client.get("/tasks/", params={"project_id": project_id, "order": "board"}, headers=auth).json()
+
+
+def test_export_applies_projection_and_etag(client, auth, project_id):
+    for index in range(3):
+        client.post("/tasks/", json={"title": f"Tâche {index}", "project_id": project_id}, headers=auth)
+
+    response = client.get("/tasks/export", params={"project_id": project_id, "fields": "title"}, headers=auth)
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    rows = _lines(response)
+    assert len(rows) == 3 and all(set(row) == {"id", "title"} for row in rows)
+
+    again = client.get("/tasks/export", params={"project_id": project_id, "fields": "title"},
+                       headers={**auth, "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
@@ -0,0 +1,101 @@
+# backend/tests/test_outbox.py
+"""
+Outbox : un seul dispatcher leader, rediffusion dans l'ordre après la mort
+d'un leader, doublons ignorés par connexion
+"""
+
+import asyncio
+import json
+import time
+
+from sqlmodel import Session, select
+
+from backend.app.database import engine
+from backend.app.models.outbox import OutboxEvent
+from backend.app.outbox import OutboxDispatcher, outbox_dispatcher
+from backend.websocket import kanban_ws
+
+
+def test_single_leader_and_handover(tmp_path):
+    lock_path = str(tmp_path / "outbox.lock")
+
+    async def scenario():
+        first = OutboxDispatcher(batch_size=10, poll_interval=60, lock_path=lock_path)
+        second = OutboxDispatcher(batch_size=10, poll_interval=60, lock_path=lock_path)
+        first.start()
+        second.start()
+        assert first.is_leader and not second.is_leader
+
+        await first.stop()
+        assert not first.is_leader
+        # Relève au tour suivant du worker restant
+        assert second._try_lead()
+        await second.stop()
+
+    asyncio.run(scenario())
+
+
+def test_dead_leader_batch_is_redelivered_in_order(client, project_id, monkeypatch):
+    sent = []
+    # Lot réservé par un leader mort avant de le marquer livré (les seq
+    # inférieurs sont les événements de création du projet)
+    seqs = list(range(101, 106))
+    monkeypatch.setattr(
+        kanban_ws, "broadcast_to_project",
+        lambda pid, event: sent.append(event["seq"]) if pid == project_id and event["seq"] in seqs else None,
+    )
+    redelivered = outbox_dispatcher.redelivered
+
+    with Session(engine) as session:
+        for seq in seqs:
+            event = {"event_type": "task_updated", "project_id": project_id, "task_id": 1, "seq": seq}
+            session.add(OutboxEvent(
+                project_id=project_id, seq=seq, event_type="task_updated",
+                payload=json.dumps(event), attempts=1,
+            ))
+        session.commit()
+
+    outbox_dispatcher.wake()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with Session(engine) as session:
+            pending = session.exec(select(OutboxEvent).where(
+                OutboxEvent.project_id == project_id, OutboxEvent.delivered_at.is_(None),
+            )).all()
+        # Compteurs mis à jour juste après le commit "livré"
+        if not pending and outbox_dispatcher.redelivered - redelivered == len(seqs):
+            break
+        time.sleep(0.05)
+
+    assert not pending
+    assert sent == seqs
+    assert outbox_dispatcher.redelivered - redelivered == len(seqs)
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.ws_connection = object()
+        self.format = "json"
+        self.last_seq = 0
+        self.sent = []
+
+    def send(self, frame, coalesce_key=None, size=None, critical=False):
+        self.sent.append(json.loads(frame)["seq"])
+
+
+def test_duplicate_seqs_are_dropped_per_connection():
+    project_id = 990_001
+    conn = _FakeConnection()
+    kanban_ws.active_connections[project_id] = {conn}
+    try:
+        events = [{"event_type": "task_updated", "project_id": project_id, "seq": seq} for seq in (1, 2, 3)]
+        kanban_ws._deliver(project_id, events)
+        # Rediffusion du même lot, puis la suite
+        kanban_ws._deliver(project_id, events[1:])
+        kanban_ws._deliver(project_id, [{"event_type": "task_updated", "project_id": project_id, "seq": 4}])
+        # Trame "batch" entièrement déjà reçue
+        kanban_ws._deliver(project_id, [{"event_type": "batch", "project_id": project_id, "events": events}])
+    finally:
+        kanban_ws.active_connections.pop(project_id, None)
+
+    assert conn.sent == [1, 2, 3, 4]
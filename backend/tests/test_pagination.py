@@ -0,0 +1,83 @@
+# backend/tests/test_pagination.py
+"""
+Pagination par clé (X-Next-Cursor) et projection (fields=) des listes
+de tâches et de projets
+"""
+
+import pytest
+
+
+def _create_tasks(client, auth, project_id, count):
+    statuses = ["todo", "in_progress", "done"]
+    return [
+        client.post("/tasks/", json={
+            "title": f"Tâche {index}", "description": "longue description", "status": statuses[index % 3],
+            "project_id": project_id,
+        }, headers=auth).json()
+        for index in range(count)
+    ]
+
+
+def _all_pages(client, auth, url, params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=auth)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("order", ["board", "updated"])
+def test_task_pages_cover_every_task_once(client, auth, project_id, order):
+    tasks = _create_tasks(client, auth, project_id, 7)
+    pages = _all_pages(client, auth, "/tasks/", {"project_id": project_id, "limit": 3, "order": order})
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    ids = [task["id"] for page in pages for task in page]
+    assert sorted(ids) == sorted(task["id"] for task in tasks)
+    if order == "board":
+        rows = [task for page in pages for task in page]
+        assert [(row["status"], row["id"]) for row in rows] == sorted((row["status"], row["id"]) for row in rows)
+
+
+def test_task_projection_returns_only_requested_fields(client, auth, project_id):
+    _create_tasks(client, auth, project_id, 4)
+    response = client.get("/tasks/", params={
+        "project_id": project_id, "fields": "title,status", "limit": 2, "order": "board",
+    }, headers=auth)
+    assert response.status_code == 200
+    assert all(set(row) == {"id", "title", "status"} for row in response.json())
+    # Le curseur reste valable avec une projection qui n'inclut pas les colonnes de tri
+    nxt = client.get("/tasks/", params={
+        "project_id": project_id, "fields": "title", "limit": 2, "order": "board",
+        "cursor": response.headers["X-Next-Cursor"],
+    }, headers=auth)
+    assert {row["id"] for row in nxt.json()}.isdisjoint({row["id"] for row in response.json()})
+
+
+def test_invalid_fields_and_cursors_are_rejected(client, auth, project_id):
+    _create_tasks(client, auth, project_id, 3)
+    base = {"project_id": project_id}
+    assert client.get("/tasks/", params={**base, "fields": "title,secret"}, headers=auth).status_code == 400
+    assert client.get("/tasks/", params={**base, "cursor": "pas-un-curseur"}, headers=auth).status_code == 400
+
+    # Curseur d'un autre ordre de tri
+    board_cursor = client.get("/tasks/", params={**base, "limit": 1, "order": "board"}, headers=auth).headers["X-Next-Cursor"]
+    response = client.get("/tasks/", params={**base, "cursor": board_cursor, "order": "updated"}, headers=auth)
+    assert response.status_code == 400
+
+
+def test_project_pages_and_projection(client, auth, team_id):
+    created = [
+        client.post("/projects/", json={"name": f"Projet {index}", "team_id": team_id}, headers=auth).json()
+        for index in range(5)
+    ]
+    pages = _all_pages(client, auth, "/projects/", {"team_id": team_id, "limit": 2, "fields": "name"})
+
+    rows = [row for page in pages for row in page]
+    assert sorted(row["id"] for row in rows) == sorted(project["id"] for project in created)
+    assert all(set(row) == {"id", "name"} for row in rows)
+    # Plus récemment modifiés d'abord
+    assert [row["id"] for row in rows] == [project["id"] for project in reversed(created)]
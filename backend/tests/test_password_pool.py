@@ -0,0 +1,67 @@
+# backend/tests/test_password_pool.py
+"""
+Pool bcrypt : file bornée (503 + Retry-After au-delà de
+PASSWORD_HASH_MAX_PENDING), compteur "pending", hash d'un autre coût
+réécrit au login
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from sqlmodel import Session
+
+from backend.app import password_pool
+from backend.app.config import settings
+from backend.app.database import engine
+from backend.app.models.user import User
+
+
+def test_saturated_pool_rejects_immediately(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 2)
+    release = threading.Event()
+    rejected = password_pool.stats()["rejected"]
+
+    async def scenario():
+        blocked = [asyncio.ensure_future(password_pool._run_in_pool(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert password_pool.stats()["pending"] == 2
+        try:
+            with pytest.raises(HTTPException) as error:
+                await password_pool.hash_password("password123")
+        finally:
+            release.set()
+            await asyncio.gather(*blocked)
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 503 and error.headers["Retry-After"] == "1"
+    stats = password_pool.stats()
+    assert stats["pending"] == 0 and stats["rejected"] == rejected + 1
+
+
+def test_login_returns_503_with_retry_after_when_saturated(client, make_user, monkeypatch):
+    username = client.get("/auth/me", headers=make_user()[1]).json()["username"]
+    monkeypatch.setattr(password_pool, "_pending", settings.PASSWORD_HASH_MAX_PENDING)
+    response = client.post("/auth/login", data={"username": username, "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_hash_at_another_cost_is_rewritten_on_login(client, make_user):
+    user_id, _ = make_user()
+    with Session(engine) as session:
+        user = session.get(User, user_id)
+        user.hashed_password = bcrypt.using(rounds=settings.BCRYPT_ROUNDS + 1).hash("password123")
+        session.add(user)
+        session.commit()
+        username = user.username
+
+    response = client.post("/auth/login", data={"username": username, "password": "password123"})
+    assert response.status_code == 200
+    with Session(engine) as session:
+        rehashed = session.get(User, user_id).hashed_password
+    assert bcrypt.from_string(rehashed).rounds == settings.BCRYPT_ROUNDS
+    assert bcrypt.verify("password123", rehashed)
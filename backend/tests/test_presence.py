@@ -0,0 +1,104 @@
+# backend/tests/test_presence.py
+"""
+Présence entre workers (deux trackers sur un même LocalEventBus) : deltas
+agrégés et throttlés, heartbeat, expiration de l'instantané d'un worker muet
+"""
+
+import asyncio
+
+from backend.app.event_bus import LocalEventBus
+from backend.websocket import presence as presence_module
+from backend.websocket.presence import PresenceTracker
+
+THROTTLE = 0.05
+HEARTBEAT = 0.05
+TTL = 0.15
+
+
+def _workers(monkeypatch, names):
+    """Trackers reliés par un bus local neuf → {nom: (tracker, deltas reçus)}"""
+    bus = LocalEventBus()
+    monkeypatch.setattr(presence_module, "event_bus", bus)
+    loop = asyncio.get_running_loop()
+    workers = {}
+    for name in names:
+        deltas = []
+        tracker = PresenceTracker(
+            lambda project_id, event, deltas=deltas: deltas.append(event),
+            throttle_seconds=THROTTLE, heartbeat_seconds=HEARTBEAT, ttl_seconds=TTL,
+        )
+        tracker.start(loop)
+        tracker.worker_id = name
+        bus.subscribe("presence", tracker.on_bus_message)
+        workers[name] = (tracker, deltas)
+    return workers
+
+
+def test_viewers_are_shared_and_deltas_throttled(monkeypatch):
+    async def scenario():
+        workers = _workers(monkeypatch, ["a", "b"])
+        a, a_deltas = workers["a"]
+        b, b_deltas = workers["b"]
+
+        a.join(1, 10)
+        b.join(1, 20)
+        await asyncio.sleep(THROTTLE * 3)
+        assert a.viewers(1) == b.viewers(1) == {10, 20}
+
+        # Relève : 20 arrivées / départs dans la même fenêtre → un seul delta
+        before = len(a_deltas)
+        for user_id in range(100, 120):
+            a.join(1, user_id)
+        for user_id in range(100, 110):
+            a.leave(1, user_id)
+        await asyncio.sleep(THROTTLE * 3)
+        new = a_deltas[before:]
+        assert len(new) == 1
+        assert new[0]["joined"] == list(range(110, 120)) and new[0]["left"] == []
+        assert new[0]["viewers"] == 12
+        assert b.viewers(1) == {10, 20, *range(110, 120)}
+
+        a.stop()
+        b.stop()
+
+    asyncio.run(scenario())
+
+
+def test_heartbeat_keeps_snapshot_alive_and_silent_worker_expires(monkeypatch):
+    async def scenario():
+        workers = _workers(monkeypatch, ["a", "b"])
+        a, _ = workers["a"]
+        b, b_deltas = workers["b"]
+        a.join(1, 10)
+        b.join(1, 20)
+
+        # Plusieurs TTL écoulés : les heartbeats de "a" le maintiennent
+        await asyncio.sleep(TTL * 3)
+        assert a.snapshots_published >= 3
+        assert b.viewers(1) == {10, 20}
+
+        # "a" plante : plus de heartbeat, pas d'annonce de départ
+        a._heartbeat_handle.cancel()
+        await asyncio.sleep(TTL + HEARTBEAT * 3)
+        assert b.viewers(1) == {20}
+        assert b_deltas[-1]["left"] == [10] and b_deltas[-1]["viewers"] == 1
+
+        b.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_announces_departure_immediately(monkeypatch):
+    async def scenario():
+        workers = _workers(monkeypatch, ["a", "b"])
+        a, _ = workers["a"]
+        b, _ = workers["b"]
+        a.join(1, 10)
+        b.join(1, 20)
+        await asyncio.sleep(THROTTLE * 3)
+
+        a.stop()
+        assert b.viewers(1) == {20}  # Sans attendre le TTL
+        b.stop()
+
+    asyncio.run(scenario())
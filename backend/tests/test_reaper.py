@@ -0,0 +1,60 @@
+# backend/tests/test_reaper.py
+"""
+Nettoyeur des WebSockets : zombies retirés, connexions muettes fermées
+seulement si le ping serveur est actif
+"""
+
+import time
+
+from backend.app.config import settings
+from backend.websocket import kanban_ws
+
+
+class _FakeStream:
+    def __init__(self, closing: bool = False):
+        self.closing = closing
+
+    def is_closing(self) -> bool:
+        return self.closing
+
+
+class _FakeConnection:
+    def __init__(self, project_id: int, silent_for: float, closing: bool = False):
+        self.project_id = project_id
+        self.ws_connection = _FakeStream(closing)
+        self.last_seen = time.monotonic() - silent_for
+        self.closed_with = None
+
+    def unregister(self):
+        kanban_ws.active_connections.get(self.project_id, set()).discard(self)
+
+    def close(self, code=None, reason=None):
+        self.closed_with = code
+
+
+def _sweep(monkeypatch, ping_interval: float):
+    monkeypatch.setattr(settings, "WS_PING_INTERVAL_SECONDS", ping_interval)
+    monkeypatch.setattr(settings, "WS_IDLE_TIMEOUT_SECONDS", 60.0)
+    project_id = 990_101
+    silent = _FakeConnection(project_id, silent_for=600)
+    zombie = _FakeConnection(project_id, silent_for=0, closing=True)
+    recent = _FakeConnection(project_id, silent_for=1)
+    kanban_ws.active_connections[project_id] = {silent, zombie, recent}
+    try:
+        kanban_ws.reap_connections()
+        return silent, kanban_ws.active_connections.get(project_id, set()).copy(), (zombie, recent)
+    finally:
+        kanban_ws.active_connections.pop(project_id, None)
+
+
+def test_idle_connections_closed_when_ping_enabled(monkeypatch):
+    silent, remaining, (zombie, recent) = _sweep(monkeypatch, ping_interval=20.0)
+    assert silent.closed_with == 4002
+    assert remaining == {recent}
+
+
+def test_idle_reap_skipped_when_ping_disabled(monkeypatch):
+    silent, remaining, (zombie, recent) = _sweep(monkeypatch, ping_interval=0)
+    assert silent.closed_with is None
+    # Les zombies sont toujours retirés
+    assert remaining == {silent, recent}
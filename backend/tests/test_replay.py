@@ -0,0 +1,89 @@
+# backend/tests/test_replay.py
+"""
+Reprise après reconnexion (?since=<seq>) : tampon mémoire, rejeu depuis
+l'outbox, "resync_required" quand le trou ne peut pas être comblé
+"""
+
+import asyncio
+
+from sqlmodel import Session
+
+from backend.app.database import engine
+from backend.app.models.project import Project
+from backend.app.outbox import events_since
+from backend.websocket import kanban_ws
+from backend.websocket.replay import ReplayBuffer
+
+
+def _event(seq: int) -> dict:
+    return {"event_type": "task_updated", "task_id": seq, "seq": seq}
+
+
+def test_buffer_replays_missed_events_in_seq_order():
+    buffer = ReplayBuffer(max_events_per_project=10, max_projects=5)
+    for seq in (1, 2, 4, 3, 3):  # hors ordre + rediffusion
+        buffer.record(1, _event(seq))
+    assert [event["seq"] for event in buffer.since(1, 1)] == [2, 3, 4]
+    assert buffer.since(1, 4) == []
+
+
+def test_buffer_reports_gaps_and_forgets_idle_projects():
+    buffer = ReplayBuffer(max_events_per_project=3, max_projects=2)
+    for seq in range(1, 6):
+        buffer.record(1, _event(seq))
+    # 1 et 2 sont sortis du tampon
+    assert buffer.covers(1, 2) and not buffer.covers(1, 1)
+    assert buffer.since(1, 1) is None
+
+    buffer.record(2, _event(1))
+    buffer.record(3, _event(1))
+    assert not buffer.knows(1) and buffer.knows(2) and buffer.knows(3)
+
+
+class _FakeHandler:
+    def __init__(self, project_id: int):
+        self.project_id = project_id
+        self.last_seq = 0
+        self.sent = []
+
+    def send_event(self, event: dict):
+        self.sent.append(event)
+
+
+def _replay(project_id: int, since: int, stored=None) -> _FakeHandler:
+    handler = _FakeHandler(project_id)
+    kanban_ws.KanbanWebSocketHandler.replay(handler, since, stored)
+    return handler
+
+
+def test_handler_replay_from_buffer_outbox_or_resync(monkeypatch):
+    buffer = ReplayBuffer(max_events_per_project=3, max_projects=10)
+    monkeypatch.setattr(kanban_ws, "replay_buffer", buffer)
+    for seq in range(4, 8):
+        buffer.record(990_201, _event(seq))  # tampon : 5, 6, 7
+
+    handler = _replay(990_201, 5)
+    assert [event["seq"] for event in handler.sent[0]["events"]] == [6, 7]
+    assert handler.last_seq == 7
+
+    # Trou plus ancien que le tampon, complété par l'outbox
+    handler = _replay(990_201, 2, stored=[_event(3), _event(4), _event(5)])
+    assert [event["seq"] for event in handler.sent[0]["events"]] == [3, 4, 5, 6, 7]
+
+    # Ni tampon ni outbox
+    handler = _replay(990_201, 2)
+    assert handler.sent[0]["event_type"] == "resync_required"
+    assert handler.last_seq == 0
+
+
+def test_outbox_replay_from_database(client, auth, project_id):
+    for index in range(4):
+        client.post("/tasks/", json={"title": f"Tâche {index}", "project_id": project_id}, headers=auth)
+    with Session(engine) as session:
+        current = session.get(Project, project_id).revision
+
+    events = asyncio.run(events_since(project_id, current - 3, limit=100))
+    assert [event["seq"] for event in events] == [current - 2, current - 1, current]
+    assert asyncio.run(events_since(project_id, current, limit=100)) == []
+    # Retard supérieur à la limite → resynchronisation
+    assert asyncio.run(events_since(project_id, 0, limit=2)) is None
@@ -0,0 +1,133 @@
+# backend/tests/test_send_queue.py
+"""
+File d'envoi par connexion : politiques de débordement, fusion limitée aux
+mises à jour d'une même tâche, tailles en octets encodés, perte d'un
+événement numéroté signalée par "resync_required"
+"""
+
+import json
+
+from backend.websocket import kanban_ws
+from backend.websocket.encoding import FrameEncoder, frame_size
+from backend.websocket.send_queue import SendQueue
+
+
+def _event(seq: int, event_type: str, task_id: int) -> dict:
+    return {"event_type": event_type, "task_id": task_id, "seq": seq}
+
+
+def _push_all(queue: SendQueue, events):
+    encoder = FrameEncoder(events)
+    for frame, size, key in zip(encoder.frames("json"), encoder.sizes("json"), encoder.coalesce_keys):
+        assert queue.push(frame, key, size)
+
+
+def _drain(queue: SendQueue):
+    return [json.loads(queue.pop()[1]) for _ in range(len(queue))]
+
+
+def test_no_coalescing_below_capacity():
+    queue = SendQueue(max_messages=10, max_bytes=1 << 20, policy="coalesce")
+    _push_all(queue, [_event(1, "task_updated", 7), _event(2, "task_updated", 7), _event(3, "task_updated", 7)])
+    assert [event["seq"] for event in _drain(queue)] == [1, 2, 3]
+    assert queue.coalesced == 0
+
+
+def test_overflow_coalesces_update_over_update_keeping_seq_order():
+    queue = SendQueue(max_messages=4, max_bytes=1 << 20, policy="coalesce")
+    _push_all(queue, [
+        _event(6, "task_created", 1),
+        _event(7, "task_updated", 1),
+        _event(8, "task_updated", 2),
+        _event(9, "task_deleted", 3),
+        # File pleine : remplace la mise à jour 7 (pas la création 6)
+        _event(10, "task_updated", 1),
+    ])
+    events = _drain(queue)
+    assert [event["seq"] for event in events] == [6, 8, 9, 10]
+    assert events[0]["event_type"] == "task_created"
+    assert queue.coalesced == 1 and queue.dropped == 0
+
+
+def test_overflow_without_pending_update_drops_oldest():
+    queue = SendQueue(max_messages=2, max_bytes=1 << 20, policy="coalesce")
+    _push_all(queue, [_event(1, "task_created", 1), _event(2, "task_created", 2), _event(3, "task_updated", 1)])
+    assert [event["seq"] for event in _drain(queue)] == [2, 3]
+    assert queue.dropped == 1 and queue.coalesced == 0
+
+
+def test_byte_limit_uses_encoded_size():
+    frame = json.dumps({"title": "é" * 10}, ensure_ascii=False)
+    assert frame_size(frame) == len(frame.encode("utf-8")) > len(frame)
+
+    queue = SendQueue(max_messages=10, max_bytes=frame_size(frame) * 2 - 1, policy="drop_oldest")
+    queue.push(frame)
+    queue.push(frame)
+    assert len(queue) == 1 and queue.dropped == 1
+    assert queue.buffered_bytes == frame_size(frame)
+    queue.pop()
+    assert queue.buffered_bytes == 0
+
+
+def test_disconnect_policy_refuses_on_overflow():
+    queue = SendQueue(max_messages=1, max_bytes=1 << 20, policy="disconnect")
+    assert queue.push("a")
+    assert not queue.push("b")
+    assert len(queue) == 1
+
+
+def test_only_updates_get_a_coalesce_key():
+    encoder = FrameEncoder([
+        _event(1, "task_created", 1),
+        _event(2, "task_updated", 1),
+        {"event_type": "presence", "viewers": 2},
+    ])
+    assert encoder.coalesce_keys == [None, ("task", 1), None]
+
+
+def test_dropping_a_critical_frame_flags_lost_events():
+    queue = SendQueue(max_messages=1, max_bytes=1 << 20, policy="drop_oldest")
+    queue.push("presence")
+    queue.push("presence")
+    assert queue.dropped == 1 and not queue.lost_events
+
+    queue.push("seq 1", critical=True)
+    assert not queue.lost_events  # "presence" jeté, pas l'événement
+    queue.push("seq 2", critical=True)
+    assert queue.lost_events
+    queue.clear()
+    assert not queue.lost_events
+
+
+class _SlowHandler:
+    """Connexion dont la pompe est bloquée : tout reste en file"""
+
+    send = kanban_ws.KanbanWebSocketHandler.send
+    request_resync = kanban_ws.KanbanWebSocketHandler.request_resync
+
+    def __init__(self, max_messages: int):
+        self.ws_connection = object()
+        self.format = "json"
+        self.outbox = SendQueue(max_messages=max_messages, max_bytes=1 << 20, policy="drop_oldest")
+        self._pumping = True
+
+
+def test_handler_replaces_queue_with_resync_after_losing_an_event():
+    handler = _SlowHandler(max_messages=2)
+    encoder = FrameEncoder([_event(seq, "task_created", seq) for seq in (1, 2, 3, 4)])
+    for frame, size, seq in zip(encoder.frames("json"), encoder.sizes("json"), encoder.seqs):
+        handler.send(frame, None, size, critical=seq is not None)
+
+    events = _drain(handler.outbox)
+    # 1 jeté à l'arrivée de 3 → file remplacée par resync_required, puis 4
+    assert events[0]["event_type"] == "resync_required" and events[0]["reason"] == "overflow"
+    assert [event.get("seq") for event in events[1:]] == [4]
+
+
+def test_resync_frame_survives_further_overflow():
+    handler = _SlowHandler(max_messages=1)
+    for seq in (1, 2, 3):
+        handler.send(json.dumps(_event(seq, "task_created", seq)), critical=True)
+    # Le resync jeté à son tour est remis en file
+    [event] = _drain(handler.outbox)
+    assert event["event_type"] == "resync_required"
@@ -0,0 +1,90 @@
+# backend/tests/test_shutdown.py
+"""
+Arrêt coordonné d'un worker : annonce "reconnect_later" avec délai aléatoire,
+vidage des files d'envoi puis fermeture 1012, attente des requêtes HTTP en cours
+"""
+
+import asyncio
+
+from backend.app.config import settings
+from backend.asgi_bridge import ASGIHandler
+from backend.websocket import kanban_ws
+from backend.websocket.send_queue import SendQueue
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.outbox = SendQueue(max_messages=10, max_bytes=1 << 20, policy="drop_oldest")
+        self._pumping = False
+        self.events = []
+        self.closed_with = None
+
+    def send_event(self, event: dict):
+        self.events.append(event)
+
+    def close(self, code=None, reason=None):
+        self.closed_with = (code, reason)
+
+
+def _connections(monkeypatch, count: int):
+    conns = [_FakeConnection() for _ in range(count)]
+    monkeypatch.setattr(kanban_ws, "accepting_connections", True)
+    monkeypatch.setattr(kanban_ws, "active_connections", {990_301: set(conns)})
+    return conns
+
+
+def test_announce_restart_refuses_new_handshakes_and_spreads_reconnects(monkeypatch):
+    conns = _connections(monkeypatch, 3)
+
+    assert kanban_ws.announce_restart() == 3
+    assert not kanban_ws.accepting_connections
+    for conn in conns:
+        [event] = conn.events
+        assert event["event_type"] == "reconnect_later"
+        assert settings.WS_RECONNECT_JITTER_MIN_MS <= event["retry_after_ms"] <= settings.WS_RECONNECT_JITTER_MAX_MS
+
+
+def test_drain_waits_for_send_queues_then_closes_with_1012(monkeypatch):
+    [conn] = _connections(monkeypatch, 1)
+    conn.outbox.push("dernier événement")
+
+    async def scenario():
+        async def pump_later():
+            await asyncio.sleep(0.1)
+            conn.outbox.pop()
+
+        pump = asyncio.ensure_future(pump_later())
+        drained = await kanban_ws.drain_connections(timeout=5)
+        await pump
+        return drained
+
+    assert asyncio.run(scenario())
+    assert not len(conn.outbox)
+    assert conn.closed_with == (1012, "server restart")
+
+
+def test_drain_timeout_still_closes(monkeypatch):
+    [conn] = _connections(monkeypatch, 1)
+    conn._pumping = True  # Client bloqué : l'envoi en cours ne se termine jamais
+
+    assert not asyncio.run(kanban_ws.drain_connections(timeout=0.1))
+    assert conn.closed_with[0] == 1012
+
+
+def test_wait_idle_for_in_flight_requests(monkeypatch):
+    monkeypatch.setattr(ASGIHandler, "in_flight", 1)
+
+    async def scenario():
+        async def finish_later():
+            await asyncio.sleep(0.1)
+            ASGIHandler.in_flight -= 1
+
+        finishing = asyncio.ensure_future(finish_later())
+        idle = await ASGIHandler.wait_idle(timeout=5)
+        await finishing
+        return idle
+
+    assert asyncio.run(scenario())
+
+    monkeypatch.setattr(ASGIHandler, "in_flight", 1)
+    assert not asyncio.run(ASGIHandler.wait_idle(timeout=0.1))
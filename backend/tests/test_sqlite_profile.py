@@ -0,0 +1,34 @@
+# backend/tests/test_sqlite_profile.py
+"""
+Profil SQLite : PRAGMA appliqués sur les connexions des deux engines
+(synchrone et aiosqlite), démarrage silencieux quand tout est en place
+"""
+
+import asyncio
+
+from backend.app import database
+from backend.app.config import settings
+from backend.app.database import async_sqlite_pragma_report, sqlite_pragma_mismatches, sqlite_pragma_report
+
+
+def test_profile_is_applied_on_sync_and_async_connections(client):
+    sync_report = sqlite_pragma_report()
+    async_report = asyncio.run(async_sqlite_pragma_report())
+
+    for report in (sync_report, async_report):
+        assert report["journal_mode"] == "wal"
+        assert report["synchronous"] == 1  # NORMAL
+        assert report["busy_timeout"] == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert report["cache_size"] == -settings.SQLITE_CACHE_SIZE_KB
+        assert report["temp_store"] == 2  # MEMORY
+        assert sqlite_pragma_mismatches(report) == {}
+
+
+def test_startup_log_only_reports_mismatches(client, capsys, monkeypatch):
+    database.log_sqlite_profile()
+    assert capsys.readouterr().out == ""
+
+    applied = settings.SQLITE_BUSY_TIMEOUT_MS
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 1234)
+    database.log_sqlite_profile()  # Pool déjà ouvert : l'ancienne valeur reste en vigueur
+    assert capsys.readouterr().out.strip() == f"Attention : PRAGMA busy_timeout = {applied} (demandé : 1234)"
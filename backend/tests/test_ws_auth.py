@@ -0,0 +1,90 @@
+# backend/tests/test_ws_auth.py
+"""
+Handshake WebSocket authentifié : token en paramètre ou en sous-protocole
+bearer.<jwt>, refus HTTP avant l'upgrade (401 / 403 / 503), fermeture des
+sockets d'un utilisateur désactivé
+"""
+
+import asyncio
+
+import pytest
+from tornado.httpclient import HTTPClientError, HTTPRequest
+from tornado.httpserver import HTTPServer
+from tornado.testing import bind_unused_port
+from tornado.web import Application
+from tornado.websocket import websocket_connect
+
+from backend.websocket import kanban_ws
+
+
+def _token(headers: dict) -> str:
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+async def _connect(project_id: int, query: str = "", subprotocols=None):
+    """Ouvre un serveur Tornado sur un port libre puis s'y connecte → (serveur, connexion)"""
+    sock, port = bind_unused_port()
+    server = HTTPServer(Application([(r"/ws/kanban/(?P<project_id>\d+)", kanban_ws.KanbanWebSocketHandler)]))
+    server.add_sockets([sock])
+    request = HTTPRequest(f"ws://127.0.0.1:{port}/ws/kanban/{project_id}{query}")
+    try:
+        return server, await websocket_connect(request, subprotocols=subprotocols)
+    except BaseException:
+        server.stop()
+        raise
+
+
+def _handshake_status(project_id: int, query: str = "", subprotocols=None) -> int:
+    async def scenario():
+        with pytest.raises(HTTPClientError) as error:
+            await _connect(project_id, query, subprotocols)
+        return error.value.code
+
+    return asyncio.run(scenario())
+
+
+def test_refused_before_upgrade(client, make_user, auth, project_id, monkeypatch):
+    _, stranger = make_user()
+    assert _handshake_status(project_id) == 401
+    assert _handshake_status(project_id, "?token=pas-un-jwt") == 401
+    assert _handshake_status(project_id, f"?token={_token(stranger)}") == 403
+
+    monkeypatch.setattr(kanban_ws, "accepting_connections", False)
+    assert _handshake_status(project_id, f"?token={_token(auth)}") == 503
+
+
+def test_bearer_subprotocol_is_accepted_without_echoing_the_token(client, auth, project_id):
+    async def scenario():
+        server, conn = await _connect(project_id, subprotocols=["kanban", f"bearer.{_token(auth)}"])
+        try:
+            welcome = await conn.read_message()
+            return conn.selected_subprotocol, welcome
+        finally:
+            conn.close()
+            server.stop()
+
+    selected, welcome = asyncio.run(scenario())
+    assert selected == "kanban"
+    assert '"connected"' in welcome
+
+
+def test_deactivated_user_socket_is_closed(client, make_user):
+    _, headers = make_user()
+    own_team = client.post("/teams/", json={"name": "Équipe révoquée"}, headers=headers).json()["id"]
+    own_project = client.post("/projects/", json={"name": "Projet révoqué", "team_id": own_team},
+                              headers=headers).json()["id"]
+
+    async def scenario():
+        server, conn = await _connect(own_project, f"?token={_token(headers)}")
+        try:
+            await conn.read_message()  # Bienvenue
+            # Requête HTTP hors de la boucle Tornado (invalidation "acl" publiée par l'API)
+            response = await asyncio.to_thread(client.delete, "/auth/me", headers=headers)
+            assert response.status_code == 204
+            while await asyncio.wait_for(conn.read_message(), timeout=5) is not None:
+                pass  # Trames éventuelles (présence) avant la fermeture
+            return conn.close_code
+        finally:
+            server.stop()
+
+    assert asyncio.run(scenario()) == 4001
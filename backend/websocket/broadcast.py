@@ -0,0 +1,250 @@
+# backend/websocket/broadcast.py
+"""
+File d'envoi des événements WebSocket, découplée des requêtes HTTP
+- publish() est appelable depuis n'importe quel thread (route async, threadpool,
+  pool bcrypt...) et ne bloque jamais : il se contente d'empiler l'événement
+- Les événements sont vidés sur la boucle d'événements Tornado, seul thread
+  autorisé à toucher aux connexions (write_message, active_connections)
+- Une file FIFO par projet : l'ordre des événements d'un projet est garanti
+- Vidage par lots (budget par tour de boucle) pour ne pas affamer les autres
+  callbacks quand un board a beaucoup de spectateurs
+- Fenêtre de fusion optionnelle (WS_COALESCE_WINDOW_MS) : les événements
+  d'un projet sont retenus quelques ms, les mises à jour successives d'une
+  même tâche fusionnées, puis envoyés en une seule trame "batch" ; le coût du
+  fan-out suit le nombre de tâches distinctes modifiées, pas le nombre d'écritures ;
+  une fenêtre pleine est envoyée sans attendre (aucun événement perdu)
+- Compteurs exposés sur /metrics (profondeur de file, publiés, livrés, perdus)
+"""
+
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Hashable, List, Optional
+
+
+def merge_events(previous: dict, event: dict) -> dict:
+    """Deux événements pour la même tâche → un seul (dernier état gagnant)"""
+    if previous.get("event_type") == "task_created":
+        # Créée puis modifiée dans la fenêtre : le client ne l'a jamais vue
+        return {**event, "event_type": "task_created"}
+    return event
+
+
+class BroadcastDispatcher:
+    def __init__(
+        self,
+        deliver: Callable[[int, List[dict]], None],
+        max_pending_per_project: int,
+        batch_size: int,
+        coalesce_window_ms: int = 0,
+    ):
+        # deliver(project_id, events) : appelé sur la boucle uniquement
+        self._deliver = deliver
+        self.max_pending_per_project = max_pending_per_project
+        self.batch_size = batch_size
+        self.coalesce_window = coalesce_window_ms / 1000
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[int, Deque[dict]] = {}
+        # Mode fenêtre : clé de fusion → événement, par projet
+        self._windows: Dict[int, "OrderedDict[Hashable, dict]"] = {}
+        self._window_seq = 0
+        self._window_timers: Dict[int, asyncio.TimerHandle] = {}
+        self._scheduled: set = set()
+
+        # Compteurs (modifiés depuis plusieurs threads → verrou)
+        self._lock = threading.Lock()
+        self._in_flight = 0  # publiés depuis un autre thread, pas encore empilés
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.merged = 0
+        self.early_flushes = 0
+        self.errors = 0
+
+    # ─── Boucle d'événements ────────────────────────────────────────────────
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Associe la boucle qui sert les WebSockets (au démarrage ou à la 1re connexion)"""
+        self._loop = loop
+
+    @property
+    def bound(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    def call_soon(self, callback: Callable, *args):
+        """Exécute callback sur la boucle liée, depuis n'importe quel thread"""
+        if self._on_loop_thread():
+            self._loop.call_soon(callback, *args)
+            return
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            pass  # Boucle fermée entre-temps (arrêt du serveur)
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    # ─── Publication (tout thread) ──────────────────────────────────────────
+
+    def publish(self, project_id: int, event: dict):
+        """Empile un événement pour le projet ; retourne immédiatement"""
+        with self._lock:
+            self.published += 1
+        if not self.bound:
+            # Aucun serveur WebSocket dans ce process → aucun abonné possible
+            with self._lock:
+                self.dropped += 1
+            return
+
+        if self._on_loop_thread():
+            self._enqueue(project_id, event)
+            return
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._loop.call_soon_threadsafe(self._enqueue_from_thread, project_id, event)
+        except RuntimeError:
+            # Boucle fermée entre-temps (arrêt du serveur)
+            with self._lock:
+                self._in_flight -= 1
+                self.dropped += 1
+
+    def _enqueue_from_thread(self, project_id: int, event: dict):
+        with self._lock:
+            self._in_flight -= 1
+        self._enqueue(project_id, event)
+
+    # ─── Vidage (boucle uniquement) ─────────────────────────────────────────
+
+    def _enqueue(self, project_id: int, event: dict):
+        if self.coalesce_window > 0:
+            return self._enqueue_window(project_id, event)
+
+        queue = self._queues.setdefault(project_id, deque())
+        if len(queue) >= self.max_pending_per_project:
+            # File saturée : on sacrifie le plus ancien (le client le rattrapera
+            # via /tasks/changes) plutôt que de grossir sans limite
+            queue.popleft()
+            with self._lock:
+                self.dropped += 1
+        queue.append(event)
+
+        if project_id not in self._scheduled:
+            self._scheduled.add(project_id)
+            self._loop.call_soon(self._drain, project_id)
+
+    def _drain(self, project_id: int):
+        queue = self._queues.get(project_id)
+        if not queue:
+            self._scheduled.discard(project_id)
+            self._queues.pop(project_id, None)
+            return
+
+        batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+        try:
+            self._deliver(project_id, batch)
+            with self._lock:
+                self.delivered += len(batch)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Erreur broadcast projet {project_id} : {e}")
+
+        if queue:
+            # Reste du travail au prochain tour de boucle (même ordre FIFO)
+            self._loop.call_soon(self._drain, project_id)
+        else:
+            self._scheduled.discard(project_id)
+            self._queues.pop(project_id, None)
+
+    # ─── Fenêtre de fusion (boucle uniquement) ──────────────────────────────
+
+    def _enqueue_window(self, project_id: int, event: dict):
+        if event.get("event_type") == "batch":
+            # Lot déjà groupé (POST /tasks/batch) : ses événements rejoignent
+            # la fenêtre un par un (pas de trame "batch" imbriquée)
+            for item in event["events"]:
+                self._enqueue_window(project_id, item)
+            return
+
+        window = self._windows.setdefault(project_id, OrderedDict())
+        task_id = event.get("task_id")
+        if task_id is not None and ("task", task_id) in window:
+            key = ("task", task_id)
+            window[key] = merge_events(window[key], event)
+            # Position du dernier événement fusionné : seq croissants dans la trame
+            window.move_to_end(key)
+            with self._lock:
+                self.merged += 1
+        else:
+            if len(window) >= self.max_pending_per_project:
+                # Fenêtre pleine : envoyée tout de suite, l'événement ouvre la suivante
+                self._flush_window(project_id)
+                with self._lock:
+                    self.early_flushes += 1
+                window = self._windows.setdefault(project_id, OrderedDict())
+            if task_id is not None:
+                key = ("task", task_id)
+            else:
+                self._window_seq += 1
+                key = ("seq", self._window_seq)
+            window[key] = event
+
+        if project_id not in self._scheduled:
+            # La fenêtre s'ouvre au premier événement et ne glisse pas :
+            # latence ajoutée bornée à coalesce_window
+            self._scheduled.add(project_id)
+            self._window_timers[project_id] = self._loop.call_later(
+                self.coalesce_window, self._flush_window, project_id
+            )
+
+    def _flush_window(self, project_id: int):
+        self._scheduled.discard(project_id)
+        timer = self._window_timers.pop(project_id, None)
+        if timer is not None:
+            timer.cancel()  # Sans effet si c'est lui qui nous appelle
+        window = self._windows.pop(project_id, None)
+        if not window:
+            return
+
+        events = list(window.values())
+        try:
+            # Une seule trame par connexion pour toute la fenêtre
+            self._deliver(project_id, [{"event_type": "batch", "project_id": project_id, "events": events}])
+            with self._lock:
+                self.delivered += len(events)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"Erreur broadcast projet {project_id} : {e}")
+
+    def pending(self) -> int:
+        """Événements pas encore livrés (files, fenêtres, en transit) : 0 = vidé"""
+        with self._lock:
+            in_flight = self._in_flight
+        return in_flight + sum(len(queue) for queue in list(self._queues.values()) + list(self._windows.values()))
+
+    # ─── Monitoring ─────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        # Lecture sans verrou des files : valeurs indicatives pour /metrics
+        depths = [len(queue) for queue in list(self._queues.values()) + list(self._windows.values())]
+        with self._lock:
+            return {
+                "bound": self.bound,
+                "coalesce_window_ms": int(self.coalesce_window * 1000),
+                "queue_depth": sum(depths) + self._in_flight,
+                "max_project_queue_depth": max(depths, default=0),
+                "projects_pending": len(depths),
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "merged": self.merged,
+                "early_flushes": self.early_flushes,
+                "errors": self.errors,
+            }
@@ -0,0 +1,129 @@
+# backend/websocket/encoding.py
+"""
+Encodage des trames WebSocket (négocié par connexion : ?format=...)
+- json    : JSON standard (défaut), via orjson si installé (voir serialization.py)
+- cjson   : JSON compact, noms de champs remplacés par des identifiants courts
+            (table envoyée au client dans le message "connected")
+- msgpack : MessagePack binaire avec les mêmes identifiants courts
+            (si la bibliothèque msgpack est installée)
+- FrameEncoder : chaque événement n'est sérialisé qu'une fois par format,
+  quel que soit le nombre de connexions qui le reçoivent
+"""
+
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+from ..app import serialization
+
+try:
+    import msgpack  # pip install msgpack (optionnel, format binaire compact)
+except ImportError:
+    msgpack = None
+
+Frame = Union[str, bytes]
+
+DEFAULT_FORMAT = "json"
+
+# Identifiants courts des champs (format cjson) ; les clés inconnues restent telles quelles
+FIELD_IDS: Dict[str, str] = {
+    "event_type": "e",
+    "events": "b",
+    "project_id": "p",
+    "task_id": "t",
+    "data": "d",
+    "updated_by": "u",
+    "seq": "s",
+    "id": "i",
+    "title": "ti",
+    "description": "de",
+    "status": "st",
+    "priority": "pr",
+    "due_date": "dd",
+    "assigned_to": "at",
+    "created_by": "cb",
+    "created_at": "ca",
+    "updated_at": "ua",
+    "revision": "r",
+}
+
+
+def available_formats() -> List[str]:
+    formats = ["json", "cjson"]
+    if msgpack is not None:
+        formats.append("msgpack")
+    return formats
+
+
+def negotiate(requested: str) -> str:
+    """Format demandé par le client s'il est disponible, sinon JSON"""
+    return requested if requested in available_formats() else DEFAULT_FORMAT
+
+
+# ───────────────────────────────────────────────
+# Encodeurs élémentaires
+# ───────────────────────────────────────────────
+def dumps_json(obj: Any) -> str:
+    return serialization.dumps(obj).decode()
+
+
+def _compact_keys(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {FIELD_IDS.get(key, key): _compact_keys(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_compact_keys(value) for value in obj]
+    return obj
+
+
+def encode(obj: Any, fmt: str = DEFAULT_FORMAT) -> Frame:
+    """Sérialise un message dans le format de la connexion (bytes pour msgpack)"""
+    if fmt == "cjson":
+        return dumps_json(_compact_keys(obj))
+    if fmt == "msgpack":
+        return msgpack.packb(_compact_keys(obj), default=serialization.json_default, use_bin_type=True)
+    return dumps_json(obj)
+
+
+def _frame_seq(event: dict) -> Optional[int]:
+    if event.get("event_type") == "batch":
+        seqs = [item["seq"] for item in event.get("events", ()) if item.get("seq") is not None]
+        return max(seqs, default=event.get("seq"))
+    return event.get("seq")
+
+
+def frame_size(frame: Frame) -> int:
+    """Octets envoyés sur le réseau (UTF-8 pour une trame texte, hors en-tête WebSocket)"""
+    if isinstance(frame, bytes):
+        return len(frame)
+    return len(frame) if frame.isascii() else len(frame.encode("utf-8"))
+
+
+# ───────────────────────────────────────────────
+# Encodage partagé d'un lot d'événements entre toutes les connexions
+# ───────────────────────────────────────────────
+class FrameEncoder:
+    def __init__(self, events: List[dict]):
+        self.events = events
+        self._frames: Dict[str, List[Frame]] = {}
+        self._sizes: Dict[str, List[int]] = {}
+        # Clé de fusion côté file d'envoi : seules les mises à jour d'une même
+        # tâche se remplacent (une création ou une suppression doit arriver)
+        self.coalesce_keys: List[Hashable] = [
+            ("task", event["task_id"])
+            if event.get("event_type") == "task_updated" and event.get("task_id") is not None else None
+            for event in events
+        ]
+        # Seq de chaque trame ; trame "batch" : le plus grand de ses événements
+        self.seqs: List[Optional[int]] = [_frame_seq(event) for event in events]
+
+    def frames(self, fmt: str) -> List[Frame]:
+        """Trames des événements dans ce format (encodées au premier appel seulement)"""
+        frames = self._frames.get(fmt)
+        if frames is None:
+            frames = self._frames[fmt] = [encode(event, fmt) for event in self.events]
+        return frames
+
+    def sizes(self, fmt: str) -> List[int]:
+        """Taille en octets de chaque trame (mesurée une fois pour toutes les connexions)"""
+        sizes = self._sizes.get(fmt)
+        if sizes is None:
+            sizes = self._sizes[fmt] = [frame_size(frame) for frame in self.frames(fmt)]
+        return sizes
@@ -4,46 +4,343 @@ Handler WebSocket Tornado pour les mises à jour en temps réel du Kanban
 - Connexion par projet : ws://.../ws/kanban/{project_id}
 - Gestion de connexions multiples par projet
 - Broadcast d'événements (task_created, task_updated, task_moved, etc.)
-- Pour MVP : pas d'authentification WS stricte (on peut ajouter plus tard via token dans query)
+  via une file thread-safe vidée sur la boucle Tornado (voir broadcast.py)
+- Chaque connexion a sa propre file d'envoi bornée (voir send_queue.py) :
+  un client lent ne fait plus grossir la mémoire du serveur
+- Format négocié à la connexion : ?format=json (défaut) | cjson | msgpack,
+  chaque événement étant encodé une seule fois par format (voir encoding.py)
+- Compression permessage-deflate si le client la propose
+- Multi-workers : broadcast_to_project passe par le bus d'événements (canal
+  "kanban"), chaque worker livre l'événement à ses propres connexions
+- Reprise après reconnexion : ?since=<seq> rejoue les événements manqués
+  (tampon circulaire par projet, voir replay.py, puis table outbox au-delà)
+  ou envoie "resync_required"
+- Authentification avant l'upgrade (prepare) : token JWT en paramètre
+  ?token=... ou en sous-protocole ("kanban", "bearer.<jwt>") ; vérification
+  et droits sur le projet via les caches partagés avec l'API HTTP (aucune
+  requête SQL lors d'une reconnexion en masse)
+- Révocation : une invalidation "acl" (utilisateur désactivé, projet ou
+  équipe modifiés) fait revérifier token et droits des sockets concernées,
+  fermées en 4001 / 4003 si elles ne passent plus
+- Origines : même hôte que le serveur ou WS_ALLOWED_ORIGINS
+- Vivacité : ping/pong Tornado (websocket_ping_interval) ; un nettoyeur
+  périodique retire en bloc les connexions mortes et ferme celles restées
+  muettes plus de WS_IDLE_TIMEOUT_SECONDS (jauges live / idle / reaped)
+- Arrêt coordonné : nouveaux handshakes refusés (503), trame
+  "reconnect_later" avec un délai aléatoire par client, vidage des files
+  puis fermeture 1012 (voir run.py)
+- Présence : spectateurs distincts par board (tous workers), annoncés par
+  deltas "presence" agrégés et throttlés (voir presence.py)
 """
 
+import asyncio
 import json
-from typing import Dict, Set
-from tornado.websocket import WebSocketHandler
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, Hashable, List, Optional, Set
+from fastapi import HTTPException
+from tornado.ioloop import PeriodicCallback
+from tornado.web import HTTPError
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
+
+from ..app.config import settings
+from ..app.database import AsyncSessionLocal
+from ..app.dependencies import authenticate_token
+from ..app.event_bus import event_bus
+from ..app.outbox import events_since
+from ..app.cache import MISSING
+from ..app.permissions import AccessResolver, acl_cache
+from .broadcast import BroadcastDispatcher
+from . import encoding, send_queue
+from .encoding import FrameEncoder
+from .presence import PresenceTracker
+from .replay import ReplayBuffer
+from .send_queue import SendQueue
 
 # Stockage en mémoire des connexions actives par project_id (MVP : pas de Redis)
 # Format : {project_id: set(WebSocketHandler)}
 active_connections: Dict[int, Set[WebSocketHandler]] = {}
 
+# Faux pendant l'arrêt du worker : les handshakes sont refusés
+accepting_connections = True
+
+# Derniers événements numérotés de chaque projet (reprise via ?since=<seq>)
+replay_buffer = ReplayBuffer(
+    max_events_per_project=settings.WS_REPLAY_BUFFER_SIZE,
+    max_projects=settings.WS_REPLAY_MAX_PROJECTS,
+)
+
 
 class KanbanWebSocketHandler(WebSocketHandler):
     """
     WebSocket handler pour un projet Kanban spécifique
     """
 
-    def open(self, project_id: str):
+    def initialize(self):
+        self.outbox = SendQueue(
+            max_messages=settings.WS_OUTBOX_MAX_MESSAGES,
+            max_bytes=settings.WS_OUTBOX_MAX_BYTES,
+            policy=settings.WS_OUTBOX_OVERFLOW_POLICY,
+        )
+        self._pumping = False
+        self.format = encoding.DEFAULT_FORMAT
+        # Dernier seq envoyé (rejeu ou direct) : les doublons (rediffusion de
+        # l'outbox, direct déjà couvert par le rejeu) sont ignorés
+        self.last_seq = 0
+        self.user_id: Optional[int] = None
+        self.team_id: Optional[int] = None
+        self._access_token: Optional[str] = None
+        self._present = False
+        # Dernier trafic entrant (message, ping ou pong du client)
+        self.last_seen = time.monotonic()
+
+    # ─── Authentification (avant l'upgrade HTTP → WebSocket) ────────────────
+
+    def _token(self) -> Optional[str]:
+        """Token en paramètre de requête, sinon en sous-protocole bearer.<jwt>"""
+        token = self.get_argument("token", None)
+        if token:
+            return token
+        header = self.request.headers.get("Sec-WebSocket-Protocol", "")
+        for protocol in (value.strip() for value in header.split(",")):
+            if protocol.startswith("bearer."):
+                return protocol[len("bearer."):]
+        return None
+
+    async def prepare(self):
+        """
+        Refus en HTTP 401 / 403 / 404 avant toute allocation WebSocket.
+        Token et décision d'accès en cache : O(1) sans SQL ; la session n'ouvre
+        une connexion SQLite qu'en cas de cache manquant.
+        """
+        if not accepting_connections:
+            raise HTTPError(503, reason="Redémarrage du serveur")
+        token = self._token()
+        if not token:
+            raise HTTPError(401, reason="Token manquant")
+        try:
+            project_id = int(self.path_kwargs["project_id"])
+        except (KeyError, ValueError):
+            raise HTTPError(400, reason="project_id doit être un entier")
+
+        try:
+            async with AsyncSessionLocal() as session:
+                user = await authenticate_token(token, session)
+                await AccessResolver(session, user).ensure_project_access(project_id)
+        except HTTPException as e:
+            raise HTTPError(e.status_code, reason=str(e.detail))
+        self.user_id = user.id
+        self._access_token = token
+        # Équipe du projet (décision tout juste mise en cache) : cible des invalidations par équipe
+        decision = acl_cache.get(("project", user.id, project_id))
+        self.team_id = decision[0] if decision is not MISSING else None
+
+    async def revalidate(self):
+        """
+        Après une invalidation "acl" : mêmes vérifications qu'au handshake,
+        caches vidés donc relues en base ; fermeture si elles échouent
+        (un token expiré depuis la connexion échoue aussi)
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                try:
+                    user = await authenticate_token(self._access_token, session)
+                except HTTPException as e:
+                    self.close(code=4001, reason=str(e.detail))
+                    return
+                await AccessResolver(session, user).ensure_project_access(self.project_id)
+        except HTTPException as e:
+            self.close(code=4003, reason=str(e.detail))
+        except Exception as e:
+            print(f"Revérification des droits impossible (projet {self.project_id}) : {e}")
+
+    def select_subprotocol(self, subprotocols: List[str]) -> Optional[str]:
+        # Jamais le token en écho : le client doit proposer "kanban" avec "bearer.<jwt>"
+        return "kanban" if "kanban" in subprotocols else None
+
+    # ─── Vivacité ───────────────────────────────────────────────────────────
+
+    @property
+    def ping_interval(self) -> Optional[float]:
+        # Réglage de l'Application s'il existe, sinon la configuration
+        return self.settings.get("websocket_ping_interval", settings.WS_PING_INTERVAL_SECONDS)
+
+    @property
+    def ping_timeout(self) -> Optional[float]:
+        return self.settings.get("websocket_ping_timeout", settings.WS_PING_TIMEOUT_SECONDS)
+
+    def on_pong(self, data: bytes):
+        self.last_seen = time.monotonic()
+
+    def on_ping(self, data: bytes):
+        self.last_seen = time.monotonic()
+
+    def get_compression_options(self) -> Optional[Dict[str, Any]]:
+        """permessage-deflate (négocié avec le client ; None = désactivé)"""
+        if not settings.WS_COMPRESSION_ENABLED:
+            return None
+        return {
+            "compression_level": settings.WS_COMPRESSION_LEVEL,
+            "mem_level": settings.WS_COMPRESSION_MEM_LEVEL,
+        }
+
+    # ─── Envoi via la file bornée ───────────────────────────────────────────
+
+    def send_event(self, event: dict):
+        """Message propre à cette connexion (bienvenue, ack...), dans son format"""
+        self.send(encoding.encode(event, self.format))
+
+    def send(
+        self,
+        message: encoding.Frame,
+        coalesce_key: Optional[Hashable] = None,
+        size: Optional[int] = None,
+        critical: bool = False,
+    ):
+        """Met un message en file ; un seul envoi à la fois est confié à Tornado"""
+        if self.ws_connection is None:
+            return
+        if not self.outbox.push(message, coalesce_key, size, critical):
+            self.evict_slow_consumer()
+            return
+        if self.outbox.lost_events:
+            self.request_resync()
+        if not self._pumping:
+            self._pumping = True
+            asyncio.ensure_future(self._pump())
+
+    async def _pump(self):
+        try:
+            while len(self.outbox):
+                _, message = self.outbox.pop()
+                # Attendre le flush : le tampon Tornado ne contient jamais
+                # plus d'un message, le reste attend (borné) dans outbox
+                await self.write_message(message, binary=isinstance(message, bytes))
+        except WebSocketClosedError:
+            self.outbox.clear()
+        finally:
+            self._pumping = False
+
+    def request_resync(self):
+        """
+        Événement numéroté jeté par débordement : la suite en file ne vaut plus
+        rien pour ce client, remplacée par un "resync_required" (lui-même
+        critique : s'il est jeté à son tour, il est remis en tête)
+        """
+        self.outbox.clear()
+        self.outbox.push(encoding.encode({
+            "event_type": "resync_required",
+            "reason": "overflow",
+            "message": "Événements perdus (client trop lent) : rechargez le board via /tasks/changes",
+        }, self.format), critical=True)
+
+    def evict_slow_consumer(self):
+        """Politique "disconnect" : indice de resynchronisation puis fermeture"""
+        self.outbox.clear()
+        print(f"Client trop lent déconnecté du projet {getattr(self, 'project_id', '?')}")
+        try:
+            frame = encoding.encode({
+                "event_type": "resync_required",
+                "reason": "slow_consumer",
+                "message": "Trop de retard : rechargez le board via /tasks/changes puis reconnectez-vous",
+            }, self.format)
+            self.write_message(frame, binary=isinstance(frame, bytes))
+        except WebSocketClosedError:
+            pass
+        self.close(code=4008, reason="slow consumer")
+
+    # ─── Cycle de vie ───────────────────────────────────────────────────────
+
+    async def open(self, project_id: str):
         """
         Quand un client se connecte : ws://.../ws/kanban/123
         """
+        # Les broadcasts seront vidés sur la boucle qui sert cette connexion
+        if not dispatcher.bound:
+            dispatcher.bind(asyncio.get_running_loop())
+        presence.start(asyncio.get_running_loop())
+        start_reaper()
+
         try:
             self.project_id = int(project_id)
         except ValueError:
             self.close(code=1003, reason="project_id doit être un entier")
             return
 
+        # Format demandé non disponible (ex: msgpack absent) → JSON
+        self.format = encoding.negotiate(self.get_argument("format", encoding.DEFAULT_FORMAT))
+
+        since = self.get_argument("since", None)
+        since = int(since) if since is not None and since.isdigit() else None
+
+        # Retard plus ancien que le tampon mémoire : lecture de l'outbox AVANT
+        # l'inscription (les événements diffusés pendant la requête seront
+        # dans le tampon, repris dans replay())
+        stored = None
+        if since is not None and not replay_buffer.covers(self.project_id, since):
+            try:
+                stored = await events_since(self.project_id, since, settings.WS_REPLAY_MAX_STORED)
+            except Exception as e:
+                print(f"Rejeu depuis l'outbox impossible (projet {self.project_id}) : {e}")
+            if self.ws_connection is None:
+                return  # Client parti pendant la lecture
+
         # Ajouter cette connexion au set du projet
         if self.project_id not in active_connections:
             active_connections[self.project_id] = set()
         
         active_connections[self.project_id].add(self)
+        presence.join(self.project_id, self.user_id)
+        self._present = True
         print(f"Client connecté au projet {self.project_id} | Connexions actives : {len(active_connections[self.project_id])}")
 
-        # Message de bienvenue (optionnel)
-        self.write_message(json.dumps({
+        # Message de bienvenue : format effectif (+ table de décodage
+        # identifiant court → nom de champ pour cjson / msgpack) et état de
+        # présence complet, les deltas "presence" suivants s'y appliquent
+        viewers = presence.viewers(self.project_id)
+        welcome = {
             "event_type": "connected",
             "message": f"Connecté au Kanban du projet {self.project_id}",
-            "active_users": len(active_connections[self.project_id])
-        }))
+            "active_users": len(viewers),
+            "viewers": sorted(viewers),
+            "format": self.format,
+        }
+        if self.format != "json":
+            welcome["fields"] = {short: name for name, short in encoding.FIELD_IDS.items()}
+        self.send_event(welcome)
+
+        # Reprise : même tour de boucle que l'inscription, donc aucun événement
+        # ne peut tomber entre le rejeu et le direct
+        if since is not None:
+            self.replay(since, stored)
+
+    def replay(self, since: int, stored: Optional[List[dict]] = None):
+        if replay_buffer.covers(self.project_id, since):
+            events = replay_buffer.since(self.project_id, since)
+        elif stored is None:
+            events = None
+            replay_buffer.resyncs += 1
+        else:
+            # Outbox + ce qui a été diffusé depuis la lecture
+            last = stored[-1]["seq"] if stored else since
+            if not replay_buffer.knows(self.project_id):
+                events = stored
+            elif replay_buffer.covers(self.project_id, last):
+                events = stored + replay_buffer.since(self.project_id, last)
+            else:
+                events = None
+
+        if events is None:
+            self.send_event({
+                "event_type": "resync_required",
+                "reason": "replay_gap",
+                "since": since,
+                "message": "Événements trop anciens : rechargez le board via /tasks/changes",
+            })
+        elif events:
+            self.last_seq = events[-1]["seq"]
+            self.send_event({"event_type": "batch", "replay": True, "project_id": self.project_id, "events": events})
 
 
     def on_message(self, message: str):
@@ -52,41 +349,297 @@ class KanbanWebSocketHandler(WebSocketHandler):
         car les mises à jour viennent du backend via API → broadcast)
         Peut servir pour du chat futur ou ack
         """
+        self.last_seen = time.monotonic()
         try:
             data = json.loads(message)
-            print(f"Message reçu du projet {self.project_id}: {data}")
             # Pour MVP : on ignore ou on peut renvoyer un ack
-            self.write_message(json.dumps({"event_type": "ack", "received": data}))
+            self.send_event({"event_type": "ack", "received": data})
         except json.JSONDecodeError:
-            self.write_message(json.dumps({"event_type": "error", "message": "JSON invalide"}))
+            self.send_event({"event_type": "error", "message": "JSON invalide"})
 
 
     def on_close(self):
         """
         Quand le client se déconnecte
         """
-        if hasattr(self, "project_id") and self.project_id in active_connections:
-            active_connections[self.project_id].discard(self)
-            if not active_connections[self.project_id]:
-                del active_connections[self.project_id]
+        if self.unregister():
             print(f"Client déconnecté du projet {self.project_id} | Restant : {len(active_connections.get(self.project_id, set()))}")
 
+    def unregister(self) -> bool:
+        """
+        Retire la connexion des structures partagées (idempotent : appelé par
+        on_close, par _deliver et par le nettoyeur) ; True si elle y était
+        """
+        self.outbox.clear()
+        if self._present:
+            self._present = False
+            presence.leave(self.project_id, self.user_id)
+        connections = active_connections.get(getattr(self, "project_id", None))
+        if connections is None or self not in connections:
+            return False
+        connections.discard(self)
+        if not connections:
+            del active_connections[self.project_id]
+        return True
+
 
     def check_origin(self, origin: str) -> bool:
         """
-        Autorise toutes origines pour MVP (CORS-like pour WS)
-        À restreindre en production (ex: vérifier origin == frontend_url)
+        Même hôte que le serveur (vérification Tornado par défaut) ou origine
+        explicitement autorisée (ex: frontend Dash sur un autre port)
         """
-        return True
+        return super().check_origin(origin) or origin.rstrip("/") in settings.WS_ALLOWED_ORIGINS
+
+
+# ───────────────────────────────────────────────
+# Journal des requêtes Tornado sans la query string (elle porte le token)
+# À passer en log_function de l'Application
+# ───────────────────────────────────────────────
+def log_request(handler):
+    request = handler.request
+    status = handler.get_status()
+    if status < 400 and isinstance(handler, KanbanWebSocketHandler):
+        return  # Connexions normales : déjà tracées par open() / on_close()
+    print(f"{status} {request.method} {request.path} ({request.remote_ip}) {1000.0 * request.request_time():.2f}ms")
+
+
+# ───────────────────────────────────────────────
+# Envoi effectif, exécuté sur la boucle Tornado par le dispatcher
+# ───────────────────────────────────────────────
+def _deliver(project_id: int, events: List[dict]):
+    # Mémorisé même sans abonné : c'est justement ce que rejoueront les reconnexions
+    for event in events:
+        for item in event["events"] if event.get("event_type") == "batch" else [event]:
+            replay_buffer.record(project_id, item)
+
+    connections = active_connections.get(project_id)
+    if not connections:
+        return  # Pas de clients → rien à faire
+
+    # Sérialisation une seule fois par événement et par format, pas par connexion
+    encoder = FrameEncoder(events)
+
+    # Copie : on_close / une éviction peuvent modifier le set pendant l'itération
+    for conn in list(connections):
+        if conn.ws_connection is None:
+            conn.unregister()  # Connexion morte
+            continue
+        frames = zip(encoder.frames(conn.format), encoder.sizes(conn.format), encoder.coalesce_keys, encoder.seqs)
+        for frame, size, coalesce_key, seq in frames:
+            if seq is not None:
+                if seq <= conn.last_seq:
+                    continue  # Déjà envoyé (livraison "au moins une fois")
+                conn.last_seq = seq
+            conn.send(frame, coalesce_key, size, critical=seq is not None)
+
+
+def connection_stats(top: int = 10) -> dict:
+    """Octets en attente par connexion (les plus chargées) + totaux de débordement"""
+    conns = [conn for connections in list(active_connections.values()) for conn in connections]
+    slowest = sorted(conns, key=lambda conn: conn.outbox.buffered_bytes, reverse=True)[:top]
+    return {
+        "connections": len(conns),
+        "overflow_policy": settings.WS_OUTBOX_OVERFLOW_POLICY,
+        "buffered_bytes_total": sum(conn.outbox.buffered_bytes for conn in conns),
+        "buffered_messages_total": sum(len(conn.outbox) for conn in conns),
+        "slowest": [
+            {
+                "project_id": conn.project_id,
+                "buffered_bytes": conn.outbox.buffered_bytes,
+                "buffered_messages": len(conn.outbox),
+                "dropped": conn.outbox.dropped,
+                "coalesced": conn.outbox.coalesced,
+            }
+            for conn in slowest
+            if conn.outbox.buffered_bytes
+        ],
+        **send_queue.totals,
+    }
+
+
+# ───────────────────────────────────────────────
+# Nettoyeur des connexions mortes ou muettes (une passe pour tout le worker,
+# au lieu de les découvrir une à une au fil des broadcasts)
+# ───────────────────────────────────────────────
+_reaper: Optional[PeriodicCallback] = None
+# Connexions retirées lors du dernier passage, par projet (jauge) + cumul
+_last_reaped: Dict[int, int] = {}
+reaper_totals = {"sweeps": 0, "reaped": 0, "idle_closed": 0}
+
+
+def start_reaper():
+    """Idempotent : démarré à la première connexion, sur la boucle Tornado"""
+    global _reaper
+    if _reaper is not None or settings.WS_REAP_INTERVAL_SECONDS <= 0:
+        return
+    _reaper = PeriodicCallback(reap_connections, settings.WS_REAP_INTERVAL_SECONDS * 1000)
+    _reaper.start()
+
+
+def stop_reaper():
+    global _reaper
+    if _reaper is not None:
+        _reaper.stop()
+        _reaper = None
+
+
+def reap_connections():
+    now = time.monotonic()
+    # Sans ping serveur, un client sain mais silencieux n'envoie rien :
+    # le silence ne prouve plus la disparition du pair
+    idle_timeout = settings.WS_IDLE_TIMEOUT_SECONDS if settings.WS_PING_INTERVAL_SECONDS > 0 else 0
+    reaped: Counter = Counter()
+
+    for project_id, connections in list(active_connections.items()):
+        for conn in list(connections):
+            if conn.ws_connection is None or conn.ws_connection.is_closing():
+                # Fermée sans on_close (ou fermeture en cours) : zombie
+                conn.unregister()
+                reaped[project_id] += 1
+            elif idle_timeout > 0 and now - conn.last_seen > idle_timeout:
+                # Ni message ni pong depuis trop longtemps : pair disparu
+                conn.unregister()
+                conn.close(code=4002, reason="idle timeout")
+                reaped[project_id] += 1
+                reaper_totals["idle_closed"] += 1
+
+    _last_reaped.clear()
+    _last_reaped.update(reaped)
+    reaper_totals["sweeps"] += 1
+    reaper_totals["reaped"] += sum(reaped.values())
+    if reaped:
+        print(f"Nettoyage WebSocket : {sum(reaped.values())} connexion(s) retirée(s) sur {len(reaped)} projet(s)")
+
+
+def liveness_stats(top: int = 10) -> dict:
+    """
+    Jauges par projet : live (trafic récent), idle (aucun pong depuis plus de
+    deux intervalles de ping) et reaped (retirées au dernier passage)
+    """
+    now = time.monotonic()
+    idle_after = 2 * settings.WS_PING_INTERVAL_SECONDS or settings.WS_IDLE_TIMEOUT_SECONDS / 2
+    projects: Dict[int, Dict[str, int]] = {}
+    for project_id, connections in list(active_connections.items()):
+        idle = sum(1 for conn in list(connections) if now - conn.last_seen > idle_after)
+        projects[project_id] = {"live": len(connections) - idle, "idle": idle, "reaped": _last_reaped.get(project_id, 0)}
+    for project_id, count in _last_reaped.items():
+        projects.setdefault(project_id, {"live": 0, "idle": 0, "reaped": count})
+
+    busiest = sorted(projects.items(), key=lambda item: sum(item[1].values()), reverse=True)[:top]
+    return {
+        "live": sum(gauges["live"] for gauges in projects.values()),
+        "idle": sum(gauges["idle"] for gauges in projects.values()),
+        "reaped_last_sweep": sum(_last_reaped.values()),
+        "projects": {project_id: gauges for project_id, gauges in busiest},
+        "ping_interval_seconds": settings.WS_PING_INTERVAL_SECONDS,
+        "idle_timeout_seconds": settings.WS_IDLE_TIMEOUT_SECONDS,
+        **reaper_totals,
+    }
+
+
+# ───────────────────────────────────────────────
+# Arrêt coordonné du worker (appelé par run.py)
+# ───────────────────────────────────────────────
+def announce_restart() -> int:
+    """
+    Refuse les nouveaux handshakes et demande à chaque client de se
+    reconnecter plus tard, avec un délai tiré au hasard : les reconnexions
+    (avec ?since=, donc sans rechargement complet) s'étalent sur les autres
+    workers au lieu d'arriver toutes à la même milliseconde
+    """
+    global accepting_connections
+    accepting_connections = False
+    conns = [conn for connections in list(active_connections.values()) for conn in connections]
+    for conn in conns:
+        conn.send_event({
+            "event_type": "reconnect_later",
+            "reason": "server_restart",
+            "retry_after_ms": random.randint(settings.WS_RECONNECT_JITTER_MIN_MS, settings.WS_RECONNECT_JITTER_MAX_MS),
+            "message": "Redémarrage du serveur : reconnectez-vous avec ?since=<dernier seq>",
+        })
+    return len(conns)
+
+
+async def drain_connections(timeout: float) -> bool:
+    """
+    Attend que les broadcasts en file et les files d'envoi soient vidés
+    (borné par timeout), puis ferme les sockets en 1012 (Service Restart) ;
+    True si tout est parti avant le délai
+    """
+    deadline = time.monotonic() + timeout
+    drained = False
+    while not drained and time.monotonic() < deadline:
+        conns = [conn for connections in list(active_connections.values()) for conn in connections]
+        drained = not dispatcher.pending() and not any(len(conn.outbox) or conn._pumping for conn in conns)
+        if not drained:
+            await asyncio.sleep(0.05)
+    if not drained:
+        print("Vidage WebSocket incomplet : fermeture avec des messages en attente")
+
+    for connections in list(active_connections.values()):
+        for conn in list(connections):
+            conn.close(code=1012, reason="server restart")
+    return drained
+
+
+dispatcher = BroadcastDispatcher(
+    _deliver,
+    max_pending_per_project=settings.WS_BROADCAST_MAX_PENDING,
+    batch_size=settings.WS_BROADCAST_BATCH_SIZE,
+    coalesce_window_ms=settings.WS_COALESCE_WINDOW_MS,
+)
 
 
 # ───────────────────────────────────────────────
 # Fonction utilitaire pour broadcaster un événement à tous les clients d'un projet
-# À appeler depuis les endpoints API quand une tâche change
+# À appeler depuis les endpoints API quand une tâche change (depuis n'importe
+# quel thread : l'envoi réel se fait plus tard sur la boucle Tornado)
 # ───────────────────────────────────────────────
+def _on_kanban_message(message: dict):
+    dispatcher.publish(message["project_id"], message["event"])
+
+
+event_bus.subscribe("kanban", _on_kanban_message)
+
+
+def _on_acl_message(message: dict):
+    """
+    Invalidation de droits (tout thread) : les sockets concernées de ce worker
+    sont revérifiées sur la boucle Tornado (caches déjà vidés par les abonnés
+    de dependencies.py / permissions.py, inscrits avant celui-ci)
+    """
+    if dispatcher.bound:
+        dispatcher.call_soon(_revalidate_connections, message)
+
+
+def _revalidate_connections(message: dict):
+    for connections in list(active_connections.values()):
+        for conn in list(connections):
+            targets = {"user_id": conn.user_id, "project_id": conn.project_id, "team_id": conn.team_id}
+            if conn._access_token is not None and any(
+                key in message and message[key] == value for key, value in targets.items()
+            ):
+                asyncio.ensure_future(conn.revalidate())
+
+
+event_bus.subscribe("acl", _on_acl_message)
+
+
+# Deltas de présence : livrés aux connexions locales seulement (chaque worker
+# calcule les siens à partir des instantanés reçus par le bus)
+presence = PresenceTracker(
+    dispatcher.publish,
+    throttle_seconds=settings.PRESENCE_THROTTLE_MS / 1000,
+    heartbeat_seconds=settings.PRESENCE_HEARTBEAT_SECONDS,
+    ttl_seconds=settings.PRESENCE_TTL_SECONDS,
+)
+event_bus.subscribe("presence", presence.on_bus_message)
+
+
 def broadcast_to_project(project_id: int, event: dict):
     """
-    Envoie un événement JSON à tous les clients connectés sur ce project_id
+    Met en file un événement JSON pour tous les clients connectés sur ce project_id,
+    dans ce worker et (via le bus) dans les autres
     Exemple d'event :
     {
         "event_type": "task_moved",
@@ -95,21 +648,4 @@ def broadcast_to_project(project_id: int, event: dict):
         "updated_by": 5
     }
     """
-    if project_id not in active_connections:
-        return  # Pas de clients → rien à faire
-
-    message = json.dumps(event)
-    disconnected = set()
-
-    for conn in active_connections[project_id]:
-        try:
-            conn.write_message(message)
-        except Exception:
-            disconnected.add(conn)
-
-    # Nettoyage des connexions mortes
-    for conn in disconnected:
-        active_connections[project_id].discard(conn)
-
-    if not active_connections[project_id]:
-        del active_connections[project_id]
+    event_bus.publish("kanban", {"project_id": project_id, "event": event})
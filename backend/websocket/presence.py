@@ -0,0 +1,199 @@
+# backend/websocket/presence.py
+"""
+Présence : qui regarde quel board, tous workers confondus
+- Chaque worker compte ses propres connexions par (projet, utilisateur)
+- Les workers s'échangent leurs instantanés via le bus (canal "presence") :
+  à chaque changement (throttlé) et en heartbeat périodique ; l'instantané
+  d'un worker qui ne donne plus signe de vie expire après PRESENCE_TTL_SECONDS
+- Les clients reçoivent des deltas agrégés {"event_type": "presence",
+  "viewers": n, "joined": [...], "left": [...]}, au plus un par projet et par
+  PRESENCE_THROTTLE_MS : une relève d'équipe (100 départs + 100 arrivées)
+  produit une trame, pas 200
+- Utilisé uniquement depuis la boucle Tornado (les messages du bus y arrivent)
+"""
+
+import asyncio
+import os
+import socket
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from ..app.event_bus import event_bus
+
+
+class PresenceTracker:
+    def __init__(
+        self,
+        deliver: Callable[[int, dict], None],
+        throttle_seconds: float,
+        heartbeat_seconds: float,
+        ttl_seconds: float,
+    ):
+        # deliver(project_id, event) : envoi aux connexions locales du projet
+        self._deliver = deliver
+        self.throttle = throttle_seconds
+        self.heartbeat = heartbeat_seconds
+        self.ttl = ttl_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat_handle: Optional[asyncio.TimerHandle] = None
+        # project_id → Counter(user_id → connexions locales)
+        self._local: Dict[int, Counter] = {}
+        # project_id → worker → (expiration monotone, utilisateurs)
+        self._remote: Dict[int, Dict[str, Tuple[float, Set[int]]]] = {}
+        # Dernier état envoyé aux clients locaux, par projet
+        self._announced: Dict[int, Set[int]] = {}
+        # Projets dont l'instantané local doit être publié au prochain flush
+        self._local_dirty: Set[int] = set()
+        self._scheduled: Set[int] = set()
+        self._last_flush: Dict[int, float] = {}
+
+        self.deltas_sent = 0
+        self.snapshots_published = 0
+
+    # ─── Cycle de vie ───────────────────────────────────────────────────────
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Idempotent : appelé à la première connexion du worker"""
+        if self._loop is loop and self._heartbeat_handle is not None:
+            return
+        self._loop = loop
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._heartbeat_handle = loop.call_later(self.heartbeat, self._on_heartbeat)
+
+    def stop(self):
+        """Arrêt du worker : les autres oublient tout de suite ses spectateurs"""
+        if self._heartbeat_handle is not None:
+            self._heartbeat_handle.cancel()
+            self._heartbeat_handle = None
+        if self._local:
+            event_bus.publish("presence", {
+                "worker": self.worker_id,
+                "projects": {project_id: [] for project_id in self._local},
+            })
+        self._local.clear()
+
+    # ─── Connexions locales ─────────────────────────────────────────────────
+
+    def join(self, project_id: int, user_id: int):
+        users = self._local.setdefault(project_id, Counter())
+        users[user_id] += 1
+        if users[user_id] == 1:
+            self._local_changed(project_id)
+
+    def leave(self, project_id: int, user_id: int):
+        users = self._local.get(project_id)
+        if not users or not users[user_id]:
+            return
+        users[user_id] -= 1
+        if users[user_id] == 0:
+            del users[user_id]
+            if not users:
+                del self._local[project_id]
+            self._local_changed(project_id)
+
+    def viewers(self, project_id: int) -> Set[int]:
+        """Utilisateurs distincts qui regardent ce board (tous workers)"""
+        now = time.monotonic()
+        users = set(self._local.get(project_id, ()))
+        for expires, remote_users in self._remote.get(project_id, {}).values():
+            if expires > now:
+                users |= remote_users
+        return users
+
+    # ─── Flush throttlé ─────────────────────────────────────────────────────
+
+    def _local_changed(self, project_id: int):
+        self._local_dirty.add(project_id)
+        self._schedule(project_id)
+
+    def _schedule(self, project_id: int):
+        if project_id in self._scheduled or self._loop is None:
+            return
+        self._scheduled.add(project_id)
+        elapsed = time.monotonic() - self._last_flush.get(project_id, 0.0)
+        self._loop.call_later(max(0.0, self.throttle - elapsed), self._flush, project_id)
+
+    def _flush(self, project_id: int):
+        self._scheduled.discard(project_id)
+        self._last_flush[project_id] = time.monotonic()
+
+        if project_id in self._local_dirty:
+            self._local_dirty.discard(project_id)
+            self._publish_snapshot([project_id])
+
+        current = self.viewers(project_id)
+        previous = self._announced.get(project_id, set())
+        if current != previous and project_id in self._local:
+            self._deliver(project_id, {
+                "event_type": "presence",
+                "project_id": project_id,
+                "viewers": len(current),
+                "joined": sorted(current - previous),
+                "left": sorted(previous - current),
+            })
+            self.deltas_sent += 1
+
+        if current and project_id in self._local:
+            self._announced[project_id] = current
+        else:
+            # Plus aucune connexion locale : rien à suivre pour ce projet ici
+            self._announced.pop(project_id, None)
+            self._last_flush.pop(project_id, None)
+
+    # ─── Échanges entre workers ─────────────────────────────────────────────
+
+    def _publish_snapshot(self, project_ids):
+        event_bus.publish("presence", {
+            "worker": self.worker_id,
+            "projects": {
+                project_id: sorted(self._local.get(project_id, ()))
+                for project_id in project_ids
+            },
+        })
+        self.snapshots_published += 1
+
+    def on_bus_message(self, message: dict):
+        if message["worker"] == self.worker_id:
+            return
+        expires = time.monotonic() + self.ttl
+        for project_id, users in message["projects"].items():
+            project_id = int(project_id)  # clés JSON → chaînes
+            workers = self._remote.setdefault(project_id, {})
+            previous = workers.get(message["worker"], (0.0, set()))[1]
+            if users:
+                workers[message["worker"]] = (expires, set(users))
+            else:
+                workers.pop(message["worker"], None)
+                if not workers:
+                    del self._remote[project_id]
+            if set(users) != previous and project_id in self._local:
+                self._schedule(project_id)
+
+    def _on_heartbeat(self):
+        self._heartbeat_handle = self._loop.call_later(self.heartbeat, self._on_heartbeat)
+        if self._local:
+            self._publish_snapshot(list(self._local))
+
+        # Workers silencieux (crash) : leurs spectateurs disparaissent
+        now = time.monotonic()
+        for project_id in list(self._remote):
+            workers = self._remote[project_id]
+            expired = [worker for worker, (expires, _) in workers.items() if expires <= now]
+            for worker in expired:
+                del workers[worker]
+            if not workers:
+                del self._remote[project_id]
+            if expired and project_id in self._local:
+                self._schedule(project_id)
+
+    def stats(self) -> dict:
+        return {
+            "projects_viewed_here": len(self._local),
+            "local_viewers": sum(len(users) for users in self._local.values()),
+            "remote_workers": len({worker for workers in self._remote.values() for worker in workers}),
+            "deltas_sent": self.deltas_sent,
+            "snapshots_published": self.snapshots_published,
+        }
@@ -0,0 +1,84 @@
+# backend/websocket/replay.py
+"""
+Tampon circulaire des derniers événements de chaque projet (reprise après reconnexion)
+- Chaque événement porte "seq" = révision du projet (project.revision), donc
+  le même numéro que le curseur de GET /tasks/changes
+- Un client qui se reconnecte avec ?since=<seq> reçoit seulement les événements
+  manqués, ou "resync_required" si le trou est plus ancien que le tampon
+- Borné : WS_REPLAY_BUFFER_SIZE événements par projet, WS_REPLAY_MAX_PROJECTS
+  projets (les moins récemment actifs sont oubliés)
+- Au-delà du tampon, le rejeu se fait depuis la table outbox (voir app/outbox.py)
+- Utilisé uniquement depuis la boucle Tornado : pas de verrou
+"""
+
+import bisect
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class ProjectLog:
+    def __init__(self, first_seq: int):
+        # Tout ce qui est > floor est dans le tampon (les révisions sans
+        # événement, ex: modification du projet, ne créent pas de trou)
+        self.floor = first_seq - 1
+        self.seqs: List[int] = []
+        self.events: List[dict] = []
+
+
+class ReplayBuffer:
+    def __init__(self, max_events_per_project: int, max_projects: int):
+        self.max_events_per_project = max_events_per_project
+        self.max_projects = max_projects
+        self._logs: "OrderedDict[int, ProjectLog]" = OrderedDict()
+        self.replayed = 0
+        self.resyncs = 0
+
+    def record(self, project_id: int, event: dict):
+        seq = event.get("seq")
+        if seq is None:
+            return  # Événement non numéroté (connexion, ack...) : pas rejouable
+
+        log = self._logs.get(project_id)
+        if log is None:
+            log = self._logs[project_id] = ProjectLog(seq)
+            while len(self._logs) > self.max_projects:
+                self._logs.popitem(last=False)
+        self._logs.move_to_end(project_id)
+
+        # Deux requêtes concurrentes peuvent publier hors ordre : insertion triée
+        index = bisect.bisect_right(log.seqs, seq)
+        if index and log.seqs[index - 1] == seq:
+            return  # Rediffusion (outbox "au moins une fois") : déjà connu
+        log.seqs.insert(index, seq)
+        log.events.insert(index, event)
+        if len(log.seqs) > self.max_events_per_project:
+            log.floor = log.seqs.pop(0)
+            log.events.pop(0)
+
+    def knows(self, project_id: int) -> bool:
+        """Au moins un événement de ce projet a été vu par ce process"""
+        return project_id in self._logs
+
+    def covers(self, project_id: int, seq: int) -> bool:
+        """Tous les événements de seq > since sont encore dans le tampon"""
+        log = self._logs.get(project_id)
+        return log is not None and seq >= log.floor
+
+    def since(self, project_id: int, seq: int) -> Optional[List[dict]]:
+        """Événements de seq > since, ou None si certains ne sont plus disponibles"""
+        log = self._logs.get(project_id)
+        if log is None or seq < log.floor:
+            self.resyncs += 1
+            return None
+        events = log.events[bisect.bisect_right(log.seqs, seq):]
+        self.replayed += len(events)
+        return events
+
+    def stats(self) -> dict:
+        return {
+            "projects": len(self._logs),
+            "events": sum(len(log.seqs) for log in list(self._logs.values())),
+            "max_events_per_project": self.max_events_per_project,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+        }
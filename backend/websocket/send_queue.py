@@ -0,0 +1,124 @@
+# backend/websocket/send_queue.py
+"""
+File d'envoi bornée d'une connexion WebSocket (protection contre les clients lents)
+- Bornée en nombre de messages ET en octets : la mémoire serveur reste stable
+  même avec des milliers d'abonnés dont certains sur un réseau mobile médiocre
+- Taille comptée en octets réellement envoyés (UTF-8 pour les trames texte)
+- Politique de débordement (WS_OUTBOX_OVERFLOW_POLICY), appliquée seulement
+  quand la file est pleine :
+    * drop_oldest : on jette les messages les plus anciens
+    * coalesce    : un "task_updated" retire le "task_updated" encore en
+                    attente pour la même tâche (dernier état gagnant) et prend
+                    place en fin de file (les seq restent croissants) ;
+                    créations et suppressions ne sont jamais remplacées.
+                    Puis drop_oldest si la file reste pleine
+    * disconnect  : on ferme la connexion avec un indice de resynchronisation
+                    (le client recharge via /tasks/changes)
+- Un message "critique" (événement numéroté) jeté par débordement n'est
+  jamais perdu en silence : lost_events passe à vrai et la connexion remplace
+  sa file par un "resync_required" (voir KanbanWebSocketHandler.send)
+- Utilisée uniquement depuis la boucle Tornado : pas de verrou
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from .encoding import Frame, frame_size
+
+POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Totaux tous clients confondus (pour /metrics)
+totals = {
+    "dropped": 0,
+    "coalesced": 0,
+    "evicted": 0,
+}
+
+
+class SendQueue:
+    def __init__(self, max_messages: int, max_bytes: int, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"Politique de débordement inconnue : {policy} (attendu : {', '.join(POLICIES)})")
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.policy = policy
+        # numéro d'arrivée → (message, taille, clé de fusion, critique)
+        self._items: "OrderedDict[int, Tuple[Frame, int, Optional[Hashable], bool]]" = OrderedDict()
+        # clé de fusion → numéro de la dernière mise à jour en attente
+        self._pending_updates: Dict[Hashable, int] = {}
+        self._seq = 0
+        self.buffered_bytes = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # Un message critique a été jeté depuis le dernier clear()
+        self.lost_events = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(
+        self,
+        message: Frame,
+        coalesce_key: Optional[Hashable] = None,
+        size: Optional[int] = None,
+        critical: bool = False,
+    ) -> bool:
+        """
+        Ajoute un message. coalesce_key : uniquement pour les mises à jour
+        remplaçables (voir FrameEncoder) ; size : taille déjà calculée par
+        l'encodeur (sinon mesurée ici) ; critical : sa perte doit être
+        signalée au client (événement numéroté). Retourne False si la
+        politique "disconnect" exige de fermer la connexion (message non ajouté).
+        """
+        if size is None:
+            size = frame_size(message)
+
+        if self._overflows(size):
+            if self.policy == "disconnect":
+                totals["evicted"] += 1
+                return False
+            if self.policy == "coalesce" and coalesce_key in self._pending_updates:
+                # Même tâche déjà en attente : l'ancienne version est retirée,
+                # la nouvelle part en fin de file
+                self._remove(self._pending_updates[coalesce_key])
+                self.coalesced += 1
+                totals["coalesced"] += 1
+            while self._items and self._overflows(size):
+                self._drop_oldest()
+
+        self._seq += 1
+        self._items[self._seq] = (message, size, coalesce_key, critical)
+        if coalesce_key is not None:
+            self._pending_updates[coalesce_key] = self._seq
+        self.buffered_bytes += size
+        return True
+
+    def pop(self) -> Tuple[int, Frame]:
+        number, (message, size, coalesce_key, _) = self._items.popitem(last=False)
+        self._forget(number, size, coalesce_key)
+        return number, message
+
+    def clear(self):
+        self._items.clear()
+        self._pending_updates.clear()
+        self.buffered_bytes = 0
+        self.lost_events = False
+
+    def _remove(self, number: int):
+        _, size, coalesce_key, _ = self._items.pop(number)
+        self._forget(number, size, coalesce_key)
+
+    def _forget(self, number: int, size: int, coalesce_key: Optional[Hashable]):
+        self.buffered_bytes -= size
+        if coalesce_key is not None and self._pending_updates.get(coalesce_key) == number:
+            del self._pending_updates[coalesce_key]
+
+    def _overflows(self, size: int) -> bool:
+        return len(self._items) >= self.max_messages or self.buffered_bytes + size > self.max_bytes
+
+    def _drop_oldest(self):
+        if next(iter(self._items.values()))[3]:
+            self.lost_events = True
+        self.pop()
+        self.dropped += 1
+        totals["dropped"] += 1
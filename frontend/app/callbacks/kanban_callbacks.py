@@ -15,40 +15,74 @@ from datetime import datetime
 import json
 
 # ───────────────────────────────────────────────
-# 1. Rafraîchissement périodique des tâches (polling via Interval)
+# 1. Rafraîchissement périodique des tâches (polling incrémental via Interval)
 # ───────────────────────────────────────────────
 @callback(
     Output("store-tasks", "data", allow_duplicate=True),
+    Output("store-tasks-cursor", "data", allow_duplicate=True),
+    Output("store-tasks-etag", "data", allow_duplicate=True),
     Input("refresh-interval", "n_intervals"),
     State("store-project-id", "data"),
     State("store-auth-token", "data"),
+    State("store-tasks", "data"),
+    State("store-tasks-cursor", "data"),
+    State("store-tasks-etag", "data"),
     prevent_initial_call=True
 )
-def refresh_kanban_tasks(n_intervals, project_id, token):
+def refresh_kanban_tasks(n_intervals, project_id, token, tasks, cursor, etag):
     """
-    Recharge toutes les tâches du projet toutes les X secondes.
-    C'est la méthode la plus simple et fiable pour le MVP.
+    Récupère seulement les tâches créées / modifiées / supprimées depuis le
+    dernier curseur (GET /tasks/changes) et les fusionne dans le store.
+    Coût proportionnel au nombre de changements, pas à la taille du board.
+    Board inchangé → le serveur répond 304 (If-None-Match) sans corps.
     """
     if not project_id or not token:
-        return no_update
+        return no_update, no_update, no_update
+
+    headers = {"Authorization": f"Bearer {token}"}
+    by_id = {t["id"]: t for t in tasks or []}
+    changed = False
 
     try:
-        headers = {"Authorization": f"Bearer {token}"}
-        resp = requests.get(
-            f"http://127.0.0.1:8000/tasks?project_id={project_id}",
-            headers=headers,
-            timeout=5
-        )
+        while True:
+            params = {"project_id": project_id}
+            if cursor:
+                params["since"] = cursor
+            request_headers = dict(headers)
+            if etag:
+                request_headers["If-None-Match"] = etag
+            resp = requests.get(
+                "http://127.0.0.1:8000/tasks/changes",
+                params=params,
+                headers=request_headers,
+                timeout=5
+            )
 
-        if resp.status_code == 200:
-            return resp.json()
-        else:
-            print(f"Erreur refresh tâches {resp.status_code}: {resp.text}")
-            return no_update
+            if resp.status_code == 304:
+                break
+
+            if resp.status_code != 200:
+                print(f"Erreur refresh tâches {resp.status_code}: {resp.text}")
+                break
+
+            etag = resp.headers.get("ETag")
+            changes = resp.json()
+            for task in changes["tasks"]:
+                by_id[task["id"]] = task
+                changed = True
+            for task_id in changes["deleted"]:
+                changed = by_id.pop(task_id, None) is not None or changed
+            cursor = changes["cursor"]
+
+            if not changes["has_more"]:
+                break
 
     except Exception as e:
         print(f"Erreur connexion polling: {str(e)}")
-        return no_update
+
+    if not changed:
+        return no_update, no_update, etag
+    return list(by_id.values()), cursor, etag
 
 
 # ───────────────────────────────────────────────
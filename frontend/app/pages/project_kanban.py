@@ -23,6 +23,10 @@ def layout(project_id=None):
         # Stores
         dcc.Store(id="store-project-id", data=int(project_id)),
         dcc.Store(id="store-tasks", data=[]),
+        # Curseur de synchronisation incrémentale (GET /tasks/changes)
+        dcc.Store(id="store-tasks-cursor", data=None),
+        # ETag de la dernière réponse de polling (If-None-Match → 304 si rien n'a changé)
+        dcc.Store(id="store-tasks-etag", data=None),
 
         # Titre du projet
         html.H2(id="project-kanban-title", className="mt-4 mb-2"),
@@ -112,19 +116,20 @@ def layout(project_id=None):
 
 
 # ───────────────────────────────────────────────
-# Charger les infos du projet + les tâches
+# Charger les infos du projet + les tâches (chargement initial uniquement :
+# le polling incrémental est fait par refresh_kanban_tasks via /tasks/changes)
 # ───────────────────────────────────────────────
 @callback(
     Output("project-kanban-title", "children"),
     Output("project-kanban-desc", "children"),
     Output("store-tasks", "data"),
+    Output("store-tasks-cursor", "data"),
     Input("store-project-id", "data"),
     Input("store-auth-token", "data"),
-    Input("refresh-interval", "n_intervals")
 )
-def load_project_and_tasks(project_id, token, _):
+def load_project_and_tasks(project_id, token):
     if not project_id or not token:
-        return "Projet inconnu", "", []
+        return "Projet inconnu", "", [], None
 
     headers = {"Authorization": f"Bearer {token}"}
 
@@ -132,26 +137,34 @@ def load_project_and_tasks(project_id, token, _):
     try:
         p_resp = requests.get(f"http://127.0.0.1:8000/projects/{project_id}", headers=headers)
         if p_resp.status_code != 200:
-            return "Erreur chargement projet", "", []
+            return "Erreur chargement projet", "", [], None
 
         project = p_resp.json()
         title = project.get("name", "Projet sans nom")
         desc = project.get("description", "Aucune description")
 
     except Exception:
-        return "Erreur serveur (projet)", "", []
+        return "Erreur serveur (projet)", "", [], None
 
-    # Tâches du projet
+    # Tâches du projet : instantané complet + curseur pour les appels suivants
+    tasks, cursor = [], None
     try:
-        t_resp = requests.get(
-            f"http://127.0.0.1:8000/tasks?project_id={project_id}",
-            headers=headers
-        )
-        tasks = t_resp.json() if t_resp.status_code == 200 else []
+        while True:
+            params = {"project_id": project_id}
+            if cursor:
+                params["since"] = cursor
+            t_resp = requests.get("http://127.0.0.1:8000/tasks/changes", params=params, headers=headers)
+            if t_resp.status_code != 200:
+                break
+            changes = t_resp.json()
+            tasks.extend(changes["tasks"])
+            cursor = changes["cursor"]
+            if not changes["has_more"]:
+                break
     except Exception:
-        tasks = []
+        pass
 
-    return title, desc, tasks
+    return title, desc, tasks, cursor
 
 
 # ───────────────────────────────────────────────
@@ -70,7 +70,7 @@ class DashboardScreen(MDScreen):
 # Pour tester rapidement sans backend réel
 # (supprime cette partie quand auth_service et api_service fonctionnent)
 if "get_user_projects" not in globals():
-    def get_user_projects(limit=5):
+    def get_user_projects(limit=5, cursor=None):
         return {
             "projects": [
                 {"id": 1, "name": "Site E-commerce", "progress": 75},
@@ -14,8 +14,9 @@ from ..components.kanban_column import KanbanColumn
 from ..components.task_card import TaskCard
 
 # Services
-from ..services.api_service import get_project_tasks, create_task, update_task_status
+from ..services.api_service import get_project, get_task_changes, create_task, update_task_status
 from ..services.websocket_service import WebSocketService
+from ..services.auth_service import load_auth_token
 
 
 class ProjectKanbanScreen(MDScreen):
@@ -32,6 +33,15 @@ class ProjectKanbanScreen(MDScreen):
 
     ws_service = ObjectProperty(None)
 
+    # Curseur de synchronisation incrémentale (GET /tasks/changes)
+    tasks_cursor = StringProperty("")
+    # Dernier numéro d'événement WebSocket reçu (reprise via ?since= à la reconnexion)
+    last_seq = NumericProperty(0)
+    # Utilisateurs distincts sur ce board (message "connected" puis deltas "presence")
+    viewers_count = NumericProperty(0)
+    # Reconnexion programmée après un "reconnect_later" du serveur
+    _reconnect_event = None
+
     def on_enter(self):
         """Chargé à chaque fois que l'écran est affiché"""
         if self.project_id == 0:
@@ -39,29 +49,62 @@ class ProjectKanbanScreen(MDScreen):
             self.manager.current = "dashboard"
             return
 
-        self.load_project_data()
+        self.sync_tasks()
         self.connect_websocket()
 
     def on_leave(self):
         """Quand on quitte l'écran"""
+        if self._reconnect_event:
+            self._reconnect_event.cancel()
+            self._reconnect_event = None
         if self.ws_service:
             self.ws_service.disconnect()
 
     def load_project_data(self):
-        """Récupère les tâches du projet via API"""
+        """Récupère le projet et toutes ses tâches via API (premier chargement)"""
         try:
-            data = get_project_tasks(self.project_id)
+            data = get_project(self.project_id)
             self.project_name = data.get("name", "Projet inconnu")
             self.project_description = data.get("description", "")
 
-            # Normalement ton backend renvoie les tâches groupées ou non
-            # Ici on simule / organise par statut
-            tasks = data.get("tasks", [])
+            # Instantané complet via /tasks/changes : on garde le curseur
+            # pour ne plus télécharger que les changements ensuite
+            tasks, cursor = [], None
+            while True:
+                changes = get_task_changes(self.project_id, since=cursor)
+                if changes.get("error"):
+                    break
+                tasks.extend(changes.get("tasks", []))
+                cursor = changes.get("cursor")
+                if not changes.get("has_more"):
+                    break
+
             self.organize_tasks(tasks)
+            self.tasks_cursor = cursor or ""
 
         except Exception as e:
             self.show_error(f"Erreur chargement projet : {str(e)}")
 
+    def sync_tasks(self):
+        """
+        Au retour sur l'écran : ne récupère que les tâches modifiées depuis
+        le dernier curseur au lieu de recharger tout le board
+        """
+        if not self.tasks_cursor:
+            return self.load_project_data()
+
+        # Changements servis par lots (has_more) : on suit le curseur jusqu'au bout
+        while True:
+            data = get_task_changes(self.project_id, since=self.tasks_cursor)
+            if data.get("error"):
+                return self.show_error(f"Erreur synchronisation : {data['error']}")
+
+            for task in data.get("tasks", []):
+                self.update_task_in_ui(task)
+            self.tasks_cursor = data.get("cursor") or self.tasks_cursor
+            if not data.get("has_more"):
+                break
+
     def organize_tasks(self, tasks_list):
         """Regroupe les tâches par colonne/statut"""
         self.tasks_by_column = {"To Do": [], "In Progress": [], "Done": []}
@@ -82,19 +125,47 @@ class ProjectKanbanScreen(MDScreen):
             self.ws_service.connect(
                 on_message=self.on_ws_message,
                 on_error=self.on_ws_error,
-                channel=f"project_{self.project_id}"
+                channel=str(self.project_id),
+                token=load_auth_token(),
+                since=self.last_seq or None
             )
         except Exception as e:
             print(f"WebSocket non disponible : {e}")
 
     def on_ws_message(self, message):
         """Callback WebSocket - mise à jour reçue"""
-        if message.get("type") == "task_update":
-            task = message.get("task")
+        if message.get("event_type") == "resync_required":
+            # Trop d'événements manqués : rattrapage par l'API
+            self.last_seq = 0
+            return self.sync_tasks()
+
+        if message.get("event_type") == "reconnect_later":
+            # Redémarrage du serveur : reconnexion au délai (aléatoire) indiqué,
+            # avec ?since= → seuls les événements manqués sont rejoués
+            delay = message.get("retry_after_ms", 1000) / 1000
+            self._reconnect_event = Clock.schedule_once(lambda dt: self.connect_websocket(), delay)
+            return
+
+        if message.get("event_type") == "connected":
+            self.viewers_count = message.get("active_users", 0)
+        elif message.get("event_type") == "presence":
+            self.viewers_count = message.get("viewers", 0)
+
+        seq = message.get("seq")
+        if seq is not None:
+            if seq <= self.last_seq:
+                return  # Déjà appliqué (rediffusion "au moins une fois")
+            self.last_seq = seq
+        if message.get("event_type") in ("task_created", "task_updated"):
+            task = message.get("data")
             if task:
                 self.update_task_in_ui(task)
                 Clock.schedule_once(lambda dt: self.show_snack(f"Tâche '{task['title']}' mise à jour"))
 
+    def on_ws_error(self, error):
+        """Callback WebSocket - erreur (le board reste utilisable via l'API)"""
+        print(f"WebSocket erreur : {error}")
+
     def update_task_in_ui(self, updated_task):
         """Déplace ou met à jour une tâche dans les colonnes"""
         task_id = updated_task["id"]
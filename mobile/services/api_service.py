@@ -24,6 +24,42 @@ def get_headers() -> Dict[str, str]:
     return headers
 
 
+# Dernière réponse connue par URL : (ETag, données, curseur suivant) pour les GET conditionnels
+_etag_cache: Dict[str, Tuple[str, Any, Optional[str]]] = {}
+
+
+def conditional_get(url: str, params: Optional[Dict] = None) -> Tuple[bool, Any]:
+    """
+    GET avec If-None-Match : si le serveur répond 304, on renvoie les
+    données déjà en cache sans retélécharger le corps.
+    """
+    success, data, _ = conditional_get_page(url, params)
+    return success, data
+
+
+def conditional_get_page(url: str, params: Optional[Dict] = None) -> Tuple[bool, Any, Optional[str]]:
+    """
+    Comme conditional_get, pour les listes paginées : renvoie aussi le
+    curseur de la page suivante (en-tête X-Next-Cursor, None à la fin)
+    """
+    cache_key = requests.Request("GET", url, params=params).prepare().url
+    headers = get_headers()
+    cached = _etag_cache.get(cache_key)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+
+    resp = requests.get(url, params=params, headers=headers, timeout=TIMEOUT)
+    if resp.status_code == 304 and cached:
+        return True, cached[1], cached[2]
+
+    success, data = handle_response(resp)
+    etag = resp.headers.get("ETag")
+    next_cursor = resp.headers.get("X-Next-Cursor")
+    if success and etag:
+        _etag_cache[cache_key] = (etag, data, next_cursor)
+    return success, data, next_cursor
+
+
 def handle_response(response: requests.Response) -> Tuple[bool, Any]:
     """Gestion standard des réponses API"""
     try:
@@ -40,13 +76,21 @@ def handle_response(response: requests.Response) -> Tuple[bool, Any]:
 
 # ─── Projets ────────────────────────────────────────────────────────────────
 
-def get_user_projects(limit: int = 10, offset: int = 0) -> Dict:
-    """Récupère la liste des projets de l'utilisateur"""
-    url = f"{BASE_URL}{API_PREFIX}/projects/?limit={limit}&offset={offset}"
+def get_user_projects(limit: int = 10, cursor: Optional[str] = None,
+                      fields: str = "id,name,status,updated_at") -> Dict:
+    """
+    Récupère une page des projets de l'utilisateur (plus récents d'abord).
+    Page suivante : rappeler avec cursor=resultat["next_cursor"] (None à la fin).
+    """
+    url = f"{BASE_URL}{API_PREFIX}/projects/"
+    params = {"limit": limit, "fields": fields}
+    if cursor:
+        params["cursor"] = cursor
     try:
-        resp = requests.get(url, headers=get_headers(), timeout=TIMEOUT)
-        success, data = handle_response(resp)
-        return data if success else {"projects": [], "error": data.get("detail")}
+        success, data, next_cursor = conditional_get_page(url, params=params)
+        if not success:
+            return {"projects": [], "error": data.get("detail")}
+        return {"projects": data, "next_cursor": next_cursor}
     except requests.RequestException as e:
         return {"projects": [], "error": f"Erreur réseau: {str(e)}"}
 
@@ -55,8 +99,7 @@ def get_project(project_id: int) -> Dict:
     """Détails d'un projet spécifique"""
     url = f"{BASE_URL}{API_PREFIX}/projects/{project_id}"
     try:
-        resp = requests.get(url, headers=get_headers(), timeout=TIMEOUT)
-        success, data = handle_response(resp)
+        success, data = conditional_get(url)
         return data if success else {"error": data.get("detail")}
     except requests.RequestException as e:
         return {"error": f"Erreur réseau: {str(e)}"}
@@ -75,6 +118,23 @@ def get_project_tasks(project_id: int) -> Dict:
         return {"tasks": [], "error": f"Erreur réseau: {str(e)}"}
 
 
+def get_task_changes(project_id: int, since: Optional[str] = None) -> Dict:
+    """
+    Synchronisation incrémentale : tâches créées / modifiées / supprimées
+    depuis le curseur 'since' (toutes les tâches si since est None).
+    Renvoie {"tasks": [...], "deleted": [...], "cursor": "...", "has_more": bool}
+    """
+    url = f"{BASE_URL}{API_PREFIX}/tasks/changes"
+    params = {"project_id": project_id}
+    if since:
+        params["since"] = since
+    try:
+        success, data = conditional_get(url, params=params)
+        return data if success else {"tasks": [], "deleted": [], "cursor": since, "error": data.get("detail")}
+    except requests.RequestException as e:
+        return {"tasks": [], "deleted": [], "cursor": since, "error": f"Erreur réseau: {str(e)}"}
+
+
 def create_task(project_id: int, task_data: Dict) -> Tuple[bool, Dict]:
     """Crée une nouvelle tâche dans un projet"""
     url = f"{BASE_URL}{API_PREFIX}/projects/{project_id}/tasks"
@@ -39,12 +39,14 @@ class WebSocketService:
         on_connect: Callable = None,
         on_disconnect: Callable = None,
         channel: str = None,
-        token: str = None
+        token: str = None,
+        since: int = None
     ):
         """
         Établit la connexion WebSocket
         - url: ex: ws://127.0.0.1:8000/ws/project/123
         - channel: optionnel, si ton backend utilise des rooms/subscriptions
+        - since: dernier "seq" reçu → le serveur rejoue les événements manqués
         """
         if websocket is None:
             Logger.warning("WebSocket: bibliothèque manquante")
@@ -65,6 +67,9 @@ class WebSocketService:
         if token:
             self.url += f"?token={token}"  # ou utilise header si ton backend le supporte
 
+        if since:
+            self.url += f"{'&' if '?' in self.url else '?'}since={since}"
+
         self._start_connection()
 
     def _start_connection(self):
@@ -81,8 +86,11 @@ class WebSocketService:
         def on_message(ws, message):
             try:
                 data = json.loads(message)
+                # Trame groupée du serveur (fenêtre de fusion) → un callback par événement
+                events = data.get("events", []) if data.get("event_type") == "batch" else [data]
                 if self.on_message_callback:
-                    Clock.schedule_once(lambda dt: self.on_message_callback(data))
+                    for event in events:
+                        Clock.schedule_once(lambda dt, event=event: self.on_message_callback(event))
             except json.JSONDecodeError:
                 Logger.warning("Message WS non-JSON reçu")
 